@@ -0,0 +1,479 @@
+"""
+The Brigade is a team of Head Chefs, cooking at the same time from one set of
+prepared ingredients
+
+i.e. The ingredients are extracted once, published to shared memory as Arrow IPC
+     streams, and read without copying by every chef, each in its own process
+"""
+import gc
+import multiprocessing
+import os
+import pickle
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from pyarrow import ipc
+from sous_chef.sous_chef import SousChef
+from wait_staff.orders import available_chefs, chef_class, validate_chef
+
+# The name of the shared memory holding an ingredient, its format ("arrow" for tables,
+# "pickle" for anything else), and its size in bytes
+SharedIngredient = Tuple[str, str, int]
+
+
+class ChefReport(NamedTuple):
+    """
+    How one chef of the Brigade got on
+    """
+
+    chef: str
+    seconds: float
+    peak_memory_mb: float
+    error: Optional[str] = None
+
+    # True if the chef's dishes were already fresh, so it didn't cook
+    fresh: bool = False
+
+
+def peak_memory_mb() -> float:
+    """
+    Measure the peak resident memory of this process
+
+    Returns:
+        float: The high water mark of resident memory, in MB
+    """
+    # Prefer the kernel's high water mark, as ru_maxrss survives exec on Linux, and so
+    # would include the parent process of a freshly spawned worker
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # ru_maxrss is in kilobytes on Linux, and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def publish(data: Any) -> Tuple[SharedMemory, SharedIngredient]:
+    """
+    Copy one prepared ingredient into a new block of shared memory
+
+    Tables are written as an Arrow IPC stream, which other processes can read
+    without copying or deserializing. Anything else is pickled.
+
+    Args:
+        data (Any): A prepared ingredient
+
+    Returns:
+        Tuple[SharedMemory, SharedIngredient]: The shared memory, which must be
+                                               unlinked when the Brigade is done, and
+                                               the handle with which to read it
+    """
+    if isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(data)
+
+    if isinstance(data, pa.Table):
+        data_format = "arrow"
+
+        # Measure the stream first, so it can be written straight into shared memory
+        sink = pa.MockOutputStream()
+        with ipc.new_stream(sink, data.schema) as writer:
+            writer.write_table(data)
+        size = sink.size()
+
+        shared_memory = SharedMemory(create=True, size=max(size, 1))
+        with ipc.new_stream(
+            pa.FixedSizeBufferWriter(pa.py_buffer(shared_memory.buf)), data.schema
+        ) as writer:
+            writer.write_table(data)
+    else:
+        data_format = "pickle"
+
+        pickled = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(pickled)
+
+        shared_memory = SharedMemory(create=True, size=max(size, 1))
+        shared_memory.buf[:size] = pickled
+
+    return shared_memory, (shared_memory.name, data_format, size)
+
+
+def attach(shared_memory_name: str) -> SharedMemory:
+    """
+    Attach to shared memory created by the Brigade, without taking ownership of it
+
+    Args:
+        shared_memory_name (str): The name of the block of shared memory
+
+    Returns:
+        SharedMemory: The shared memory
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=shared_memory_name, track=False)
+
+    # Before Python 3.13, attaching registers the memory with the resource tracker.
+    # Workers share the Brigade's tracker, so it is only unlinked once, by the Brigade.
+    return SharedMemory(name=shared_memory_name)
+
+
+class SharedIngredients(Mapping):
+    """
+    Ingredients prepared by the Brigade, read from shared memory
+
+    i.e. A read-only mapping of ingredient names to data, like PreparedIngredients,
+         for a chef running in a worker process
+
+    Tables become DataFrames with pyarrow-backed dtypes, e.g. int64[pyarrow], whose
+    columns are the Arrow buffers in shared memory, so no chef copies them.
+    """
+
+    def __init__(
+        self, shared: Dict[str, SharedIngredient], batch_size: int = 100_000
+    ) -> None:
+        """
+        Args:
+            shared (Dict[str, SharedIngredient]): The handle of each ingredient, as
+                                                  returned by publish()
+            batch_size (int): Number of rows per batch in iter_batches()
+        """
+        self.shared = shared
+        self.batch_size = batch_size
+
+        self._memory: Dict[str, SharedMemory] = dict()
+        self._prepared: Dict[str, Any] = dict()
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._prepared:
+            data = self._read(name)
+            self._prepared[name] = (
+                to_shared_pandas(data) if isinstance(data, pa.Table) else data
+            )
+
+        return self._prepared[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.shared)
+
+    def __len__(self) -> int:
+        return len(self.shared)
+
+    def iter_batches(self, name: str) -> Iterator[Any]:
+        """
+        Convert an ingredient a batch at a time, rather than all at once. The batches
+        are not kept.
+
+        Args:
+            name (str): The name of the ingredient in ingredients.yaml
+
+        Returns:
+            Iterator[Any]: Batches of data, such as Pandas DataFrames
+        """
+        data = self._read(name)
+
+        if not isinstance(data, pa.Table):
+            yield data
+            return
+
+        for batch in data.to_batches(max_chunksize=self.batch_size):
+            yield to_shared_pandas(pa.Table.from_batches([batch], schema=data.schema))
+
+    def release(self) -> None:
+        """
+        Free the ingredients, and detach from the shared memory
+        """
+        self._prepared.clear()
+        gc.collect()
+
+        for memory in self._memory.values():
+            try:
+                memory.close()
+            except BufferError:
+                # A DataFrame still holds the memory, which is freed when the worker
+                # exits
+                pass
+        self._memory.clear()
+
+    def _read(self, name: str) -> Any:
+        """
+        Read an ingredient from shared memory, as an Arrow table backed by the shared
+        memory itself, or an unpickled object
+        """
+        shared_memory_name, data_format, size = self.shared[name]
+
+        if name not in self._memory:
+            self._memory[name] = attach(shared_memory_name)
+        buffer = self._memory[name].buf[:size]
+
+        if data_format == "arrow":
+            return ipc.open_stream(pa.py_buffer(buffer)).read_all()
+
+        return pickle.loads(buffer)
+
+
+def to_shared_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert an Arrow table to a DataFrame without copying its columns
+
+    Args:
+        table (pa.Table): A table, e.g. read from shared memory
+
+    Returns:
+        pd.DataFrame: A DataFrame with pyarrow-backed dtypes, one block per column, so
+                      every column is backed by the table's own buffers
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype, split_blocks=True)
+
+
+def cores_per_chef(chefs_at_once: int) -> int:
+    """
+    Share the CPUs between the chefs cooking at the same time
+
+    Args:
+        chefs_at_once (int): The number of chefs cooking at the same time
+
+    Returns:
+        int: The number of CPUs each chef may use, at least one
+    """
+    return max(1, (os.cpu_count() or 1) // max(chefs_at_once, 1))
+
+
+def cook_in_worker(
+    chef: str,
+    ingredients: Path,
+    shared: Dict[str, SharedIngredient],
+    chef_arguments: Dict[str, Any],
+    force: bool,
+    cores: int,
+) -> ChefReport:
+    """
+    Serve one chef's dishes, from ingredients in shared memory, in a worker process
+
+    Args:
+        chef (str): The name of the chef, e.g. "rf_model_chef"
+        ingredients (Path): The ingredients.yaml the ingredients were prepared from
+        shared (Dict[str, SharedIngredient]): The handle of each ingredient
+        chef_arguments (Dict[str, Any]): Passed on to the chef, e.g. full_course
+        force (bool): Cook even if the saved fingerprints match
+        cores (int): The number of CPUs the chef may use
+
+    Returns:
+        ChefReport: How long the chef took, and the peak memory of the process
+    """
+    # joblib, and so scikit-learn's n_jobs=-1, uses at most this many CPUs, in this
+    # process and in the worker processes it starts
+    os.environ["LOKY_MAX_CPU_COUNT"] = str(cores)
+
+    start = time.perf_counter()
+    error = None
+    shared_ingredients = SharedIngredients(shared=shared)
+
+    try:
+        head_chef = chef_class(chef)(
+            sous_chef=SousChef(ingredients=ingredients),
+            ingredients=shared_ingredients,
+            **chef_arguments,
+        )
+        head_chef.serve(force=force)
+        del head_chef
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    finally:
+        shared_ingredients.release()
+
+    # Each worker only serves one chef, so this is the chef's own peak
+    return ChefReport(
+        chef=chef,
+        seconds=time.perf_counter() - start,
+        peak_memory_mb=peak_memory_mb(),
+        error=error,
+    )
+
+
+class Brigade:
+    """
+    Several Head Chefs cooking in parallel, sharing one set of ingredients
+    """
+
+    def __init__(
+        self,
+        chefs: List[str],
+        ingredients: Path = Path("/app/sous_chef/ingredients.yaml"),
+        processes: Optional[int] = None,
+        chef_arguments: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Args:
+            chefs (List[str]): The names of the chefs, e.g. ["rf_model_chef"]
+            ingredients (Path): A YAML file within the sous_chef directory containing
+                                the ingredients to prepare
+            processes (Optional[int]): The maximum number of chefs to run at once.
+                                       Defaults to the number of CPUs. The CPUs are
+                                       shared between the chefs running at once
+            chef_arguments (Optional[Dict[str, Any]]): Passed on to every chef, e.g.
+                                                       full_course
+
+        Raises:
+            ValueError: If there is no such chef
+        """
+        for chef in chefs:
+            validate_chef(chef)
+
+        self.chefs = chefs
+        self.ingredients = ingredients
+        self.processes = processes
+        self.chef_arguments = chef_arguments or dict()
+
+        self.sous_chef = SousChef(ingredients=ingredients)
+
+    def is_fresh(self, chef: str) -> bool:
+        """
+        Check whether a chef's dishes were cooked from the current ingredients, without
+        preparing any of them
+
+        Args:
+            chef (str): The name of the chef, e.g. "rf_model_chef"
+
+        Returns:
+            bool: True if all of the chef's saved fingerprints match
+        """
+        return chef_class(chef)(
+            sous_chef=self.sous_chef, **self.chef_arguments
+        ).is_fresh()
+
+    def serve(self, force: bool = False) -> List[ChefReport]:
+        """
+        Prepare the ingredients once, then have every chef whose dishes are stale serve
+        them
+
+        Only the ingredients those chefs need are prepared, so nothing is extracted if
+        every dish is fresh.
+
+        Args:
+            force (bool): Cook even if the saved fingerprints match
+
+        Returns:
+            List[ChefReport]: How each chef got on, in the order of self.chefs
+        """
+        reports = {
+            chef: ChefReport(chef=chef, seconds=0.0, peak_memory_mb=0.0, fresh=True)
+            for chef in self.chefs
+            if not force and self.is_fresh(chef=chef)
+        }
+        stale_chefs = [chef for chef in self.chefs if chef not in reports]
+
+        needed = set()
+        for chef in stale_chefs:
+            needed.update(
+                chef_class(chef).ingredients_needed or self.sous_chef.ingredients
+            )
+
+        prepared = self.sous_chef.prepare_ingredients_lazily()
+        prepared.prefetch(names=sorted(needed))
+
+        shared_memory = list()
+        shared = dict()
+
+        try:
+            for name in sorted(needed):
+                memory, shared[name] = publish(data=prepared[name])
+                shared_memory.append(memory)
+
+                # The shared copy is all the chefs need
+                prepared.release(name=name)
+
+            # A fresh process for every chef, so each peak memory is the chef's own.
+            # Unlike Pool workers, these aren't daemons, so chefs can start their own
+            # process pools, e.g. for a hyperparameter search.
+            chefs_at_once = min(self.processes or os.cpu_count() or 1, len(stale_chefs))
+            cores = cores_per_chef(chefs_at_once=chefs_at_once)
+
+            with ThreadPoolExecutor(max_workers=max(chefs_at_once, 1)) as executor:
+                futures = {
+                    chef: executor.submit(
+                        self._cook_in_own_process,
+                        chef=chef,
+                        shared=shared,
+                        force=force,
+                        cores=cores,
+                    )
+                    for chef in stale_chefs
+                }
+
+                reports.update(
+                    {chef: future.result() for chef, future in futures.items()}
+                )
+
+            return [reports[chef] for chef in self.chefs]
+        finally:
+            for memory in shared_memory:
+                memory.close()
+                memory.unlink()
+
+    def _cook_in_own_process(
+        self, chef: str, shared: Dict[str, SharedIngredient], force: bool, cores: int
+    ) -> ChefReport:
+        """
+        Serve one chef's dishes in a process of its own, which exits once it's done
+        """
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            return executor.submit(
+                cook_in_worker,
+                chef=chef,
+                ingredients=self.ingredients,
+                shared=shared,
+                chef_arguments=self.chef_arguments,
+                force=force,
+                cores=cores,
+            ).result()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "chefs",
+        nargs="+",
+        choices=available_chefs(),
+        help="Chefs to serve, e.g. rf_model_chef",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None, help="Chefs to run at once"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Cook even if no ingredient has changed"
+    )
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    reports = Brigade(chefs=arguments.chefs, processes=arguments.processes).serve(
+        force=arguments.force
+    )
+
+    print(
+        f"Served {len(reports)} chef(s) in {time.perf_counter() - start:.1f} s, "
+        f"preparing ingredients with a peak of "
+        f"{peak_memory_mb():.0f} MB"
+    )
+    for report in reports:
+        status = report.error or ("fresh, not cooked" if report.fresh else "ok")
+        print(
+            f"  {report.chef}: {report.seconds:.1f} s, "
+            f"peak {report.peak_memory_mb:.0f} MB, {status}"
+        )
+
+    if any(report.error for report in reports):
+        sys.exit(1)
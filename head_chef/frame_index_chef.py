@@ -0,0 +1,65 @@
+"""
+An implementation of a HeadChef that indexes the labelled frames shown by the custom
+window display
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Optional
+
+from head_chef.head_chef import HeadChef
+from sous_chef.sous_chef import SousChef
+from window_display.frame_index import FrameIndex
+
+
+class FrameIndexChef(HeadChef):
+    """
+    Cook up the FrameIndex of the self-driving labels, so the custom window display
+    never has to summarize them itself
+    """
+
+    dishes = ("frame_index",)
+    ingredients_needed = ("self_driving_labels",)
+
+    def __init__(self, sous_chef: Optional[SousChef] = None, **kwargs: Any) -> None:
+        """
+        Give the Head Chef a Sous Chef preparing only the labels, so the model dishes
+        aren't cooked again whenever the labels change, and vice versa
+
+        Args:
+            sous_chef (Optional[SousChef]): The Sous Chef describing the ingredients.
+                                            Defaults to one reading
+                                            frame_ingredients.yaml
+            **kwargs (Any): Passed on to HeadChef
+        """
+        if sous_chef is None:
+            sous_chef = SousChef(
+                ingredients=Path("/app/sous_chef/frame_ingredients.yaml")
+            )
+
+        super().__init__(sous_chef=sous_chef, **kwargs)
+
+    def cook(self) -> Any:
+        """
+        Cook the ingredients
+
+        i.e. Count the objects of each label in each frame, sort the counts of each
+             label, and save them as Parquet in long format
+
+        Returns:
+            (Any): The Dish to serve, i.e. the FrameIndex
+        """
+        frame_index = FrameIndex.from_labels(self.ingredients["self_driving_labels"])
+        self.dish_tool("frame_index").save(data=frame_index.to_frame())
+
+        return frame_index
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force", action="store_true", help="Cook even if no ingredient has changed"
+    )
+    arguments = parser.parse_args()
+
+    frame_index_chef = FrameIndexChef()
+    frame_index_chef.serve(force=arguments.force)
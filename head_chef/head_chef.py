@@ -2,15 +2,72 @@
 The Head Chef Cooks the Final Dish
 I.e. the transform & load stages of your ETL process.
 """
+import hashlib
+import inspect
+import json
+import subprocess
 from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
-
-import anyconfig
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from sous_chef.sous_chef import SousChef
 from wait_staff.data_models import FullCourse
+from wait_staff.menu import load_full_course
 from tools.prepare_tools import prepare_tools
+from tools.tool import Tool
+
+# Fields of a FullCourse which record how it was generated, rather than what it is
+LINEAGE_FIELDS = {"date_generated", "ingredients_used", "dvc_hash", "git_hash"}
+
+
+@lru_cache(maxsize=None)
+def kitchen_git_hash() -> Optional[str]:
+    """
+    Find the commit of the Kitchen code doing the cooking
+
+    Returns:
+        Optional[str]: The git commit hash, or None if not running from a git repo
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def source_hash(source_file: str) -> str:
+    """
+    Hash a file of source code, so changes to it are noticed without git
+
+    Args:
+        source_file (str): Path to the file
+
+    Returns:
+        str: A SHA-256 hex digest of the file's contents
+    """
+    with open(source_file, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def fingerprint_location(location: str) -> str:
+    """
+    The location of the fingerprint saved next to a dish
+
+    Args:
+        location (str): The location of the dish, as in full_course.yaml
+
+    Returns:
+        str: The location of the fingerprint, a JSON serialized FullCourse
+    """
+    return f"{location}.course.json"
 
 
 class HeadChef(ABC):
@@ -21,8 +78,18 @@ class HeadChef(ABC):
          in a Python data structure, and process it
     """
 
+    # The dishes in full_course.yaml which this chef cooks, or None for all of them
+    dishes: Optional[Tuple[str, ...]] = None
+
+    # The ingredients cook() uses, or None for all of them. Only these are part of the
+    # dishes' fingerprints, and prepared for the chef by a Brigade.
+    ingredients_needed: Optional[Tuple[str, ...]] = None
+
     def __init__(
-        self, full_course: Path = Path("/app/head_chef/full_course.yaml")
+        self,
+        full_course: Path = Path("/app/head_chef/full_course.yaml"),
+        sous_chef: Optional[SousChef] = None,
+        ingredients: Optional[Mapping[str, Any]] = None,
     ) -> None:
         """
         Give the Head Chef the instructions needed to prepare the full course
@@ -35,23 +102,172 @@ class HeadChef(ABC):
         Args:
             full_course (Path): A YAML file within the head_chef directory containing
                                 the ingredients to prepare
+            sous_chef (Optional[SousChef]): The Sous Chef describing the ingredients.
+                                            Defaults to one reading ingredients.yaml
+            ingredients (Optional[Mapping[str, Any]]): Ingredients which were already
+                                                       prepared, e.g. once for a whole
+                                                       Brigade of chefs. Defaults to
+                                                       preparing them here.
         """
-        sous_chef = SousChef()
-        self.ingredients = sous_chef.prepare_ingredients()
+        self.sous_chef = sous_chef if sous_chef is not None else SousChef()
 
-        self.full_course = dict()
-        self.tools = dict()
+        # Ingredients are only prepared when cook() first uses them, unless given
+        self.ingredients = (
+            ingredients
+            if ingredients is not None
+            else self.sous_chef.prepare_ingredients_lazily()
+        )
 
-        # Load from full_course.yaml
-        for key, value in anyconfig.load(full_course).items():
-            self.full_course[key] = FullCourse(**value)
+        # Load from full_course.yaml, keeping only the dishes this chef cooks
+        self.full_course = {
+            dish_name: dish
+            for dish_name, dish in load_full_course(full_course).items()
+            if self.dishes is None or dish_name in self.dishes
+        }
+        self.tools = dict()
 
+        for key in self.full_course:
             # Find the right tool for the job (data saving)
             self.tools[key] = prepare_tools(
                 python_format=self.full_course[key].python_format,
                 file_format=self.full_course[key].file_format,
             )
 
+    def dish_tool(self, dish_name: str) -> Tool:
+        """
+        Pick up the right tool to save a dish, set to its location and save_args
+
+        Args:
+            dish_name (str): The name of the dish in full_course.yaml
+
+        Returns:
+            Tool: The tool with which to save (or load) the dish
+        """
+        dish = self.full_course[dish_name]
+
+        return self.tools[dish_name](filepath=dish.location, save_args=dish.save_args)
+
+    def serve(self, force: bool = False) -> Any:
+        """
+        Cook the ingredients, unless nothing has changed since the dishes were last
+        cooked, then save a fingerprint next to each dish
+
+        Args:
+            force (bool): Cook even if the saved fingerprints match
+
+        Returns:
+            (Any): The Dish to serve, or None if cooking was skipped
+        """
+        # Either way, the current version of every ingredient is recorded, for the
+        # fingerprints
+        if force:
+            self.sous_chef.check_ingredients()
+        elif self.is_fresh():
+            return None
+
+        dish = self.cook()
+
+        for dish_name in self.full_course:
+            self.save_fingerprint(dish_name=dish_name)
+
+        return dish
+
+    def fingerprint(self, dish_name: str) -> FullCourse:
+        """
+        Describe a dish along with everything that went into cooking it
+
+        Args:
+            dish_name (str): The name of the dish in full_course.yaml
+
+        Returns:
+            FullCourse: The dish, with ingredients_used, git_hash, and cooked_with
+                        filled in
+        """
+        return self.full_course[dish_name].model_copy(
+            update={
+                "ingredients_used": [
+                    ingredient.model_copy(update={"date_accessed": None})
+                    for name, ingredient in self.sous_chef.ingredients.items()
+                    if self.ingredients_needed is None
+                    or name in self.ingredients_needed
+                ],
+                "git_hash": kitchen_git_hash(),
+                "cooked_with": self.fingerprint_extras(),
+            }
+        )
+
+    def fingerprint_extras(self) -> Dict[str, str]:
+        """
+        Hash anything else that changes the dishes when it changes, so they are cooked
+        again, even where git isn't installed, e.g. in the kitchen's Docker image
+
+        Chefs cooking from other instructions, e.g. a recipe, add their hash to these.
+
+        Returns:
+            Dict[str, str]: A hash of the source of each module defining this chef,
+                            keyed by module, e.g. {"head_chef.rf_model_chef": "9f86..."}
+        """
+        return {
+            chef.__module__: source_hash(inspect.getfile(chef))
+            for chef in type(self).__mro__
+            if isinstance(chef, type) and issubclass(chef, HeadChef)
+        }
+
+    def save_fingerprint(self, dish_name: str) -> None:
+        """
+        Save the fingerprint of a freshly cooked dish next to it
+
+        Args:
+            dish_name (str): The name of the dish in full_course.yaml
+        """
+        dish = self.full_course[dish_name]
+        dish_tool = self.dish_tool(dish_name=dish_name)
+
+        fingerprint = self.fingerprint(dish_name=dish_name)
+        fingerprint.date_generated = datetime.now()
+        fingerprint.dvc_hash = dish_tool.checksum()
+
+        fingerprint_tool = prepare_tools(python_format="dict", file_format="json_file")
+        fingerprint_tool(filepath=fingerprint_location(dish.location)).save(
+            data=json.loads(fingerprint.model_dump_json())
+        )
+
+    def is_fresh(self) -> bool:
+        """
+        Check whether every dish was cooked from the current ingredients, with the
+        current instructions and code, and has not changed since
+
+        The current version of every ingredient is checked first, without preparing
+        any of them, see SousChef.check_ingredients
+
+        Returns:
+            bool: True if all of the saved fingerprints match
+        """
+        self.sous_chef.check_ingredients()
+
+        fingerprint_tool = prepare_tools(python_format="dict", file_format="json_file")
+
+        for dish_name, dish in self.full_course.items():
+            dish_tool = self.dish_tool(dish_name=dish_name)
+            saved_tool = fingerprint_tool(filepath=fingerprint_location(dish.location))
+
+            if not dish_tool.exists() or not saved_tool.exists():
+                return False
+
+            saved = FullCourse(**saved_tool.load())
+            current = self.fingerprint(dish_name=dish_name)
+
+            if (
+                saved.model_dump(exclude=LINEAGE_FIELDS)
+                != current.model_dump(exclude=LINEAGE_FIELDS)
+                or saved.ingredients_used != current.ingredients_used
+                or saved.git_hash != current.git_hash
+                or saved.dvc_hash != dish_tool.checksum()
+            ):
+                return False
+
+        return True
+
     @abstractmethod
     def cook(self) -> Any:
         """
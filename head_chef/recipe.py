@@ -0,0 +1,293 @@
+"""
+A Recipe declares how to clean a DataFrame, step by step, in YAML or Python
+
+i.e. Fills, mappings, binnings, drops, and checks, compiled so that every column is
+     transformed in one vectorized pass, with no boolean mask per condition, and a new
+     DataFrame is returned without modifying the original
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# A compiled step: the column it applies to (None for every column), and what it does
+Operation = Tuple[Optional[str], Callable[[pd.Series], pd.Series]]
+
+
+def fill(value: Any) -> Callable[[pd.Series], pd.Series]:
+    """
+    Replace missing values
+
+    Args:
+        value (Any): The value to fill with, or "median" for the median of the column
+
+    Returns:
+        Callable[[pd.Series], pd.Series]: The operation
+    """
+
+    def fill_column(values: pd.Series) -> pd.Series:
+        missing = values.isna()
+        if not missing.any():
+            return values
+
+        return values.fillna(values.median() if value == "median" else value)
+
+    return fill_column
+
+
+def map_values(mapping: Dict[Any, Any]) -> Callable[[pd.Series], pd.Series]:
+    """
+    Replace values using a lookup table, e.g. categories with numeric codes
+
+    The column is factorized, so each distinct value is only looked up once, and the
+    results are taken from an array. Missing values stay missing.
+
+    Args:
+        mapping (Dict[Any, Any]): The value to replace each value with
+
+    Returns:
+        Callable[[pd.Series], pd.Series]: The operation
+
+    Raises:
+        ValueError: When applied, if the column holds values which aren't in the
+                    mapping, rather than letting a later fill give them a real code
+    """
+    replacement_dtype = np.asarray(list(mapping.values())).dtype
+
+    def map_column(values: pd.Series) -> pd.Series:
+        codes, uniques = pd.factorize(values)
+
+        unmapped = [unique for unique in uniques if unique not in mapping]
+        if unmapped:
+            raise ValueError(
+                f"No mapping for {values.name} values {sorted(map(str, unmapped))}"
+            )
+
+        lookup = np.array([mapping[unique] for unique in uniques])
+
+        # Missing values are coded -1
+        if (codes >= 0).all():
+            mapped = lookup.astype(replacement_dtype)[codes]
+        else:
+            lookup = np.append(
+                lookup.astype(float if replacement_dtype.kind in "iufb" else object),
+                np.nan,
+            )
+            mapped = lookup[codes]
+
+        return pd.Series(mapped, index=values.index, name=values.name)
+
+    return map_column
+
+
+def require_values(values: pd.Series) -> pd.Series:
+    """
+    Check that a column has no missing values, rather than letting a fill give them a
+    real value, e.g. a missing Sex the code for "female"
+
+    Args:
+        values (pd.Series): The column
+
+    Returns:
+        pd.Series: The column, unchanged
+
+    Raises:
+        ValueError: If any values are missing
+    """
+    missing = int(values.isna().sum())
+    if missing:
+        raise ValueError(f"{values.name} has {missing} missing values")
+
+    return values
+
+
+def bin_values(edges: List[float]) -> Callable[[pd.Series], pd.Series]:
+    """
+    Replace numbers with the index of the bin they fall in
+
+    Bins include their right edge, and the first and last bins are open ended.
+    i.e. With edges [16, 32]: x <= 16 is 0, 16 < x <= 32 is 1, and x > 32 is 2.
+    Missing values stay missing.
+
+    Args:
+        edges (List[float]): The boundaries between bins, in increasing order
+
+    Returns:
+        Callable[[pd.Series], pd.Series]: The operation
+
+    Raises:
+        ValueError: If the edges are not increasing
+    """
+    edges = np.asarray(edges, dtype=float)
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError(f"Bin edges must be increasing, got {edges.tolist()}")
+
+    def bin_column(values: pd.Series) -> pd.Series:
+        numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        binned = np.searchsorted(edges, numbers, side="left")
+
+        missing = np.isnan(numbers)
+        if missing.any():
+            binned = np.where(missing, np.nan, binned)
+
+        return pd.Series(binned, index=values.index, name=values.name)
+
+    return bin_column
+
+
+class Recipe:
+    """
+    A sequence of cleaning steps, compiled once and then applied to any DataFrame
+
+    Steps are applied in order, and each is a dict with one key:
+        - fill: {column: value} or {column: "median"}, or a value to fill every column
+        - map: {column: {old value: new value}}
+        - bin: {column: [edge, edge, ...]}
+        - drop: [column, column, ...]
+        - require: [column, column, ...], raising a ValueError if any value is missing
+
+    e.g.
+        recipe = Recipe([
+            {"fill": {"Fare": "median"}},
+            {"bin": {"Fare": [7.91, 14.454, 31]}},
+            {"drop": ["Name"]},
+        ])
+        cleaned_data = recipe(dirty_data)
+
+    A "median" fill takes the median of the data being cleaned, unless the recipe was
+    fitted first, see Recipe.fit
+    """
+
+    STEPS = {"fill": fill, "map": map_values, "bin": bin_values}
+
+    def __init__(self, steps: List[Dict[str, Any]]) -> None:
+        """
+        Compile the steps of the recipe
+
+        Args:
+            steps (List[Dict[str, Any]]): The steps, as described above
+
+        Raises:
+            ValueError: If a step is not a fill, map, bin, drop, or require
+        """
+        self.steps = steps
+
+        self.operations: List[Operation] = list()
+        self.dropped: List[str] = list()
+
+        for step in steps:
+            if len(step) != 1:
+                raise ValueError(f"Each step must have exactly one key, got {step}")
+
+            ((step_type, arguments),) = step.items()
+
+            if step_type == "drop":
+                self.dropped.extend(arguments)
+            elif step_type == "require":
+                self.operations.extend((column, require_values) for column in arguments)
+            elif step_type == "fill" and not isinstance(arguments, dict):
+                self.operations.append((None, fill(arguments)))
+            elif step_type in self.STEPS:
+                self.operations.extend(
+                    (column, self.STEPS[step_type](column_arguments))
+                    for column, column_arguments in arguments.items()
+                )
+            else:
+                raise ValueError(
+                    f"Unknown step '{step_type}'. "
+                    f"Steps are: {', '.join([*self.STEPS, 'drop', 'require'])}"
+                )
+
+    @classmethod
+    def from_yaml(cls, recipe: Union[str, Path]) -> "Recipe":
+        """
+        Read a recipe from a YAML file holding a list of steps
+
+        Args:
+            recipe (Union[str, Path]): The YAML file
+
+        Returns:
+            Recipe: The compiled recipe
+        """
+        with open(recipe) as file:
+            return cls(steps=yaml.safe_load(file))
+
+    def fit(self, data: pd.DataFrame) -> "Recipe":
+        """
+        Work out the statistics the recipe needs from some data, e.g. medians, so the
+        recipe cleans any other data the same way
+
+        i.e. Fit to the training data, then clean each batch of test data with the
+             training median, rather than the median of the batch
+
+        Args:
+            data (pd.DataFrame): The data to take the statistics from, e.g. the
+                                 training data, which is not modified
+
+        Returns:
+            Recipe: A new recipe, with each "median" replaced by the median of the
+                    column as it stands at that step
+        """
+        fitted_steps: List[Dict[str, Any]] = list()
+
+        for step in self.steps:
+            ((step_type, arguments),) = step.items()
+
+            if step_type == "fill" and (
+                arguments == "median"
+                or isinstance(arguments, dict)
+                and "median" in arguments.values()
+            ):
+                # The median of each column after the steps before this one
+                prepared = Recipe(steps=fitted_steps)(data)
+
+                if isinstance(arguments, dict):
+                    arguments = {
+                        column: (
+                            float(prepared[column].median())
+                            if value == "median" and column in prepared
+                            else value
+                        )
+                        for column, value in arguments.items()
+                    }
+                else:
+                    arguments = {
+                        column: float(median)
+                        for column, median in prepared.median(numeric_only=True).items()
+                    }
+
+                step = {"fill": arguments}
+
+            fitted_steps.append(step)
+
+        return Recipe(steps=fitted_steps)
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the recipe
+
+        Args:
+            data (pd.DataFrame): A dirty Pandas DataFrame, which is not modified
+
+        Returns:
+            pd.DataFrame: A new, cleaned Pandas DataFrame
+        """
+        columns = [column for column in data.columns if column not in self.dropped]
+
+        cleaned = dict()
+        for column in columns:
+            operations = [
+                operation
+                for operation_column, operation in self.operations
+                if operation_column in (None, column)
+            ]
+
+            values = data[column]
+            for operation in operations:
+                values = operation(values)
+
+            cleaned[column] = values
+
+        return pd.DataFrame(cleaned, index=data.index, copy=False)
@@ -1,20 +1,48 @@
 """
 An implementation of a HeadChef that cleans some data and trains a Random Forest model
 """
-from typing import Any
+import hashlib
+import json
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 import pandas as pd
 
 from sklearn.ensemble import RandomForestClassifier
 
 from head_chef.head_chef import HeadChef
-from window_display.auto_display import create_window_display
+from head_chef.recipe import Recipe
+from tools.tool import Tool
+from window_display.auto_display import DisplaySample, create_window_display
+
+# Used unless overridden by the parameters of classifier_model in full_course.yaml
+DEFAULT_PARAMETERS = {"n_estimators": 500, "random_state": 42, "n_jobs": -1}
 
 
 class RfModelChef(HeadChef):
     """
     Cook up a trained Scikit-Learn Random Forest model
     """
+    dishes = ("classifier_model", "model_results")
+    ingredients_needed = ("titanic_train_data", "titanic_test_data")
+
+    def __init__(
+        self,
+        recipe: Path = Path("/app/head_chef/rf_model_recipe.yaml"),
+        **kwargs: Any,
+    ) -> None:
+        """
+        Give the Head Chef the recipe for cleaning the Titanic data
+
+        Args:
+            recipe (Path): A YAML file within the head_chef directory listing the steps
+                           to clean the data, see head_chef/recipe.py
+            **kwargs (Any): Passed on to HeadChef
+        """
+        super().__init__(**kwargs)
+        self.recipe = Recipe.from_yaml(recipe)
+
     def cook(self) -> Any:
         """
         Cook the ingredients
@@ -31,102 +59,158 @@ class RfModelChef(HeadChef):
         """
         # Train the model, output the model, and then use the model on the test data
         # Return the model and the results of inference on the test data
-        training_data = self.clean(self.ingredients["titanic_train_data"])
-        test_data = self.clean(self.ingredients["titanic_test_data"])
+        dirty_training_data = self.ingredients["titanic_train_data"]
+
+        # Medians are taken from the training data once, so every batch of test data is
+        # cleaned the same way, whatever the size of the batches
+        recipe = self.recipe.fit(dirty_training_data)
+        training_data = self.clean(dirty_training_data, recipe=recipe)
 
         # Remove label column
         features = training_data.drop("Survived", axis=1)
         labels = training_data["Survived"]
 
-        # Train
-        random_forest_classifier = RandomForestClassifier(
-            n_estimators=500, random_state=42
-        )
+        # Train, on every core unless full_course.yaml says otherwise
+        model_tool = self.dish_tool("classifier_model")
+        random_forest_classifier = self.prepare_model(model_tool=model_tool)
         random_forest_classifier.fit(features, labels)
 
         # Save the trained model
-        model_tool = self.tools["classifier_model"](
-            filepath=self.full_course["classifier_model"].location
-        )
         model_tool.save(data=random_forest_classifier)
 
-        # Evaluate the trained model and save results
-        eval_results = pd.DataFrame(
-            random_forest_classifier.predict(test_data), columns=["model_predictions"]
+        # Evaluate the trained model and save results, a batch of test data at a time,
+        # sampling the results for the window display as they go by
+        display = (self.full_course["model_results"].parameters or dict()).get(
+            "display", dict()
+        )
+        display_sample = DisplaySample(
+            max_rows=display.get("max_rows", 50_000),
+            stratify_by=display.get("stratify_by"),
         )
 
-        test_data["model_predictions"] = eval_results
-
-        # Save the evaluation results
-        results_tool = self.tools["model_results"](
-            filepath=self.full_course["model_results"].location
+        results_tool = self.dish_tool("model_results")
+        results_tool.save_batches(
+            batches=display_sample.observe(
+                self.evaluate(
+                    model=random_forest_classifier,
+                    test_batches=self.ingredients.iter_batches("titanic_test_data"),
+                    recipe=recipe,
+                )
+            )
         )
-        results_tool.save(data=test_data)
 
-        # Create a window display with the results
+        # Create a window display from the sample of the results, in a detached
+        # process, so cooking is done once the results are saved
         create_window_display(
-            data_to_display=test_data, display_name="model_results",
+            data_to_display=display_sample.sample(),
+            display_name="model_results",
+            **display,
         )
 
-    @staticmethod
-    def clean(data_to_clean: pd.DataFrame) -> pd.DataFrame:
+    def fingerprint_extras(self) -> Dict[str, str]:
         """
-        An example of doing data cleaning. This will be a step in self.cook()
+        Hash the chef's code, and the steps of its recipe, so editing
+        rf_model_recipe.yaml means the dishes are cooked again
+
+        Returns:
+            Dict[str, str]: The hashes of HeadChef.fingerprint_extras(), and "recipe"
+        """
+        recipe = json.dumps(self.recipe.steps, sort_keys=True, default=str)
+
+        return {
+            **super().fingerprint_extras(),
+            "recipe": hashlib.sha256(recipe.encode()).hexdigest(),
+        }
+
+    def prepare_model(self, model_tool: Tool) -> RandomForestClassifier:
+        """
+        Set up the Random Forest with the parameters of classifier_model in
+        full_course.yaml
+
+        With warm_start, the previously saved model is loaded, and n_estimators more
+        trees are added to it when it is fit, instead of training from scratch.
 
         Args:
-            data_to_clean (pd.DataFrame): A dirty Pandas DataFrame
+            model_tool (Tool): The tool to save (and load) the model with
 
         Returns:
-            pd.DataFrame: A cleaned Pandas Dataframe
+            RandomForestClassifier: The model, ready to fit
         """
-        # Mapping Sex
-        data_to_clean["Sex"] = (
-            data_to_clean["Sex"].map({"female": 0, "male": 1}).astype(int)
+        parameters = {
+            **DEFAULT_PARAMETERS,
+            **(self.full_course["classifier_model"].parameters or dict()),
+        }
+        warm_start = parameters.pop("warm_start", False)
+
+        if not warm_start or not model_tool.exists():
+            return RandomForestClassifier(**parameters)
+
+        model = model_tool.load()
+        model.set_params(
+            **{
+                **parameters,
+                "n_estimators": len(model.estimators_) + parameters["n_estimators"],
+                "warm_start": True,
+            }
         )
 
-        # Mapping Embarked
-        data_to_clean["Embarked"] = data_to_clean["Embarked"].fillna("S")
-        data_to_clean["Embarked"] = (
-            data_to_clean["Embarked"].map({"S": 0, "C": 1, "Q": 2}).astype(int)
-        )
+        return model
 
-        # Mapping Fare
-        data_to_clean["Fare"] = data_to_clean["Fare"].fillna(
-            data_to_clean["Fare"].median()
-        )
-        data_to_clean.loc[data_to_clean["Fare"] <= 7.91, "Fare"] = 0
-        data_to_clean.loc[
-            (data_to_clean["Fare"] > 7.91) & (data_to_clean["Fare"] <= 14.454), "Fare"
-        ] = 1
-        data_to_clean.loc[
-            (data_to_clean["Fare"] > 14.454) & (data_to_clean["Fare"] <= 31), "Fare"
-        ] = 2
-        data_to_clean.loc[data_to_clean["Fare"] > 31, "Fare"] = 3
-        data_to_clean["Fare"] = data_to_clean["Fare"].astype(int)
-
-        # Mapping Age
-        data_to_clean.loc[data_to_clean["Age"] <= 16, "Age"] = 0
-        data_to_clean.loc[
-            (data_to_clean["Age"] > 16) & (data_to_clean["Age"] <= 32), "Age"
-        ] = 1
-        data_to_clean.loc[
-            (data_to_clean["Age"] > 32) & (data_to_clean["Age"] <= 48), "Age"
-        ] = 2
-        data_to_clean.loc[
-            (data_to_clean["Age"] > 48) & (data_to_clean["Age"] <= 64), "Age"
-        ] = 3
-        data_to_clean.loc[data_to_clean["Age"] > 64, "Age"] = 4
-
-        # Feature Selection
-        drop_elements = ["Name", "Ticket", "Cabin", "SibSp", "Parch", "PassengerId"]
-        data_to_clean.drop(drop_elements, axis=1, inplace=True)
-
-        # Fill any remaining NaN
-        data_to_clean.fillna(0, inplace=True)
-
-        return data_to_clean
+    def evaluate(
+        self,
+        model: RandomForestClassifier,
+        test_batches: Iterable[pd.DataFrame],
+        recipe: Optional[Recipe] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Clean each batch of test data and add the model's predictions to it
+
+        The trees make their predictions in parallel, using the model's n_jobs, and
+        the size of each batch is set by the test data's load_args, e.g. chunksize.
+        With a recipe fitted to the training data, the results don't depend on it.
+
+        Args:
+            model (RandomForestClassifier): A trained model
+            test_batches (Iterable[pd.DataFrame]): Dirty test data, a batch at a time
+            recipe (Optional[Recipe]): The recipe fitted to the training data, see
+                                       Recipe.fit. Defaults to self.recipe
+
+        Returns:
+            Iterator[pd.DataFrame]: Cleaned test data with a "model_predictions" column
+        """
+        for test_batch in test_batches:
+            test_data = self.clean(test_batch, recipe=recipe)
+            test_data["model_predictions"] = model.predict(test_data)
+
+            yield test_data
+
+    def clean(
+        self, data_to_clean: pd.DataFrame, recipe: Optional[Recipe] = None
+    ) -> pd.DataFrame:
+        """
+        An example of doing data cleaning. This will be a step in self.cook()
+
+        The steps are declared in rf_model_recipe.yaml.
+
+        Args:
+            data_to_clean (pd.DataFrame): A dirty Pandas DataFrame, which is not
+                                          modified
+            recipe (Optional[Recipe]): The recipe to clean with, e.g. fitted to the
+                                       training data. Defaults to self.recipe, whose
+                                       medians are taken from data_to_clean
+
+        Returns:
+            pd.DataFrame: A cleaned Pandas Dataframe
+        """
+        return (recipe or self.recipe)(data_to_clean)
 
 
 if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force", action="store_true", help="Cook even if no ingredient has changed"
+    )
+    arguments = parser.parse_args()
+
     rf_model_chef = RfModelChef()
-    test_ingredients = rf_model_chef.cook()
+    test_ingredients = rf_model_chef.serve(force=arguments.force)
@@ -0,0 +1,158 @@
+"""
+An implementation of a HeadChef that tunes a Random Forest model with a
+cross-validated hyperparameter search
+"""
+from argparse import ArgumentParser
+from typing import Any, Dict
+
+import pandas as pd
+import scipy.stats
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV
+
+from head_chef.rf_model_chef import RfModelChef
+
+# Used unless overridden by the search parameters of tuned_classifier_model
+DEFAULT_SEARCH = {"cv": 5, "factor": 3, "random_state": 42, "n_jobs": -1}
+
+
+def search_space(space: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the search space in full_course.yaml into distributions to sample from
+
+    Each hyperparameter is either a list of values to choose from, or a
+    ``scipy.stats`` distribution and its arguments, e.g.
+        min_samples_leaf: {distribution: "randint", low: 1, high: 20}
+
+    Args:
+        space (Dict[str, Any]): The search space, as in full_course.yaml
+
+    Returns:
+        Dict[str, Any]: Lists and frozen distributions, keyed by hyperparameter
+    """
+    distributions = dict()
+
+    for hyperparameter, values in space.items():
+        if isinstance(values, dict):
+            arguments = dict(values)
+            distribution = getattr(scipy.stats, arguments.pop("distribution"))
+            distributions[hyperparameter] = distribution(**arguments)
+        else:
+            distributions[hyperparameter] = list(values)
+
+    return distributions
+
+
+class RfSearchChef(RfModelChef):
+    """
+    Cook up a tuned Scikit-Learn Random Forest model, and a record of the search
+    """
+    dishes = ("tuned_classifier_model", "model_search_results")
+    ingredients_needed = ("titanic_train_data",)
+
+    def cook(self) -> Any:
+        """
+        Cook the ingredients
+
+        i.e. Search for the best hyperparameters with successive halving: every
+             candidate is cross-validated on a small share of the training data, and
+             only the best of each round go on to the next round, with more data.
+             Candidates are fit in parallel, in a pool of worker processes.
+
+        Returns:
+            (Any): The Dish to serve, i.e. the best model
+        """
+        training_data = self.clean(self.ingredients["titanic_train_data"])
+
+        # Remove label column
+        features = training_data.drop("Survived", axis=1)
+        labels = training_data["Survived"]
+
+        # Search
+        search = self.prepare_search()
+        search.fit(features, labels)
+
+        # Save the best model, refit on all of the training data, to predict on
+        # every core
+        best_model = search.best_estimator_.set_params(n_jobs=-1)
+        self.dish_tool("tuned_classifier_model").save(data=best_model)
+
+        # Save the score and timings of every candidate in every round
+        self.dish_tool("model_search_results").save(
+            data=self.search_results(search=search)
+        )
+
+        return best_model
+
+    def prepare_search(self) -> HalvingRandomSearchCV:
+        """
+        Set up the search with the parameters of tuned_classifier_model in
+        full_course.yaml
+
+        i.e. parameters:
+                 model: Fixed RandomForestClassifier parameters
+                 space: The hyperparameters to search, see search_space()
+                 search: HalvingRandomSearchCV parameters, e.g. n_candidates
+
+        Returns:
+            HalvingRandomSearchCV: The search, ready to fit
+        """
+        parameters = self.full_course["tuned_classifier_model"].parameters or dict()
+
+        # The search runs candidates in parallel, so each one uses a single core
+        model = RandomForestClassifier(
+            **{"random_state": 42, **parameters.get("model", dict()), "n_jobs": 1}
+        )
+
+        return HalvingRandomSearchCV(
+            estimator=model,
+            param_distributions=search_space(parameters.get("space", dict())),
+            **{**DEFAULT_SEARCH, **parameters.get("search", dict())},
+        )
+
+    @staticmethod
+    def search_results(search: HalvingRandomSearchCV) -> pd.DataFrame:
+        """
+        Tabulate the score and timings of every candidate in every round of a search
+
+        Args:
+            search (HalvingRandomSearchCV): A fitted search
+
+        Returns:
+            pd.DataFrame: One row per candidate per round, best first
+        """
+        results = pd.DataFrame(search.cv_results_)
+
+        columns = [
+            "iter",
+            "n_resources",
+            "mean_fit_time",
+            "std_fit_time",
+            "mean_score_time",
+            "mean_test_score",
+            "std_test_score",
+            "rank_test_score",
+        ]
+        hyperparameters = [
+            column for column in results.columns if column.startswith("param_")
+        ]
+
+        return (
+            results[columns + hyperparameters]
+            .rename(columns=lambda column: column.replace("param_", "", 1))
+            .sort_values(["iter", "rank_test_score"], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force", action="store_true", help="Cook even if no ingredient has changed"
+    )
+    arguments = parser.parse_args()
+
+    rf_search_chef = RfSearchChef()
+    rf_search_chef.serve(force=arguments.force)
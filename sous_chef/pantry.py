@@ -0,0 +1,227 @@
+"""
+The Pantry stores ingredients which have already been prepared
+I.e. a local, content-addressed cache of extracted data.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from tools.tool import Tool
+from wait_staff.data_models import Ingredient
+
+PANTRY_DIR = Path(tempfile.gettempdir()) / "kitchen_pantry"
+
+# Prepared data is only kept as Feather (Arrow IPC), which holds data but never code,
+# so nothing read from the pantry can run anything. Anything else isn't kept.
+DATAFRAME_SUFFIX = ".feather"
+TABLE_SUFFIX = ".arrow"
+SUFFIXES = (DATAFRAME_SUFFIX, TABLE_SUFFIX)
+
+logger = logging.getLogger(__name__)
+
+
+class Pantry:
+    """
+    Keep prepared ingredients on the shelf, so they are only extracted again when
+    their source changes
+
+    i.e. Cache loaded data on local disk, keyed on the checksum of the source file
+         (or of every file in a source directory) and the tool used to load it,
+         evicting the least recently used data once the pantry is full
+
+    The directory is private to the user running the kitchen. If it belongs to anyone
+    else, or others can write to it, the pantry is not used.
+    """
+
+    def __init__(
+        self, directory: Path = PANTRY_DIR, max_size: int = 5 * 1024**3
+    ) -> None:
+        """
+        Args:
+            directory (Path): Local directory in which to store prepared ingredients
+            max_size (int): Maximum total size of the pantry in bytes
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._is_secure: Optional[bool] = None
+
+    def is_secure(self) -> bool:
+        """
+        Create the pantry's directory if necessary, readable and writable only by the
+        current user, and check that nobody else could have stocked it
+
+        Returns:
+            bool: True if the directory is owned by the current user, and nobody else
+                  can write to it
+        """
+        if self._is_secure is None:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+            # lstat, so a symlink planted in place of the directory is never followed
+            status = self.directory.lstat()
+            self._is_secure = (
+                stat.S_ISDIR(status.st_mode)
+                and status.st_uid == os.getuid()
+                and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+            )
+
+            if not self._is_secure:
+                logger.warning(
+                    "Not using the pantry at %s, as it isn't a directory private to "
+                    "this user",
+                    self.directory,
+                )
+
+        return self._is_secure
+
+    @staticmethod
+    def label(ingredient: Ingredient, tool: Tool, checksum: str) -> str:
+        """
+        Create the key under which a prepared ingredient is stored
+
+        Args:
+            ingredient (Ingredient): The ingredient being prepared
+            tool (Tool): The tool which loads the ingredient
+            checksum (str): The checksum of the ingredient's source, see Tool.checksum
+
+        Returns:
+            str: A key unique to this version of the source, loaded in this way
+        """
+        recipe = {
+            "tool": f"{type(tool).__module__}.{type(tool).__qualname__}",
+            "checksum": checksum,
+            "location": str(ingredient.location),
+            "file_format": ingredient.file_format,
+            "python_format": ingredient.python_format,
+            "load_args": ingredient.load_args,
+        }
+
+        return hashlib.sha256(
+            json.dumps(recipe, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def fetch(self, key: str) -> Tuple[bool, Any]:
+        """
+        Take a prepared ingredient off the shelf
+
+        Args:
+            key (str): The key under which the ingredient was stored, see Pantry.label
+
+        Returns:
+            Tuple[bool, Any]: Whether the ingredient was in the pantry, and the data
+        """
+        if not self.is_secure():
+            return False, None
+
+        for suffix in SUFFIXES:
+            path = self.directory / f"{key}{suffix}"
+
+            try:
+                if suffix == DATAFRAME_SUFFIX:
+                    data = feather.read_feather(path, memory_map=True)
+                else:
+                    data = feather.read_table(path, memory_map=True)
+            except FileNotFoundError:
+                # Not stocked in this format, or evicted by another process
+                continue
+
+            self._touch(path)
+            return True, data
+
+        return False, None
+
+    def stock(self, key: str, data: Any) -> None:
+        """
+        Put a prepared ingredient on the shelf, making room for it if necessary
+
+        Only tables are stocked. Anything which can't be written as Feather is
+        extracted again every time.
+
+        Args:
+            key (str): The key under which to store the ingredient, see Pantry.label
+            data (Any): The prepared ingredient
+        """
+        if not isinstance(data, (pd.DataFrame, pa.Table)) or not self.is_secure():
+            return None
+
+        # Write to a temporary file first, so readers never see a partial ingredient
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as file:
+            temporary_path = Path(file.name)
+
+        try:
+            suffix = self._write(data=data, path=temporary_path)
+            if suffix is not None:
+                os.replace(temporary_path, self.directory / f"{key}{suffix}")
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Throw out the least recently used ingredients until the pantry fits within
+        self.max_size
+        """
+        with self._lock:
+            shelf = list()
+            for path in self.directory.glob("*"):
+                if path.suffix not in SUFFIXES:
+                    continue
+                try:
+                    status = path.stat()
+                except FileNotFoundError:
+                    continue
+                shelf.append((status.st_mtime, status.st_size, path))
+
+            pantry_size = sum(size for _, size, _ in shelf)
+
+            for _, size, path in sorted(shelf):
+                if pantry_size <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                pantry_size -= size
+
+    @staticmethod
+    def _write(data: Any, path: Path) -> Optional[str]:
+        """
+        Write a table as Feather
+
+        Returns:
+            Optional[str]: The suffix matching the type of table written, or None if
+                           it can't be written as Feather
+        """
+        try:
+            feather.write_feather(data, str(path), compression="uncompressed")
+        except (ValueError, TypeError, pa.ArrowException):
+            # e.g. a non-default index, or mixed-type object columns
+            return None
+
+        return DATAFRAME_SUFFIX if isinstance(data, pd.DataFrame) else TABLE_SUFFIX
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """
+        Mark an ingredient as recently used, so it is evicted last
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+PANTRY = Pantry()
@@ -2,13 +2,147 @@
 The Sous Chef Prepares the Ingredients
 I.e. the extract stage of your ETL process.
 """
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Optional
 
 import anyconfig
 
+from sous_chef.pantry import Pantry, PANTRY
 from wait_staff.data_models import Ingredient
-from tools.prepare_tools import prepare_tools
+from tools.prepare_tools import prepare_tools, validate_tool
+
+
+class IngredientPreparationError(Exception):
+    """
+    Raised when one or more ingredients could not be prepared
+    """
+
+    def __init__(self, failures: Dict[str, Exception]) -> None:
+        """
+        Args:
+            failures (Dict[str, Exception]): The error raised for each ingredient which
+                                             failed, labeled according to the names in
+                                             ingredients.yaml
+        """
+        self.failures = failures
+
+        details = "\n".join(
+            f"  {name}: {type(error).__name__}: {error}"
+            for name, error in failures.items()
+        )
+        super().__init__(f"Failed to prepare {len(failures)} ingredient(s):\n{details}")
+
+
+class PreparedIngredients(Mapping):
+    """
+    Ingredients laid out for the Chef, each prepared the first time it is used
+
+    i.e. A read-only mapping of ingredient names to data, which extracts each data
+         source on first access and keeps it until released
+    """
+
+    def __init__(self, sous_chef: "SousChef") -> None:
+        """
+        Args:
+            sous_chef (SousChef): The Sous Chef who prepares each ingredient
+        """
+        self.sous_chef = sous_chef
+
+        self._prepared: Dict[str, Any] = dict()
+        self._locks = {name: threading.Lock() for name in sous_chef.ingredients}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.sous_chef.ingredients:
+            raise KeyError(name)
+
+        # One lock per ingredient, so concurrent first accesses only prepare it once
+        with self._locks[name]:
+            if name not in self._prepared:
+                self._prepared[name] = self.sous_chef.time_one_ingredient(
+                    name=name, ingredient=self.sous_chef.ingredients[name]
+                )
+
+            return self._prepared[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sous_chef.ingredients)
+
+    def __len__(self) -> int:
+        return len(self.sous_chef.ingredients)
+
+    def is_prepared(self, name: str) -> bool:
+        """
+        Check whether an ingredient has been prepared already
+
+        Args:
+            name (str): The name of the ingredient in ingredients.yaml
+
+        Returns:
+            bool: True if the ingredient is held in memory
+        """
+        return name in self._prepared
+
+    def prefetch(
+        self, names: Optional[Iterable[str]] = None, max_workers: Optional[int] = None
+    ) -> None:
+        """
+        Prepare several ingredients at the same time, ahead of their first use
+
+        Args:
+            names (Optional[Iterable[str]]): The ingredients to prepare. Defaults to all
+            max_workers (Optional[int]): The maximum number of ingredients to prepare
+                                         at once
+
+        Raises:
+            IngredientPreparationError: If any ingredient failed to be prepared
+        """
+        names = list(self if names is None else names)
+        failures = dict()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            prepared = {name: executor.submit(self.__getitem__, name) for name in names}
+
+        for name, future in prepared.items():
+            try:
+                future.result()
+            except Exception as error:
+                failures[name] = error
+
+        if failures:
+            raise IngredientPreparationError(failures=failures)
+
+    def iter_batches(self, name: str) -> Iterator[Any]:
+        """
+        Prepare an ingredient a batch at a time, rather than all at once. The batches
+        are not kept.
+
+        Args:
+            name (str): The name of the ingredient in ingredients.yaml
+
+        Returns:
+            Iterator[Any]: Batches of data, such as Pandas DataFrames
+        """
+        return self.sous_chef.prepare_one_ingredient_in_batches(
+            ingredient=self.sous_chef.ingredients[name]
+        )
+
+    def release(self, name: Optional[str] = None) -> None:
+        """
+        Free the memory held by prepared ingredients. They will be prepared again
+        if used again.
+
+        Args:
+            name (Optional[str]): The ingredient to release. Defaults to all
+        """
+        if name is None:
+            self._prepared.clear()
+        else:
+            self._prepared.pop(name, None)
 
 
 class SousChef:
@@ -19,7 +153,9 @@ class SousChef:
     """
 
     def __init__(
-        self, ingredients: Path = Path("/app/sous_chef/ingredients.yaml")
+        self,
+        ingredients: Path = Path("/app/sous_chef/ingredients.yaml"),
+        pantry: Optional[Pantry] = PANTRY,
     ) -> None:
         """
         Give the Sous Chef the instruction needed to prepare the data for the Chef
@@ -32,43 +168,143 @@ class SousChef:
         Args:
             ingredients (Path): A YAML file within the sous_chef directory containing
                                the ingredients to prepare
+            pantry (Optional[Pantry]): Where to keep prepared ingredients between runs.
+                                       None to extract every ingredient every time.
         """
+        self.pantry = pantry
         self.ingredients = dict()
+        self.preparation_times: Dict[str, float] = dict()
 
         # Load from ingredients.yaml
         for key, value in anyconfig.load(ingredients).items():
             self.ingredients[key] = Ingredient(**value)
 
-    def prepare_ingredients(self) -> Dict[str, Any]:
+            # Check there is a tool for the job before any preparation starts
+            validate_tool(
+                python_format=self.ingredients[key].python_format,
+                file_format=self.ingredients[key].file_format,
+            )
+
+    def prepare_ingredients(
+        self, concurrent: bool = False, max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Loop over all ingredients loaded in from ingredients.yaml and prepare them
 
         i.e. Extract each data source, going from raw input file to Python
              data structure, such as a Pandas DataFrame
 
+        The time taken to prepare each ingredient is recorded in
+        self.preparation_times, in seconds.
+
+        Args:
+            concurrent (bool): Prepare the ingredients at the same time in a thread
+                               pool, rather than one after another. Loading is bound by
+                               file system I/O, so the round trips overlap.
+            max_workers (Optional[int]): The maximum number of ingredients to prepare
+                                         at once when concurrent. Defaults to the
+                                         ThreadPoolExecutor default.
+
         Returns:
             (Dict): Key:value store of data, labeled according to the names in
                     ingredients.yaml. E.g.
                     {"training_data": pd.DataFrame([[0, ...]])}
+
+        Raises:
+            IngredientPreparationError: If any ingredient failed to be prepared. Every
+                                        ingredient is attempted before raising.
         """
         ingredients_to_deliver = dict()
+        failures = dict()
 
-        for name, ingredient in self.ingredients.items():
-            ingredients_to_deliver[name] = self.prepare_one_ingredient(
-                ingredient=ingredient
-            )
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                prepared = {
+                    name: executor.submit(self.time_one_ingredient, name, ingredient)
+                    for name, ingredient in self.ingredients.items()
+                }
+
+            for name, future in prepared.items():
+                try:
+                    ingredients_to_deliver[name] = future.result()
+                except Exception as error:
+                    failures[name] = error
+        else:
+            for name, ingredient in self.ingredients.items():
+                try:
+                    ingredients_to_deliver[name] = self.time_one_ingredient(
+                        name=name, ingredient=ingredient
+                    )
+                except Exception as error:
+                    failures[name] = error
+
+        if failures:
+            raise IngredientPreparationError(failures=failures)
 
         return ingredients_to_deliver
 
+    def prepare_ingredients_lazily(self) -> PreparedIngredients:
+        """
+        Lay out all ingredients loaded in from ingredients.yaml without preparing any
+
+        i.e. Each data source is only extracted the first time it is used, so only
+             the data which is actually used is loaded
+
+        Returns:
+            (PreparedIngredients): Mapping of data, labeled according to the names in
+                                   ingredients.yaml, e.g.
+                                   {"training_data": pd.DataFrame([[0, ...]])}
+        """
+        return PreparedIngredients(sous_chef=self)
+
+    def check_ingredients(self) -> None:
+        """
+        Fill in the dvc_hash of every ingredient with the checksum of its source,
+        without preparing it
+        """
+        for ingredient in self.ingredients.values():
+            tool = prepare_tools(
+                python_format=ingredient.python_format,
+                file_format=ingredient.file_format,
+            )
+            ingredient.dvc_hash = tool(filepath=ingredient.location).checksum()
+
+    def time_one_ingredient(self, name: str, ingredient: Ingredient) -> Any:
+        """
+        Prepare one ingredient, recording how long it took in self.preparation_times
+
+        Args:
+            name (str): The name of the ingredient in ingredients.yaml
+            ingredient (Ingredient): One ingredient, which is the dataclass Ingredient
+
+        Returns:
+            (Any) Data loaded into a Python data structure, such as a Pandas DataFrame
+        """
+        start_time = time.perf_counter()
+
+        try:
+            return self.prepare_one_ingredient(
+                ingredient=ingredient, pantry=self.pantry
+            )
+        finally:
+            self.preparation_times[name] = time.perf_counter() - start_time
+
     @staticmethod
-    def prepare_one_ingredient(ingredient: Ingredient) -> Any:
+    def prepare_one_ingredient(
+        ingredient: Ingredient, pantry: Optional[Pantry] = None
+    ) -> Any:
         """
         Prepare one ingredient by using Ingredient.raw_format and
         Ingredient.prepared_format to identify the correct function to read
         the input data
 
+        The ingredient's lineage is filled in as it is prepared: date_accessed, and
+        dvc_hash with the checksum of the source, which is also the pantry key.
+
         Args:
             ingredient (Ingredient): One ingredient, which is the dataclass Ingredient
+            pantry (Optional[Pantry]): Take the ingredient from this pantry if its
+                                       source has not changed, and stock it otherwise
 
         Returns:
             (Any) Data loaded into a Python data structure, such as a Pandas DataFrame
@@ -79,13 +315,55 @@ class SousChef:
         )
 
         # Instantiate object
-        data_load_tool = tool(filepath=ingredient.location)
+        data_load_tool = tool(
+            filepath=ingredient.location, load_args=ingredient.load_args
+        )
+
+        # Record the version of the source being prepared
+        ingredient.dvc_hash = data_load_tool.checksum()
+        ingredient.date_accessed = datetime.now()
 
-        # Load data
-        loaded_data = data_load_tool.load()
+        if pantry is None:
+            return data_load_tool.load()
+
+        key = pantry.label(
+            ingredient=ingredient, tool=data_load_tool, checksum=ingredient.dvc_hash
+        )
+        in_pantry, loaded_data = pantry.fetch(key=key)
+
+        if not in_pantry:
+            # Load data
+            loaded_data = data_load_tool.load()
+            pantry.stock(key=key, data=loaded_data)
 
         return loaded_data
 
+    @staticmethod
+    def prepare_one_ingredient_in_batches(ingredient: Ingredient) -> Iterator[Any]:
+        """
+        Prepare one ingredient a batch at a time, without ever holding all of it in
+        memory, e.g. a large CSV file in chunks of rows
+
+        Batches are never stocked in the pantry.
+
+        Args:
+            ingredient (Ingredient): One ingredient, which is the dataclass Ingredient
+
+        Returns:
+            (Iterator[Any]) Batches of data, such as Pandas DataFrames
+        """
+        tool = prepare_tools(
+            python_format=ingredient.python_format, file_format=ingredient.file_format
+        )
+        data_load_tool = tool(
+            filepath=ingredient.location, load_args=ingredient.load_args
+        )
+
+        ingredient.dvc_hash = data_load_tool.checksum()
+        ingredient.date_accessed = datetime.now()
+
+        return data_load_tool.iter_load()
+
 
 if __name__ == "__main__":
     sous_chef = SousChef()
@@ -0,0 +1,56 @@
+"""
+Fixtures shared by the tests
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pandas as pd
+import pytest
+import yaml
+
+
+@pytest.fixture
+def titanic_data() -> pd.DataFrame:
+    """
+    A few rows of Titanic-like data
+    """
+    return pd.DataFrame(
+        {
+            "PassengerId": [1, 2, 3, 4, 5, 6],
+            "Survived": [0, 1, 1, 1, 0, 0],
+            "Pclass": [3, 1, 3, 1, 3, 2],
+            "Sex": ["male", "female", "female", "female", "male", "male"],
+            "Age": [22.0, 38.0, 26.0, 35.0, None, 54.0],
+            "Fare": [7.25, 71.2833, 7.925, 53.1, 8.05, 51.8625],
+        }
+    )
+
+
+@pytest.fixture
+def write_ingredients(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Write an ingredients.yaml, with each ingredient given as a dict of its fields
+    """
+
+    def write(**ingredients: Dict[str, Any]) -> Path:
+        path = tmp_path / "ingredients.yaml"
+        path.write_text(yaml.safe_dump(ingredients, sort_keys=False))
+
+        return path
+
+    return write
+
+
+@pytest.fixture
+def write_full_course(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Write a full_course.yaml, with each dish given as a dict of its fields
+    """
+
+    def write(**dishes: Dict[str, Any]) -> Path:
+        path = tmp_path / "full_course.yaml"
+        path.write_text(yaml.safe_dump(dishes, sort_keys=False))
+
+        return path
+
+    return write
@@ -0,0 +1,112 @@
+"""
+Tests for previewing dishes, wait_staff/appetizers.py
+"""
+import pyarrow as pa
+import pytest
+
+from tools.pandas.csv_file import CsvFile
+from wait_staff import appetizers
+from wait_staff.appetizers import AppetizerCache, order_appetizer, to_records
+from wait_staff.data_models import FullCourse
+
+
+@pytest.fixture
+def csv_dish(tmp_path, titanic_data):
+    titanic_data.to_csv(tmp_path / "titanic.csv", index=False)
+
+    return FullCourse(
+        location=tmp_path / "titanic.csv",
+        python_format="pandas",
+        file_format="csv_file",
+    )
+
+
+@pytest.fixture
+def parquet_dish(tmp_path, titanic_data):
+    titanic_data.to_parquet(tmp_path / "titanic.parquet", row_group_size=2)
+
+    return FullCourse(
+        location=tmp_path / "titanic.parquet",
+        python_format="pandas",
+        file_format="parquet_file",
+    )
+
+
+@pytest.mark.parametrize("dish", ["csv_dish", "parquet_dish"])
+def test_appetizer_is_a_slice_of_rows_and_columns(dish, request, titanic_data):
+    appetizer = order_appetizer(
+        dish=request.getfixturevalue(dish),
+        version="v1",
+        offset=1,
+        limit=3,
+        columns=["PassengerId", "Age"],
+    )
+
+    assert appetizer.column_names == ["PassengerId", "Age"]
+    assert appetizer.column("PassengerId").to_pylist() == [2, 3, 4]
+
+
+def test_appetizer_records_replace_nan_with_null(csv_dish):
+    appetizer = order_appetizer(
+        dish=csv_dish, version="v1", offset=0, limit=6, columns=["Age"]
+    )
+
+    assert None in [record["Age"] for record in to_records(appetizer)]
+
+
+def test_unchanged_appetizer_is_loaded_once(csv_dish, monkeypatch):
+    loads = list()
+    iter_load = CsvFile.iter_load
+
+    def count_iter_load(self):
+        loads.append(self.filepath)
+        return iter_load(self)
+
+    monkeypatch.setattr(CsvFile, "iter_load", count_iter_load)
+    monkeypatch.setattr(appetizers, "APPETIZERS", AppetizerCache())
+
+    for version in ["v1", "v1", "v2"]:
+        order_appetizer(dish=csv_dish, version=version, offset=0, limit=2, columns=None)
+
+    assert len(loads) == 2
+
+
+def test_non_tabular_dish_is_rejected_before_loading(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("The dish was loaded")
+
+    monkeypatch.setattr(appetizers, "prepare_tools", fail)
+    dish = FullCourse(
+        location=tmp_path / "model.job",
+        python_format="scikit",
+        file_format="joblib_file",
+    )
+
+    with pytest.raises(TypeError, match="Only tables"):
+        order_appetizer(dish=dish, version="v1", offset=0, limit=10, columns=None)
+
+
+def test_cache_is_bounded_by_bytes():
+    table = pa.table({"a": list(range(1000))})
+    size = table.get_total_buffer_size()
+    cache = AppetizerCache(max_bytes=2 * size)
+
+    cache.put("first", table)
+    cache.put("second", table)
+    cache.get("first")
+    cache.put("third", table)
+
+    assert cache.size == 2 * size
+    assert cache.get("second") is None
+    assert cache.get("first") is table
+    assert cache.get("third") is table
+
+
+def test_cache_skips_appetizers_larger_than_it():
+    table = pa.table({"a": list(range(1000))})
+    cache = AppetizerCache(max_bytes=table.get_total_buffer_size() - 1)
+
+    cache.put("too big", table)
+
+    assert cache.get("too big") is None
+    assert cache.size == 0
@@ -0,0 +1,166 @@
+"""
+Tests for sampling and rendering the window displays, window_display/auto_display.py
+"""
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from window_display import auto_display
+from window_display.auto_display import (
+    DisplaySample,
+    create_window_display,
+    fingerprint,
+    is_displayed,
+    locked_display,
+    render_window_display,
+    sample_rows,
+)
+
+
+@pytest.fixture
+def predictions() -> pd.DataFrame:
+    """
+    1,000 predictions, of which 10% are positive
+    """
+    random = np.random.default_rng(0)
+
+    return pd.DataFrame(
+        {
+            "Fare": random.uniform(0, 100, 1_000),
+            "model_predictions": np.repeat([1, 0], [100, 900]),
+        }
+    )
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(auto_display, "STATIC_DIR", tmp_path)
+
+    return tmp_path
+
+
+def display(static_dir, display_name: str, data_fingerprint: str) -> None:
+    """
+    Save a report and its fingerprint, as render_window_display would
+    """
+    (static_dir / f"{display_name}.html").write_text("<html></html>")
+    (static_dir / f"{display_name}.display.json").write_text(
+        json.dumps({"fingerprint": data_fingerprint})
+    )
+
+
+def batches_of(data: pd.DataFrame, size: int):
+    return [data.iloc[start : start + size] for start in range(0, len(data), size)]
+
+
+def test_observe_passes_batches_through(predictions):
+    display_sample = DisplaySample(max_rows=10)
+    batches = batches_of(predictions, 300)
+
+    observed = list(display_sample.observe(batches))
+
+    assert all(seen is batch for seen, batch in zip(observed, batches))
+    assert display_sample.rows_seen == 1_000
+
+
+def test_every_row_is_kept_when_there_are_few(predictions):
+    display_sample = DisplaySample(max_rows=5_000)
+    for batch in batches_of(predictions, 300):
+        display_sample.add(batch)
+
+    pd.testing.assert_frame_equal(display_sample.sample(), predictions)
+
+
+@pytest.mark.parametrize("stratify_by", [None, "model_predictions"])
+def test_sample_does_not_depend_on_the_batches(predictions, stratify_by):
+    samples = list()
+
+    for batch_size in (7, 250, 1_000):
+        display_sample = DisplaySample(max_rows=50, stratify_by=stratify_by)
+        for batch in batches_of(predictions, batch_size):
+            display_sample.add(batch)
+        samples.append(display_sample.sample())
+
+    assert len(samples[0]) == 50
+    assert samples[0].index.is_monotonic_increasing
+    for sample in samples[1:]:
+        pd.testing.assert_frame_equal(sample, samples[0])
+
+
+def test_stratified_sample_keeps_the_proportions(predictions):
+    display_sample = DisplaySample(max_rows=50, stratify_by="model_predictions")
+    for batch in batches_of(predictions, 64):
+        display_sample.add(batch)
+
+    sample = display_sample.sample()
+
+    assert sample["model_predictions"].value_counts().to_dict() == {0: 45, 1: 5}
+
+
+def test_nothing_to_sample():
+    assert DisplaySample(max_rows=10).sample().empty
+
+
+def test_sample_rows_keeps_the_proportions_and_the_order(predictions):
+    sample = sample_rows(predictions, max_rows=100, stratify_by="model_predictions")
+
+    assert sample["model_predictions"].value_counts().to_dict() == {0: 90, 1: 10}
+    assert sample.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(
+        sample_rows(predictions, max_rows=100, stratify_by="model_predictions"), sample
+    )
+    assert sample_rows(predictions, max_rows=None) is predictions
+
+
+def test_fingerprint_changes_with_the_data_and_settings(predictions):
+    original = fingerprint(predictions, max_rows=10)
+
+    assert fingerprint(predictions.copy(), max_rows=10) == original
+    assert fingerprint(predictions, max_rows=20) != original
+    assert fingerprint(predictions.rename(columns={"Fare": "fare"}), max_rows=10) != (
+        original
+    )
+
+    changed = predictions.copy()
+    changed.loc[0, "Fare"] += 1
+    assert fingerprint(changed, max_rows=10) != original
+
+
+def test_is_displayed(static_dir):
+    assert not is_displayed("model_results", data_fingerprint="abc")
+
+    display(static_dir, "model_results", data_fingerprint="abc")
+
+    assert is_displayed("model_results", data_fingerprint="abc")
+    assert not is_displayed("model_results", data_fingerprint="xyz")
+
+
+def test_displayed_data_is_not_rendered_again(static_dir, predictions):
+    data_fingerprint = fingerprint(predictions, max_rows=None, stratify_by=None)
+    display(static_dir, "model_results", data_fingerprint=data_fingerprint)
+
+    assert create_window_display(predictions, "model_results", max_rows=None) is None
+
+
+def test_renderers_take_turns(static_dir, predictions):
+    rendered = threading.Event()
+
+    def render():
+        # Would import dataprep, which isn't installed, unless the data was displayed
+        # by the renderer holding the lock
+        render_window_display(predictions, "model_results", data_fingerprint="abc")
+        rendered.set()
+
+    with locked_display("model_results"):
+        renderer = threading.Thread(target=render)
+        renderer.start()
+
+        assert not rendered.wait(timeout=0.2)
+        display(static_dir, "model_results", data_fingerprint="abc")
+
+    renderer.join(timeout=10)
+
+    assert rendered.is_set()
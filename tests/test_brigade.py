@@ -0,0 +1,133 @@
+"""
+Tests for cooking with several chefs from shared ingredients, head_chef/brigade.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from head_chef import brigade
+from head_chef.brigade import Brigade, SharedIngredients, cores_per_chef, publish
+
+RF_MODEL_RECIPE = Path(__file__).parents[1] / "head_chef" / "rf_model_recipe.yaml"
+
+
+@pytest.fixture
+def published():
+    """
+    Publish ingredients to shared memory, and unlink them once the test is done
+    """
+    shared_memory = list()
+
+    def publish_all(**ingredients):
+        shared = dict()
+        for name, data in ingredients.items():
+            memory, shared[name] = publish(data=data)
+            shared_memory.append(memory)
+
+        return SharedIngredients(shared=shared, batch_size=4)
+
+    yield publish_all
+
+    for memory in shared_memory:
+        memory.close()
+        memory.unlink()
+
+
+def test_tables_are_read_from_shared_memory_without_copying(published, titanic_data):
+    ingredients = published(train=titanic_data)
+
+    train = ingredients["train"]
+
+    pd.testing.assert_frame_equal(
+        train.astype(titanic_data.dtypes.to_dict()), titanic_data
+    )
+    shared_memory = np.frombuffer(ingredients._memory["train"].buf, dtype=np.uint8)
+    for column in train:
+        values = train[column].array._pa_array.chunk(0).buffers()[1]
+        assert np.shares_memory(shared_memory, np.frombuffer(values, dtype=np.uint8))
+
+    del train
+    ingredients.release()
+
+
+def test_iter_batches_of_shared_tables(published, titanic_data):
+    ingredients = published(train=titanic_data)
+
+    batches = list(ingredients.iter_batches("train"))
+
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert pd.concat(batches)["PassengerId"].tolist() == [1, 2, 3, 4, 5, 6]
+
+    del batches
+    ingredients.release()
+
+
+def test_other_ingredients_are_pickled(published):
+    ingredients = published(settings={"threshold": 0.5})
+
+    assert ingredients["settings"] == {"threshold": 0.5}
+    assert list(ingredients.iter_batches("settings")) == [{"threshold": 0.5}]
+
+    ingredients.release()
+
+
+@pytest.mark.parametrize(
+    "cpus, chefs_at_once, expected", [(8, 2, 4), (8, 3, 2), (2, 4, 1), (None, 1, 1)]
+)
+def test_cores_are_shared_between_chefs(monkeypatch, cpus, chefs_at_once, expected):
+    monkeypatch.setattr(brigade.os, "cpu_count", lambda: cpus)
+
+    assert cores_per_chef(chefs_at_once=chefs_at_once) == expected
+
+
+def test_chefs_are_named_as_in_orders():
+    with pytest.raises(ValueError, match="There is no chef named"):
+        Brigade(chefs=["head_chef.rf_model_chef:RfModelChef"])
+
+
+def test_serve_cooks_stale_chefs_once(
+    tmp_path, titanic_data, write_ingredients, write_full_course
+):
+    pd.concat([titanic_data] * 10).to_csv(tmp_path / "train.csv", index=False)
+    ingredients = write_ingredients(
+        titanic_train_data={
+            "location": str(tmp_path / "train.csv"),
+            "file_format": "csv_file",
+            "python_format": "pandas",
+        }
+    )
+    full_course = write_full_course(
+        tuned_classifier_model={
+            "location": str(tmp_path / "tuned_model.job"),
+            "python_format": "scikit",
+            "file_format": "joblib_file",
+            "parameters": {
+                "model": {"n_estimators": 3},
+                "space": {"max_depth": [2, 4]},
+                "search": {"n_candidates": 2, "cv": 2, "n_jobs": 1},
+            },
+        },
+        model_search_results={
+            "location": str(tmp_path / "search_results.csv"),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+        },
+    )
+    kitchen = Brigade(
+        chefs=["rf_search_chef"],
+        ingredients=ingredients,
+        chef_arguments={"full_course": full_course, "recipe": RF_MODEL_RECIPE},
+    )
+
+    (report,) = kitchen.serve()
+
+    assert report.error is None
+    assert not report.fresh
+    assert (tmp_path / "tuned_model.job").exists()
+    assert (tmp_path / "search_results.csv").exists()
+
+    (report,) = kitchen.serve()
+
+    assert report.fresh
@@ -0,0 +1,74 @@
+"""
+Tests for the cron schedules of wait_staff/cron.py
+"""
+from datetime import datetime
+
+import pytest
+
+from wait_staff.cron import CronSchedule, parse_field
+
+
+@pytest.mark.parametrize(
+    "field, expected",
+    [
+        ("*", set(range(0, 60))),
+        ("5", {5}),
+        ("1-3", {1, 2, 3}),
+        ("*/15", {0, 15, 30, 45}),
+        ("10-20/5", {10, 15, 20}),
+        ("5/20", {5, 25, 45}),
+        ("1,3-4,50", {1, 3, 4, 50}),
+    ],
+)
+def test_parse_field(field, expected):
+    assert parse_field(field, "minute", 0, 59) == frozenset(expected)
+
+
+@pytest.mark.parametrize("field", ["60", "5-1", "*/0", "a", "1-", ""])
+def test_parse_field_rejects_invalid_fields(field):
+    with pytest.raises(ValueError):
+        parse_field(field, "minute", 0, 59)
+
+
+def test_cron_schedule_needs_five_fields():
+    with pytest.raises(ValueError, match="5 fields"):
+        CronSchedule("0 3 * *")
+
+
+def test_sunday_is_both_0_and_7():
+    assert CronSchedule("0 0 * * 7").weekdays == CronSchedule("0 0 * * 0").weekdays
+    assert CronSchedule("0 0 * * 7").weekdays == frozenset({0})
+
+
+@pytest.mark.parametrize(
+    "expression, moment, expected",
+    [
+        # Later the same day, then the next day
+        ("0 3 * * *", datetime(2021, 6, 1, 2, 59), datetime(2021, 6, 1, 3, 0)),
+        ("0 3 * * *", datetime(2021, 6, 1, 3, 0), datetime(2021, 6, 2, 3, 0)),
+        # Seconds are dropped, and the result is always after moment
+        ("* * * * *", datetime(2021, 6, 1, 3, 0, 30), datetime(2021, 6, 1, 3, 1)),
+        # Every 15 minutes, across the end of an hour
+        ("*/15 * * * *", datetime(2021, 6, 1, 3, 50), datetime(2021, 6, 1, 4, 0)),
+        # Weekdays only: Friday 2021-06-04 is followed by Monday 2021-06-07
+        ("30 2 * * 1-5", datetime(2021, 6, 4, 3, 0), datetime(2021, 6, 7, 2, 30)),
+        # Across the end of a month, and of a year
+        ("0 0 1 * *", datetime(2021, 1, 31, 12, 0), datetime(2021, 2, 1, 0, 0)),
+        ("0 0 1 1 *", datetime(2021, 6, 1, 0, 0), datetime(2022, 1, 1, 0, 0)),
+        # The 29th of February, in the next leap year
+        ("0 12 29 2 *", datetime(2021, 3, 1, 0, 0), datetime(2024, 2, 29, 12, 0)),
+        # Day of month or day of week, as in cron: the 15th, or any Monday
+        ("0 0 15 * 1", datetime(2021, 6, 8, 0, 0), datetime(2021, 6, 14, 0, 0)),
+        ("0 0 15 * 1", datetime(2021, 6, 14, 0, 0), datetime(2021, 6, 15, 0, 0)),
+        # A field starting with "*" counts as unrestricted, so both must match: odd
+        # days which are Mondays
+        ("0 0 */2 * 1", datetime(2021, 6, 1, 0, 0), datetime(2021, 6, 7, 0, 0)),
+    ],
+)
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_next_after_a_schedule_which_never_fires():
+    with pytest.raises(ValueError, match="never fires"):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2021, 1, 1))
@@ -0,0 +1,49 @@
+"""
+Tests for loading and saving CSV, tools/pandas/csv_file.py
+"""
+import pandas as pd
+import pytest
+
+from tools.pandas.csv_file import CsvFile
+
+
+@pytest.fixture
+def csv_path(tmp_path, titanic_data) -> str:
+    path = tmp_path / "titanic.csv"
+    titanic_data.to_csv(path, index=False)
+
+    return str(path)
+
+
+def test_load(csv_path, titanic_data):
+    pd.testing.assert_frame_equal(CsvFile(filepath=csv_path).load(), titanic_data)
+
+
+def test_load_typed_and_pruned_columns(csv_path, titanic_data):
+    loaded = CsvFile(
+        filepath=csv_path,
+        load_args={
+            "usecols": ["Pclass", "Sex", "Fare"],
+            "dtype": {"Pclass": "int8", "Sex": "category", "Fare": "float32"},
+        },
+    ).load()
+
+    assert list(loaded.columns) == ["Pclass", "Sex", "Fare"]
+    assert loaded.dtypes.astype(str).tolist() == ["int8", "category", "float32"]
+    assert loaded["Sex"].tolist() == titanic_data["Sex"].tolist()
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_iter_load_in_chunks(csv_path, titanic_data, engine):
+    tool = CsvFile(filepath=csv_path, load_args={"chunksize": 4, "engine": engine})
+
+    chunks = list(tool.iter_load())
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), titanic_data)
+
+
+def test_load_ignores_chunksize(csv_path, titanic_data):
+    loaded = CsvFile(filepath=csv_path, load_args={"chunksize": 4}).load()
+
+    pd.testing.assert_frame_equal(loaded, titanic_data)
@@ -0,0 +1,132 @@
+"""
+Tests for the HTTP Range handling of wait_staff/downloads.py
+"""
+import asyncio
+import uuid
+
+import fsspec
+import pytest
+
+from wait_staff.downloads import (
+    RangeNotSatisfiable,
+    entity_tag,
+    parse_byte_range,
+    serve_dish,
+)
+
+
+@pytest.mark.parametrize(
+    "range_header, expected",
+    [
+        ("bytes=0-499", (0, 499)),
+        ("bytes=500-", (500, 999)),
+        ("bytes=-500", (500, 999)),
+        # The end is clamped to the last byte of the file
+        ("bytes=900-2000", (900, 999)),
+        ("bytes=-2000", (0, 999)),
+        (" bytes=10-10 ", (10, 10)),
+    ],
+)
+def test_parse_byte_range(range_header, expected):
+    assert parse_byte_range(range_header, size=1000) == expected
+
+
+@pytest.mark.parametrize(
+    "range_header",
+    [
+        # Several ranges, or headers which can't be parsed, are ignored
+        "bytes=0-1,5-9",
+        "bytes=-",
+        "items=0-10",
+        "bytes=a-b",
+        # A last byte before the first is invalid, so ignored too
+        "bytes=500-100",
+    ],
+)
+def test_parse_byte_range_sends_the_whole_file(range_header):
+    assert parse_byte_range(range_header, size=1000) is None
+
+
+@pytest.mark.parametrize(
+    "range_header, size",
+    [
+        ("bytes=1000-", 1000),
+        ("bytes=1000-1500", 1000),
+        ("bytes=-0", 1000),
+        # An empty file has no first byte, and no last N bytes
+        ("bytes=0-", 0),
+        ("bytes=-500", 0),
+    ],
+)
+def test_parse_byte_range_not_satisfiable(range_header, size):
+    with pytest.raises(RangeNotSatisfiable) as error:
+        parse_byte_range(range_header, size=size)
+
+    assert error.value.size == size
+
+
+@pytest.fixture
+def memory_dish():
+    """
+    A dish on a file system which streams it through the server, rather than sendfile
+    """
+    location = f"memory:///downloads/{uuid.uuid4().hex}/dish.csv"
+    with fsspec.open(location, "wb") as file:
+        file.write(b"0123456789")
+
+    yield location
+
+    fsspec.filesystem("memory").rm(location)
+
+
+def body(response):
+    """
+    Read the whole body of a StreamingResponse
+    """
+
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(read())
+
+
+def test_serve_dish_sends_a_range(memory_dish):
+    response = serve_dish(location=memory_dish, range_header="bytes=2-4")
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 2-4/10"
+    assert body(response) == b"234"
+
+
+def test_serve_dish_resumes_an_unchanged_file(memory_dish):
+    etag = serve_dish(location=memory_dish).headers["ETag"]
+
+    response = serve_dish(location=memory_dish, range_header="bytes=5-", if_range=etag)
+
+    assert response.status_code == 206
+    assert body(response) == b"56789"
+
+
+def test_serve_dish_sends_a_rewritten_file_whole(memory_dish):
+    etag = serve_dish(location=memory_dish).headers["ETag"]
+    with fsspec.open(memory_dish, "wb") as file:
+        file.write(b"abcdefghijkl")
+
+    response = serve_dish(location=memory_dish, range_header="bytes=5-", if_range=etag)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert body(response) == b"abcdefghijkl"
+
+
+@pytest.mark.parametrize(
+    "info, expected",
+    [
+        ({"size": 10, "ETag": '"abc"', "LastModified": 1.0}, '"abc"'),
+        ({"size": 10, "etag": "abc"}, '"abc"'),
+        ({"size": 10, "mtime": 1.5}, '"1.5-10"'),
+        ({"size": 10}, None),
+    ],
+)
+def test_entity_tag(info, expected):
+    assert entity_tag(info) == expected
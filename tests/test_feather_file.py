@@ -0,0 +1,55 @@
+"""
+Tests for loading and saving Arrow tables, tools/arrow/feather_file.py
+"""
+import pyarrow as pa
+import pytest
+
+from tools.arrow.feather_file import FeatherFile
+
+
+@pytest.fixture
+def table(titanic_data) -> pa.Table:
+    return pa.Table.from_pandas(titanic_data, preserve_index=False)
+
+
+@pytest.mark.parametrize("compression", ["uncompressed", "zstd"])
+def test_save_and_load(tmp_path, table, compression):
+    tool = FeatherFile(
+        filepath=str(tmp_path / "titanic.feather"),
+        save_args={"compression": compression},
+    )
+
+    tool.save(data=table)
+
+    assert tool.load().equals(table)
+
+
+def test_local_files_are_memory_mapped(tmp_path, table):
+    tool = FeatherFile(filepath=str(tmp_path / "titanic.feather"))
+    tool.save(data=table)
+
+    allocated = pa.total_allocated_bytes()
+    loaded = tool.load()
+
+    # Nothing is read into memory allocated by Arrow
+    assert pa.total_allocated_bytes() == allocated
+    assert loaded.equals(table)
+
+
+def test_save_dataframes_and_load_in_batches(tmp_path, titanic_data, table):
+    tool = FeatherFile(filepath=str(tmp_path / "titanic.feather"))
+
+    tool.save_batches(batches=[titanic_data.head(4), titanic_data.tail(2)])
+    batches = list(tool.iter_load())
+
+    assert [batch.num_rows for batch in batches] == [4, 2]
+    assert pa.Table.from_batches(batches).equals(table)
+
+
+def test_save_and_load_on_another_file_system(table):
+    tool = FeatherFile(filepath="memory://kitchen/titanic.feather")
+
+    tool.save(data=table)
+
+    assert tool.load().equals(table)
+    assert pa.Table.from_batches(list(tool.iter_load())).equals(table)
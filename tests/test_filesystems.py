@@ -0,0 +1,35 @@
+"""
+Tests for the shared file systems, tools/filesystems.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.filesystems import FilesystemPool
+from tools.pandas.csv_file import CsvFile
+
+
+def test_one_file_system_per_protocol_and_credentials():
+    pool = FilesystemPool()
+
+    local = pool.get("file")
+    assert pool.get("file") is local
+    assert pool.get("file", auto_mkdir=True) is not local
+    assert pool.get("memory") is not local
+
+    assert pool.stats() == {"hits": 1, "misses": 3, "created": 3, "pooled": 3}
+
+
+def test_concurrent_first_uses_create_one_file_system():
+    pool = FilesystemPool()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        filesystems = list(executor.map(lambda _: pool.get("memory"), range(32)))
+
+    assert all(filesystem is filesystems[0] for filesystem in filesystems)
+    assert pool.stats()["created"] == 1
+
+
+def test_tools_share_file_systems(tmp_path):
+    first = CsvFile(filepath=str(tmp_path / "first.csv"))
+    second = CsvFile(filepath=str(tmp_path / "second.csv"))
+
+    assert first.filesystem is second.filesystem
@@ -0,0 +1,91 @@
+"""
+Tests for the index of objects in each frame, of window_display/frame_index.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from window_display.frame_index import FrameIndex
+
+
+def original_summary(metadata: pd.DataFrame) -> pd.DataFrame:
+    """
+    The summary as the custom display built it before FrameIndex, to compare against
+    """
+    one_hot_encoded = pd.get_dummies(metadata[["frame", "label"]], columns=["label"])
+    summary = (
+        one_hot_encoded.groupby(["frame"])
+        .sum()
+        .rename(
+            columns={
+                "label_biker": "biker",
+                "label_car": "car",
+                "label_pedestrian": "pedestrian",
+                "label_trafficLight": "traffic light",
+                "label_truck": "truck",
+            }
+        )
+    )
+    return summary
+
+
+def original_selected_frames(summary, label, min_elts, max_elts):
+    """
+    The frames selected by the custom display before FrameIndex
+    """
+    return summary[
+        np.logical_and(summary[label] >= min_elts, summary[label] <= max_elts)
+    ].index
+
+
+@pytest.fixture
+def labels() -> pd.DataFrame:
+    """
+    Labels of objects in frames, with counts from 0 to 9 of each label in a frame
+    """
+    random = np.random.default_rng(42)
+    label_names = ["biker", "car", "pedestrian", "trafficLight", "truck"]
+
+    rows = [
+        (f"frame_{frame:03}.jpg", label)
+        for frame in random.permutation(100)
+        for label in label_names
+        for _ in range(random.integers(0, 10))
+    ]
+
+    return pd.DataFrame(rows, columns=["frame", "label"])
+
+
+def test_summary_matches_the_original_summary(labels):
+    expected = original_summary(labels)
+    summary = FrameIndex.from_labels(labels).summary()
+
+    pd.testing.assert_frame_equal(summary, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("label", ["biker", "car", "pedestrian", "traffic light"])
+@pytest.mark.parametrize("min_count, max_count", [(0, 9), (0, 0), (3, 5), (9, 9)])
+def test_select_matches_the_original_selection(labels, label, min_count, max_count):
+    frame_index = FrameIndex.from_labels(labels)
+    expected = original_selected_frames(
+        original_summary(labels), label, min_count, max_count
+    )
+
+    positions = frame_index.select(label, min_count, max_count)
+
+    assert frame_index.frames[positions].tolist() == expected.tolist()
+
+
+def test_select_outside_the_counts(labels):
+    frame_index = FrameIndex.from_labels(labels)
+
+    assert len(frame_index.select("car", 10, 20)) == 0
+    assert len(frame_index.select("car", 5, 4)) == 0
+
+
+def test_to_frame_round_trips(labels):
+    frame_index = FrameIndex.from_labels(labels)
+    round_tripped = FrameIndex(index=frame_index.to_frame())
+
+    assert round_tripped.labels == frame_index.labels
+    pd.testing.assert_frame_equal(round_tripped.summary(), frame_index.summary())
@@ -0,0 +1,154 @@
+"""
+Tests for cooking only what has changed, head_chef/head_chef.py
+"""
+import pandas as pd
+import pytest
+
+from head_chef.head_chef import HeadChef, fingerprint_location
+from sous_chef.sous_chef import SousChef
+
+
+class CopyChef(HeadChef):
+    """
+    Copies the training data, counting how many times it cooked
+    """
+
+    dishes = ("copied",)
+    ingredients_needed = ("train",)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.cooked = 0
+
+    def cook(self):
+        self.cooked += 1
+        self.dish_tool("copied").save(data=self.ingredients["train"])
+
+        return self.ingredients["train"]
+
+
+@pytest.fixture
+def kitchen(tmp_path, titanic_data, write_ingredients, write_full_course):
+    """
+    Two CSV ingredients, of which CopyChef needs one, and the full course
+    """
+    titanic_data.to_csv(tmp_path / "train.csv", index=False)
+    titanic_data.to_csv(tmp_path / "test.csv", index=False)
+
+    ingredients = write_ingredients(
+        **{
+            name: {
+                "location": str(tmp_path / f"{name}.csv"),
+                "file_format": "csv_file",
+                "python_format": "pandas",
+            }
+            for name in ("train", "test")
+        }
+    )
+    full_course = write_full_course(
+        copied={
+            "location": str(tmp_path / "copied.csv"),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+            "parameters": {"copies": 1},
+        }
+    )
+
+    return ingredients, full_course
+
+
+def copy_chef(kitchen) -> CopyChef:
+    ingredients, full_course = kitchen
+
+    return CopyChef(
+        full_course=full_course,
+        sous_chef=SousChef(ingredients=ingredients, pantry=None),
+    )
+
+
+def test_serve_cooks_once_until_something_changes(tmp_path, kitchen, titanic_data):
+    chef = copy_chef(kitchen)
+
+    assert not chef.is_fresh()
+    pd.testing.assert_frame_equal(chef.serve(), titanic_data)
+    assert (tmp_path / fingerprint_location("copied.csv")).exists()
+
+    chef = copy_chef(kitchen)
+    assert chef.is_fresh()
+    assert chef.serve() is None
+    assert chef.cooked == 0
+
+    chef.serve(force=True)
+    assert chef.cooked == 1
+
+
+def test_a_changed_ingredient_is_cooked_again(tmp_path, kitchen, titanic_data):
+    copy_chef(kitchen).serve()
+
+    titanic_data.head(2).to_csv(tmp_path / "train.csv", index=False)
+
+    chef = copy_chef(kitchen)
+    assert not chef.is_fresh()
+    pd.testing.assert_frame_equal(chef.serve(), titanic_data.head(2))
+
+
+def test_ingredients_not_needed_are_not_part_of_the_fingerprint(
+    tmp_path, kitchen, titanic_data
+):
+    copy_chef(kitchen).serve()
+
+    titanic_data.head(2).to_csv(tmp_path / "test.csv", index=False)
+
+    assert copy_chef(kitchen).is_fresh()
+
+
+def test_a_changed_dish_is_cooked_again(tmp_path, kitchen, titanic_data):
+    copy_chef(kitchen).serve()
+
+    titanic_data.head(1).to_csv(tmp_path / "copied.csv", index=False)
+    assert not copy_chef(kitchen).is_fresh()
+
+    (tmp_path / "copied.csv").unlink()
+    assert not copy_chef(kitchen).is_fresh()
+
+
+def test_a_missing_fingerprint_is_cooked_again(tmp_path, kitchen):
+    copy_chef(kitchen).serve()
+
+    (tmp_path / fingerprint_location("copied.csv")).unlink()
+
+    assert not copy_chef(kitchen).is_fresh()
+
+
+def test_changed_instructions_are_cooked_again(kitchen, write_full_course):
+    _, full_course = kitchen
+    copy_chef(kitchen).serve()
+
+    dish = {
+        "location": str(full_course.parent / "copied.csv"),
+        "python_format": "pandas",
+        "file_format": "csv_file",
+    }
+    write_full_course(copied={**dish, "parameters": {"copies": 2}})
+
+    assert not copy_chef(kitchen).is_fresh()
+
+
+def test_changed_code_is_cooked_again(kitchen, monkeypatch):
+    copy_chef(kitchen).serve()
+
+    monkeypatch.setattr(
+        CopyChef, "fingerprint_extras", lambda self: {"test_head_chef": "edited"}
+    )
+
+    assert not copy_chef(kitchen).is_fresh()
+
+
+def test_only_the_ingredients_cook_uses_are_prepared(kitchen):
+    chef = copy_chef(kitchen)
+    assert not any(chef.ingredients.is_prepared(name) for name in chef.ingredients)
+
+    chef.serve()
+
+    assert chef.ingredients.is_prepared("train")
+    assert not chef.ingredients.is_prepared("test")
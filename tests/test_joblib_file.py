@@ -0,0 +1,66 @@
+"""
+Tests for loading and saving models, tools/scikit/joblib_file.py
+"""
+import numpy as np
+import pytest
+
+from sklearn.ensemble import RandomForestClassifier
+
+from tools.scikit.joblib_file import JoblibFile
+
+
+@pytest.fixture
+def model(titanic_data) -> RandomForestClassifier:
+    return RandomForestClassifier(n_estimators=5, random_state=42).fit(
+        titanic_data[["Pclass", "Fare"]], titanic_data["Survived"]
+    )
+
+
+@pytest.mark.parametrize("compress", [0, 3])
+def test_save_and_load(tmp_path, titanic_data, model, compress):
+    tool = JoblibFile(
+        filepath=str(tmp_path / "model.job"), save_args={"compress": compress}
+    )
+
+    tool.save(data=model)
+    loaded = tool.load()
+
+    features = titanic_data[["Pclass", "Fare"]]
+    np.testing.assert_array_equal(loaded.predict(features), model.predict(features))
+
+
+def test_load_memory_mapped(tmp_path):
+    arrays = {"weights": np.arange(1_000, dtype=np.float64)}
+    tool = JoblibFile(
+        filepath=str(tmp_path / "arrays.job"), load_args={"mmap_mode": "r"}
+    )
+
+    tool.save(data=arrays)
+    loaded = tool.load()
+
+    assert isinstance(loaded["weights"], np.memmap)
+    np.testing.assert_array_equal(loaded["weights"], arrays["weights"])
+
+
+def test_remote_files_are_cached_locally_to_memory_map(tmp_path):
+    arrays = {"weights": np.arange(1_000, dtype=np.float64)}
+    cache = tmp_path / "cache"
+    tool = JoblibFile(
+        filepath="memory://kitchen/arrays.job",
+        load_args={"mmap_mode": "r", "cache_storage": str(cache)},
+    )
+
+    tool.save(data=arrays)
+    loaded = tool.load()
+
+    assert isinstance(loaded["weights"], np.memmap)
+    assert any(cache.iterdir())
+    np.testing.assert_array_equal(loaded["weights"], arrays["weights"])
+
+
+def test_remote_files_are_streamed_without_memory_mapping():
+    tool = JoblibFile(filepath="memory://kitchen/streamed.job")
+
+    tool.save(data={"weights": np.arange(3)})
+
+    np.testing.assert_array_equal(tool.load()["weights"], np.arange(3))
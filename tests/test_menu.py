@@ -0,0 +1,81 @@
+"""
+Tests for the catalog of dishes, wait_staff/menu.py
+"""
+import time
+
+from wait_staff.menu import Menu, artifact_version
+
+
+def test_artifact_version(tmp_path, titanic_data):
+    path = tmp_path / "results.csv"
+    assert artifact_version(path) is None
+
+    titanic_data.to_csv(path, index=False)
+    version = artifact_version(path)
+    assert version is not None and artifact_version(path) == version
+
+    titanic_data.head(2).to_csv(path, index=False)
+    assert artifact_version(path) != version
+
+
+def test_artifact_version_of_a_directory_changes_with_the_files_in_it(
+    tmp_path, titanic_data
+):
+    dataset = tmp_path / "results"
+    (dataset / "Pclass=1").mkdir(parents=True)
+    titanic_data.to_parquet(dataset / "Pclass=1" / "part-0.parquet")
+    version = artifact_version(dataset)
+
+    (dataset / "Pclass=2").mkdir()
+    titanic_data.to_parquet(dataset / "Pclass=2" / "part-0.parquet")
+
+    assert artifact_version(dataset) != version
+
+
+def test_artifact_version_never_raises(monkeypatch):
+    def unreachable(protocol, **credentials):
+        raise ImportError(f"Install {protocol}fs to access {protocol}")
+
+    monkeypatch.setattr("wait_staff.menu.get_filesystem", unreachable)
+
+    assert artifact_version("s3://bucket/results.csv") is None
+
+
+def test_menu_refreshes_when_the_full_course_or_a_dish_changes(
+    tmp_path, titanic_data, write_full_course
+):
+    results = tmp_path / "results.csv"
+    full_course = write_full_course(
+        model_results={
+            "location": str(results),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+        }
+    )
+    menu = Menu(full_course=full_course, refresh_interval=0.0)
+
+    assert list(menu.courses) == ["model_results"]
+    assert menu.versions == {"model_results": None}
+    assert not menu.refresh()
+
+    titanic_data.to_csv(results, index=False)
+    assert menu.refresh()
+    assert menu.versions["model_results"] is not None
+
+    # A newer modification time, so the YAML file is read again
+    time.sleep(0.01)
+    write_full_course(
+        model_results={
+            "location": str(results),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+        },
+        classifier_model={
+            "location": str(tmp_path / "model.job"),
+            "python_format": "scikit",
+            "file_format": "joblib_file",
+        },
+    )
+    assert menu.refresh()
+    assert list(menu.courses) == ["model_results", "classifier_model"]
+    assert menu.versions["classifier_model"] is None
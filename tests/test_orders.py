@@ -0,0 +1,93 @@
+"""
+Tests for cooking orders in the background, wait_staff/orders.py
+"""
+import asyncio
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from wait_staff import orders
+from wait_staff.orders import OrderQueue, chef_class
+
+
+def cook_slowly(chef, force, connection):
+    """
+    Stands in for cook_order: starts a worker, as joblib would, then takes its time
+    """
+    worker = subprocess.Popen(["sleep", "60"])
+    Path(os.environ["WORKER_PID_FILE"]).write_text(str(worker.pid))
+    time.sleep(60)
+
+
+def is_running(pid: int) -> bool:
+    """
+    Check whether a process is running, counting zombies waiting to be reaped as dead
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_chef_class_is_named_after_its_module():
+    assert chef_class("rf_model_chef").__name__ == "RfModelChef"
+
+    with pytest.raises(ValueError, match="There is no chef named 'sushi_chef'"):
+        chef_class("sushi_chef")
+
+
+def test_orders_for_a_waiting_chef_are_merged():
+    async def order():
+        order_queue = OrderQueue()
+
+        first = order_queue.submit(chef="rf_model_chef")
+        merged = order_queue.submit(chef="rf_model_chef", force=True)
+
+        assert merged is first
+        assert (first.requests, first.force) == (2, True)
+        assert len(order_queue.orders) == 1
+
+        # Cancelled before it started cooking
+        order_queue.cancel(first.order_id)
+        await asyncio.sleep(0)
+
+        assert first.status == "cancelled"
+        assert first.started_at is None
+
+    asyncio.run(order())
+
+
+def test_cancel_stops_the_chef_and_its_workers(tmp_path, monkeypatch):
+    pid_file = tmp_path / "worker.pid"
+    monkeypatch.setenv("WORKER_PID_FILE", str(pid_file))
+    monkeypatch.setattr(orders, "cook_order", cook_slowly)
+
+    async def order():
+        order_queue = OrderQueue()
+        order = order_queue.submit(chef="rf_model_chef")
+        task = order_queue._tasks[order.order_id]
+
+        for _ in range(300):
+            if pid_file.exists() and pid_file.read_text():
+                break
+            await asyncio.sleep(0.1)
+
+        assert order.status == "cooking"
+        order_queue.cancel(order.order_id)
+        await asyncio.wait_for(task, timeout=30)
+
+        return order, int(pid_file.read_text())
+
+    order, worker_pid = asyncio.run(order())
+
+    assert order.status == "cancelled"
+    for _ in range(50):
+        if not is_running(worker_pid):
+            break
+        time.sleep(0.1)
+
+    assert not is_running(worker_pid)
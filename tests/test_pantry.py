@@ -0,0 +1,184 @@
+"""
+Tests for the cache of prepared ingredients, sous_chef/pantry.py
+"""
+import os
+import stat
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from sous_chef.pantry import Pantry
+from sous_chef.sous_chef import SousChef
+from tools.pandas.csv_file import CsvFile
+from tools.pandas.parquet_file import ParquetFile
+from wait_staff.data_models import Ingredient
+
+
+@pytest.fixture
+def pantry(tmp_path) -> Pantry:
+    return Pantry(directory=tmp_path / "pantry")
+
+
+@pytest.fixture
+def count_loads(monkeypatch):
+    """
+    Count how many times each tool class loads its data
+    """
+    loads = {CsvFile: 0, ParquetFile: 0}
+
+    for tool in loads:
+
+        def load(self, tool=tool, original=tool.load):
+            loads[tool] += 1
+            return original(self)
+
+        monkeypatch.setattr(tool, "load", load)
+
+    return loads
+
+
+def test_stock_and_fetch_a_dataframe(pantry, titanic_data):
+    pantry.stock(key="titanic", data=titanic_data)
+    in_pantry, fetched = pantry.fetch(key="titanic")
+
+    assert in_pantry
+    pd.testing.assert_frame_equal(fetched, titanic_data)
+
+
+def test_stock_and_fetch_a_table(pantry, titanic_data):
+    table = pa.Table.from_pandas(titanic_data, preserve_index=False)
+
+    pantry.stock(key="titanic", data=table)
+    in_pantry, fetched = pantry.fetch(key="titanic")
+
+    assert in_pantry
+    assert fetched.equals(table)
+
+
+@pytest.mark.parametrize("data", [{"not": "a table"}, [1, 2, 3], "text"])
+def test_only_tables_are_stocked(pantry, data):
+    pantry.stock(key="other", data=data)
+
+    assert pantry.fetch(key="other") == (False, None)
+    assert list(pantry.directory.iterdir()) == []
+
+
+def test_fetch_what_was_never_stocked(pantry):
+    assert pantry.fetch(key="missing") == (False, None)
+
+
+def test_label_changes_with_the_source_and_how_it_is_loaded(tmp_path):
+    ingredient = Ingredient(
+        location=str(tmp_path / "train.csv"),
+        file_format="csv_file",
+        python_format="pandas",
+    )
+    tool = CsvFile(filepath=str(tmp_path / "train.csv"))
+    label = Pantry.label(ingredient=ingredient, tool=tool, checksum="1")
+
+    assert Pantry.label(ingredient=ingredient, tool=tool, checksum="1") == label
+    assert Pantry.label(ingredient=ingredient, tool=tool, checksum="2") != label
+
+    projected = ingredient.model_copy(update={"load_args": {"usecols": ["Age"]}})
+    assert Pantry.label(ingredient=projected, tool=tool, checksum="1") != label
+
+
+def test_least_recently_used_ingredients_are_evicted(pantry, titanic_data):
+    for key in ("first", "second"):
+        pantry.stock(key=key, data=titanic_data)
+
+    # Stocked long ago, the first before the second
+    first, second = sorted(pantry.directory.iterdir())
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+
+    # Using the first makes the second the least recently used
+    assert pantry.fetch(key="first")[0]
+
+    pantry.max_size = first.stat().st_size + second.stat().st_size
+    pantry.stock(key="third", data=titanic_data)
+
+    assert pantry.fetch(key="first")[0]
+    assert not pantry.fetch(key="second")[0]
+    assert pantry.fetch(key="third")[0]
+
+
+def test_pantry_directory_is_private_to_the_user(pantry):
+    assert pantry.is_secure()
+    assert stat.S_IMODE(pantry.directory.stat().st_mode) == 0o700
+
+
+def test_pantry_others_can_write_to_is_not_used(pantry, titanic_data):
+    pantry.directory.mkdir()
+    pantry.directory.chmod(0o777)
+
+    pantry.stock(key="titanic", data=titanic_data)
+
+    assert not pantry.is_secure()
+    assert pantry.fetch(key="titanic") == (False, None)
+    assert list(pantry.directory.iterdir()) == []
+
+
+def test_pantry_which_is_a_symlink_is_not_used(tmp_path):
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    (tmp_path / "pantry").symlink_to(private)
+
+    assert not Pantry(directory=tmp_path / "pantry").is_secure()
+
+
+def test_ingredient_is_extracted_again_only_when_its_source_changes(
+    tmp_path, pantry, titanic_data, write_ingredients, count_loads
+):
+    titanic_data.to_csv(tmp_path / "train.csv", index=False)
+    ingredients = write_ingredients(
+        train={
+            "location": str(tmp_path / "train.csv"),
+            "file_format": "csv_file",
+            "python_format": "pandas",
+        }
+    )
+    sous_chef = SousChef(ingredients=ingredients, pantry=pantry)
+
+    for _ in range(2):
+        prepared = sous_chef.prepare_ingredients()
+        pd.testing.assert_frame_equal(prepared["train"], titanic_data)
+    assert count_loads[CsvFile] == 1
+
+    titanic_data.head(2).to_csv(tmp_path / "train.csv", index=False)
+
+    prepared = sous_chef.prepare_ingredients()
+    pd.testing.assert_frame_equal(prepared["train"], titanic_data.head(2))
+    assert count_loads[CsvFile] == 2
+
+
+def test_directory_source_is_extracted_again_when_a_file_in_it_changes(
+    tmp_path, pantry, titanic_data, write_ingredients, count_loads
+):
+    dataset = tmp_path / "train"
+    dataset.mkdir()
+    titanic_data.head(3).to_parquet(dataset / "part-0.parquet", index=False)
+
+    ingredients = write_ingredients(
+        train={
+            "location": str(dataset),
+            "file_format": "parquet_file",
+            "python_format": "pandas",
+        }
+    )
+    sous_chef = SousChef(ingredients=ingredients, pantry=pantry)
+
+    assert len(sous_chef.prepare_ingredients()["train"]) == 3
+    assert len(sous_chef.prepare_ingredients()["train"]) == 3
+    assert count_loads[ParquetFile] == 1
+
+    # A file added to the directory
+    titanic_data.tail(3).to_parquet(dataset / "part-1.parquet", index=False)
+    assert len(sous_chef.prepare_ingredients()["train"]) == 6
+    assert count_loads[ParquetFile] == 2
+
+    # A file in the directory rewritten
+    titanic_data.head(1).to_parquet(dataset / "part-0.parquet", index=False)
+    assert len(sous_chef.prepare_ingredients()["train"]) == 4
+    assert count_loads[ParquetFile] == 3
@@ -0,0 +1,153 @@
+"""
+Tests for loading and saving Parquet, tools/pandas/parquet_file.py
+"""
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from tools.pandas.parquet_file import ParquetFile
+
+
+@pytest.fixture
+def parquet_path(tmp_path, titanic_data) -> str:
+    path = tmp_path / "titanic.parquet"
+    titanic_data.to_parquet(path, index=False, row_group_size=2)
+
+    return str(path)
+
+
+def test_load(parquet_path, titanic_data):
+    pd.testing.assert_frame_equal(
+        ParquetFile(filepath=parquet_path).load(), titanic_data
+    )
+
+
+def test_load_only_some_columns(parquet_path, titanic_data):
+    loaded = ParquetFile(
+        filepath=parquet_path, load_args={"columns": ["Sex", "Fare"]}
+    ).load()
+
+    pd.testing.assert_frame_equal(loaded, titanic_data[["Sex", "Fare"]])
+
+
+@pytest.mark.parametrize(
+    "row_filter, expected",
+    [
+        ([["Pclass", "==", 3]], lambda data: data["Pclass"] == 3),
+        (
+            [["Age", ">", 30], ["Sex", "==", "male"]],
+            lambda data: (data["Age"] > 30) & (data["Sex"] == "male"),
+        ),
+        # Disjunctive normal form: either condition
+        (
+            [[["Pclass", "==", 2]], [["Fare", "<", 8]]],
+            lambda data: (data["Pclass"] == 2) | (data["Fare"] < 8),
+        ),
+    ],
+)
+def test_load_only_matching_rows(parquet_path, titanic_data, row_filter, expected):
+    loaded = ParquetFile(filepath=parquet_path, load_args={"filter": row_filter}).load()
+
+    pd.testing.assert_frame_equal(
+        loaded, titanic_data[expected(titanic_data)].reset_index(drop=True)
+    )
+
+
+def test_iter_load_projects_and_filters_each_batch(parquet_path, titanic_data):
+    tool = ParquetFile(
+        filepath=parquet_path,
+        load_args={
+            "columns": ["PassengerId", "Pclass"],
+            "filter": [["Pclass", "!=", 2]],
+            "batch_size": 2,
+        },
+    )
+
+    batches = list(tool.iter_load())
+
+    assert all(len(batch) <= 2 for batch in batches)
+    pd.testing.assert_frame_equal(
+        pd.concat(batches, ignore_index=True),
+        titanic_data.loc[
+            titanic_data["Pclass"] != 2, ["PassengerId", "Pclass"]
+        ].reset_index(drop=True),
+    )
+
+
+def load_sorted(path: str) -> pd.DataFrame:
+    """
+    Load a partitioned dataset in PassengerId order, with plain partition columns
+    """
+    loaded = ParquetFile(filepath=path).load()
+    loaded["Pclass"] = loaded["Pclass"].astype("int64")
+
+    return loaded.sort_values("PassengerId").reset_index(drop=True)
+
+
+def test_save_with_row_groups_and_compression(tmp_path, titanic_data):
+    path = str(tmp_path / "saved.parquet")
+    tool = ParquetFile(
+        filepath=path, save_args={"row_group_size": 4, "compression": "zstd"}
+    )
+
+    tool.save(data=titanic_data)
+
+    pd.testing.assert_frame_equal(tool.load(), titanic_data)
+    metadata = pq.ParquetFile(path).metadata
+    assert [metadata.row_group(group).num_rows for group in range(2)] == [4, 2]
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+@pytest.mark.parametrize("method", ["save", "save_batches"])
+def test_save_partitioned_replaces_earlier_partitions(tmp_path, titanic_data, method):
+    path = str(tmp_path / "partitioned")
+    tool = ParquetFile(filepath=path, save_args={"partition_cols": ["Pclass"]})
+
+    def save(data):
+        if method == "save":
+            tool.save(data=data)
+        else:
+            tool.save_batches(batches=[data.head(1), data.iloc[1:]])
+
+    save(titanic_data)
+    assert sorted(path.name for path in (tmp_path / "partitioned").iterdir()) == [
+        "Pclass=1",
+        "Pclass=2",
+        "Pclass=3",
+    ]
+    loaded = load_sorted(path)
+    pd.testing.assert_frame_equal(loaded, titanic_data[loaded.columns])
+
+    # Saved again without any rows in Pclass=2
+    fewer_classes = titanic_data[titanic_data["Pclass"] != 2]
+    save(fewer_classes)
+
+    assert not (tmp_path / "partitioned" / "Pclass=2").exists()
+    loaded = load_sorted(path)
+    pd.testing.assert_frame_equal(
+        loaded, fewer_classes[loaded.columns].reset_index(drop=True)
+    )
+
+
+def test_save_batches_in_whole_row_groups(tmp_path):
+    path = str(tmp_path / "batched.parquet")
+    data = pd.DataFrame({"number": range(1_000)})
+    tool = ParquetFile(filepath=path, save_args={"row_group_size": 300})
+
+    tool.save_batches(
+        batches=[data.iloc[start : start + 250] for start in range(0, 1_000, 250)]
+    )
+
+    metadata = pq.ParquetFile(path).metadata
+    assert [
+        metadata.row_group(group).num_rows for group in range(metadata.num_row_groups)
+    ] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(tool.load(), data)
+
+
+def test_save_no_batches(tmp_path):
+    tool = ParquetFile(filepath=str(tmp_path / "empty.parquet"))
+
+    tool.save_batches(batches=iter([]))
+
+    assert tool.load().empty
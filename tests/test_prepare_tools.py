@@ -0,0 +1,58 @@
+"""
+Tests for finding the tool for each format, tools/prepare_tools.py
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from tools.prepare_tools import available_tools, prepare_tools, validate_tool
+from wait_staff.startup_benchmark import heavy_imports, measure_import_time
+
+KITCHEN_DIR = Path(__file__).parents[1]
+
+
+def test_available_tools():
+    tools = available_tools()
+
+    assert tools[("pandas", "csv_file")] == "tools.pandas.csv_file"
+    assert tools[("arrow", "feather_file")] == "tools.arrow.feather_file"
+    assert all(python_format != "__pycache__" for python_format, _ in tools)
+
+
+def test_tools_are_found_without_importing_them():
+    found = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from tools.prepare_tools import available_tools, "
+            "validate_tool; available_tools(); "
+            "validate_tool(python_format='pandas', file_format='parquet_file'); "
+            "print(sorted(name for name in sys.modules if name.startswith('tools.')))",
+        ],
+        cwd=KITCHEN_DIR,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert found.stdout.strip() == "['tools.prepare_tools']"
+
+
+def test_prepare_tools_imports_the_tool_class():
+    tool = prepare_tools(python_format="pandas", file_format="csv_file")
+
+    assert tool.__module__ == "tools.pandas.csv_file"
+    assert tool.__name__ == "CsvFile"
+
+
+def test_unknown_tools_are_rejected():
+    with pytest.raises(ValueError, match="pandas.csv_file"):
+        validate_tool(python_format="pandas", file_format="xlsx_file")
+
+
+def test_server_starts_without_data_science_libraries(monkeypatch):
+    monkeypatch.chdir(KITCHEN_DIR)
+
+    assert heavy_imports(measure_import_time("wait_staff.server")) == dict()
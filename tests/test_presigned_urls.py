@@ -0,0 +1,56 @@
+"""
+Tests for signing download links, wait_staff/presigned_urls.py
+"""
+import pytest
+
+from wait_staff import presigned_urls
+from wait_staff.presigned_urls import PresignedUrlCache, create_presigned_url
+
+
+@pytest.fixture
+def signed(monkeypatch):
+    """
+    Sign URLs without a file system which can, recording every signature
+    """
+    signatures = list()
+
+    def sign(filepath, expiration):
+        signatures.append(filepath)
+        return f"https://signed/{filepath}?signature={len(signatures)}"
+
+    monkeypatch.setattr(presigned_urls, "create_presigned_url", sign)
+
+    return signatures
+
+
+def test_file_systems_which_cannot_sign_urls(tmp_path):
+    with pytest.raises(NotImplementedError):
+        create_presigned_url(filepath=str(tmp_path / "model.job"))
+
+
+def test_urls_are_reused_until_shortly_before_they_expire(signed, monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(presigned_urls.time, "monotonic", lambda: now[0])
+    cache = PresignedUrlCache(expiration=120, margin=20)
+
+    url, remaining = cache.get("s3://bucket/model.job", version="1")
+    assert remaining == 100
+
+    now[0] += 90
+    assert cache.get("s3://bucket/model.job", version="1") == (url, 10)
+    assert len(signed) == 1
+
+    # Too close to expiring to hand out
+    now[0] += 10
+    assert cache.get("s3://bucket/model.job", version="1")[0] != url
+    assert len(signed) == 2
+
+
+def test_a_new_version_is_signed_again(signed):
+    cache = PresignedUrlCache()
+
+    first, _ = cache.get("s3://bucket/model.job", version="1")
+    second, _ = cache.get("s3://bucket/model.job", version="2")
+
+    assert first != second
+    assert len(signed) == 2
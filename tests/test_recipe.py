@@ -0,0 +1,178 @@
+"""
+Tests for the cleaning recipes of head_chef/recipe.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from head_chef.recipe import Recipe
+
+RF_MODEL_RECIPE = Path(__file__).parents[1] / "head_chef" / "rf_model_recipe.yaml"
+
+
+def original_clean(data_to_clean: pd.DataFrame) -> pd.DataFrame:
+    """
+    RfModelChef.clean() as it was before rf_model_recipe.yaml, to compare against
+    """
+    data_to_clean["Sex"] = (
+        data_to_clean["Sex"].map({"female": 0, "male": 1}).astype(int)
+    )
+
+    data_to_clean["Embarked"] = data_to_clean["Embarked"].fillna("S")
+    data_to_clean["Embarked"] = (
+        data_to_clean["Embarked"].map({"S": 0, "C": 1, "Q": 2}).astype(int)
+    )
+
+    data_to_clean["Fare"] = data_to_clean["Fare"].fillna(data_to_clean["Fare"].median())
+    data_to_clean.loc[data_to_clean["Fare"] <= 7.91, "Fare"] = 0
+    data_to_clean.loc[
+        (data_to_clean["Fare"] > 7.91) & (data_to_clean["Fare"] <= 14.454), "Fare"
+    ] = 1
+    data_to_clean.loc[
+        (data_to_clean["Fare"] > 14.454) & (data_to_clean["Fare"] <= 31), "Fare"
+    ] = 2
+    data_to_clean.loc[data_to_clean["Fare"] > 31, "Fare"] = 3
+    data_to_clean["Fare"] = data_to_clean["Fare"].astype(int)
+
+    data_to_clean.loc[data_to_clean["Age"] <= 16, "Age"] = 0
+    data_to_clean.loc[
+        (data_to_clean["Age"] > 16) & (data_to_clean["Age"] <= 32), "Age"
+    ] = 1
+    data_to_clean.loc[
+        (data_to_clean["Age"] > 32) & (data_to_clean["Age"] <= 48), "Age"
+    ] = 2
+    data_to_clean.loc[
+        (data_to_clean["Age"] > 48) & (data_to_clean["Age"] <= 64), "Age"
+    ] = 3
+    data_to_clean.loc[data_to_clean["Age"] > 64, "Age"] = 4
+
+    drop_elements = ["Name", "Ticket", "Cabin", "SibSp", "Parch", "PassengerId"]
+    data_to_clean.drop(drop_elements, axis=1, inplace=True)
+
+    data_to_clean.fillna(0, inplace=True)
+
+    return data_to_clean
+
+
+@pytest.fixture
+def titanic_data() -> pd.DataFrame:
+    """
+    Titanic-like data, with missing values, and values on every bin edge
+    """
+    random = np.random.default_rng(42)
+    n_rows = 200
+
+    fares = random.uniform(0, 100, n_rows).round(3)
+    fares[:4] = [7.91, 14.454, 31, 0]
+    fares[random.choice(n_rows, 20, replace=False)] = np.nan
+
+    ages = random.uniform(0, 80, n_rows).round(1)
+    ages[4:8] = [16, 32, 48, 64]
+    ages[random.choice(n_rows, 30, replace=False)] = np.nan
+
+    embarked = random.choice(np.array(["S", "C", "Q", None], dtype=object), n_rows)
+
+    return pd.DataFrame(
+        {
+            "PassengerId": np.arange(n_rows),
+            "Survived": random.integers(0, 2, n_rows),
+            "Pclass": random.integers(1, 4, n_rows),
+            "Name": [f"Passenger {number}" for number in range(n_rows)],
+            "Sex": random.choice(["female", "male"], n_rows),
+            "Age": ages,
+            "SibSp": random.integers(0, 4, n_rows),
+            "Parch": random.integers(0, 3, n_rows),
+            "Ticket": [f"T{number}" for number in range(n_rows)],
+            "Fare": fares,
+            "Cabin": random.choice(np.array(["C85", None], dtype=object), n_rows),
+            "Embarked": embarked,
+        }
+    )
+
+
+def test_rf_model_recipe_matches_the_original_clean(titanic_data):
+    expected = original_clean(titanic_data.copy())
+    cleaned = Recipe.from_yaml(RF_MODEL_RECIPE)(titanic_data)
+
+    pd.testing.assert_frame_equal(cleaned, expected, check_dtype=False)
+
+
+def test_recipe_does_not_modify_the_data(titanic_data):
+    original = titanic_data.copy()
+    Recipe.from_yaml(RF_MODEL_RECIPE)(titanic_data)
+
+    pd.testing.assert_frame_equal(titanic_data, original)
+
+
+def test_fitted_recipe_fills_with_the_median_of_the_fitted_data():
+    recipe = Recipe([{"fill": {"Fare": "median"}}, {"fill": "median"}])
+    training_data = pd.DataFrame({"Fare": [1.0, 2.0, 3.0], "Age": [10.0, 20.0, 90.0]})
+    test_data = pd.DataFrame({"Fare": [100.0, np.nan], "Age": [np.nan, 0.0]})
+
+    cleaned = recipe.fit(training_data)(test_data)
+
+    assert cleaned["Fare"].tolist() == [100.0, 2.0]
+    assert cleaned["Age"].tolist() == [20.0, 0.0]
+
+    # Unfitted, the median is taken from the data being cleaned
+    assert recipe(test_data)["Fare"].tolist() == [100.0, 100.0]
+
+
+def test_fitted_medians_are_taken_after_the_steps_before():
+    recipe = Recipe([{"map": {"Size": {"S": 1, "L": 3}}}, {"fill": "median"}])
+    training_data = pd.DataFrame({"Size": ["S", "S", "L"]})
+
+    assert recipe.fit(training_data).steps[1] == {"fill": {"Size": 1.0}}
+
+
+def test_map_values_keeps_missing_values_missing():
+    recipe = Recipe([{"map": {"Sex": {"female": 0, "male": 1}}}])
+    cleaned = recipe(pd.DataFrame({"Sex": ["male", None, "female"]}))
+
+    assert cleaned["Sex"].iloc[[0, 2]].tolist() == [1, 0]
+    assert np.isnan(cleaned["Sex"].iloc[1])
+
+
+def test_map_values_rejects_unmapped_values():
+    recipe = Recipe([{"map": {"Embarked": {"S": 0, "C": 1, "Q": 2}}}])
+
+    with pytest.raises(ValueError, match=r"No mapping for Embarked values \['X'\]"):
+        recipe(pd.DataFrame({"Embarked": ["S", "X", None]}))
+
+
+def test_rf_model_recipe_rejects_a_missing_sex(titanic_data):
+    titanic_data.loc[3, "Sex"] = None
+
+    with pytest.raises(ValueError, match="Sex has 1 missing values"):
+        Recipe.from_yaml(RF_MODEL_RECIPE)(titanic_data)
+
+
+def test_rf_model_recipe_only_fills_the_intended_columns(titanic_data):
+    titanic_data["Deck"] = np.nan
+    cleaned = Recipe.from_yaml(RF_MODEL_RECIPE)(titanic_data)
+
+    assert not cleaned.drop(columns="Deck").isna().any().any()
+    assert cleaned["Deck"].isna().all()
+
+
+def test_bin_values_includes_the_right_edge():
+    recipe = Recipe([{"bin": {"Age": [16, 32]}}])
+    cleaned = recipe(pd.DataFrame({"Age": [0, 16, 16.5, 32, 33, np.nan]}))
+
+    assert cleaned["Age"].iloc[:5].tolist() == [0, 0, 1, 1, 2]
+    assert np.isnan(cleaned["Age"].iloc[5])
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [{"bin": {"Age": [32, 16]}}],
+        [{"bake": {"Age": 180}}],
+        [{"fill": 0, "drop": ["Age"]}],
+    ],
+)
+def test_invalid_recipes(steps):
+    with pytest.raises(ValueError):
+        Recipe(steps)
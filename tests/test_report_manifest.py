@@ -0,0 +1,56 @@
+"""
+Tests for listing and compressing the static reports, window_display/report_manifest.py
+"""
+import gzip
+import hashlib
+
+from window_display.report_manifest import add_report, load_manifest
+
+
+def test_add_report_saves_a_versioned_copy_and_lists_it(tmp_path):
+    report = tmp_path / "model_results.html"
+    report.write_bytes(b"<html>v1</html>")
+
+    entry = add_report(report)
+
+    etag = hashlib.sha256(b"<html>v1</html>").hexdigest()[:32]
+    assert entry["etag"] == etag
+    assert entry["stored"] == f"model_results.{etag}.html"
+    assert (tmp_path / entry["stored"]).read_bytes() == b"<html>v1</html>"
+
+    compressed = tmp_path / entry["encodings"]["gzip"]["file"]
+    assert gzip.decompress(compressed.read_bytes()) == b"<html>v1</html>"
+
+    assert load_manifest(reports_dir=tmp_path) == {"model_results": entry}
+
+
+def test_add_report_keeps_only_the_previous_version(tmp_path):
+    report = tmp_path / "model_results.html"
+
+    entries = list()
+    for version in range(3):
+        report.write_bytes(f"<html>v{version}</html>".encode())
+        entries.append(add_report(report))
+
+    first, second, third = entries
+
+    assert not (tmp_path / first["stored"]).exists()
+    assert (tmp_path / second["stored"]).exists()
+    assert (tmp_path / third["stored"]).exists()
+    assert (tmp_path / second["encodings"]["gzip"]["file"]).exists()
+
+
+def test_adding_an_unchanged_report_keeps_its_files(tmp_path):
+    report = tmp_path / "model_results.html"
+    report.write_bytes(b"<html>v1</html>")
+    first = add_report(report)
+    report.write_bytes(b"<html>v2</html>")
+    add_report(report)
+
+    again = add_report(report)
+
+    assert again["previous"] == [
+        first["stored"],
+        *(copy["file"] for copy in first["encodings"].values()),
+    ]
+    assert (tmp_path / first["stored"]).exists()
@@ -0,0 +1,114 @@
+"""
+Tests for serving the static reports, wait_staff/reports.py
+"""
+import gzip
+
+import pytest
+
+from wait_staff.reports import (
+    ReportShelf,
+    accepted_encodings,
+    choose_encoding,
+    etag_matches,
+)
+from window_display.report_manifest import add_report
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate;q=0.5, BR;q=0.9, x;q=bad") == {
+        "gzip": 1.0,
+        "deflate": 0.5,
+        "br": 0.9,
+        "x": 0.0,
+    }
+    assert accepted_encodings(None) == dict()
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("gzip, br;q=0.5", "gzip"),
+        ("br;q=0, gzip;q=0.1", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("identity", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, available=["br", "gzip"]) == expected
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+        ('"ABC"', False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, etag='"abc"') is expected
+
+
+@pytest.fixture
+def report(tmp_path):
+    """
+    Write a report, and add it to the manifest
+    """
+
+    def write(html: str):
+        path = tmp_path / "model_results.html"
+        path.write_text(html)
+
+        return add_report(path)
+
+    return write
+
+
+def test_shelf_finds_reports_by_file_name(tmp_path, report):
+    shelf = ReportShelf(reports_dir=tmp_path)
+    assert shelf.find("model_results.html") is None
+
+    report("<html>v1</html>")
+
+    assert shelf.find("model_results.html")["file"] == "model_results.html"
+    assert shelf.find("other.html") is None
+
+
+def test_serve_sends_the_version_in_the_manifest(tmp_path, report):
+    entry = report("<html>v1</html>")
+    shelf = ReportShelf(reports_dir=tmp_path)
+
+    # A new version being written over the report isn't sent until it is listed
+    (tmp_path / "model_results.html").write_text("<html>v2, half writ")
+    response = shelf.serve(entry=entry, accept_encoding=None, if_none_match=None)
+
+    assert response.headers["ETag"] == f'"{entry["etag"]}"'
+    assert (tmp_path / response.path).read_text() == "<html>v1</html>"
+
+
+def test_serve_compressed_reports(tmp_path, report):
+    entry = report("<html>v1</html>")
+    shelf = ReportShelf(reports_dir=tmp_path)
+
+    response = shelf.serve(entry=entry, accept_encoding="gzip", if_none_match=None)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == f'"{entry["etag"]}-gzip"'
+    assert (
+        gzip.decompress((tmp_path / response.path).read_bytes()) == b"<html>v1</html>"
+    )
+
+    not_modified = shelf.serve(
+        entry=entry, accept_encoding="gzip", if_none_match=response.headers["ETag"]
+    )
+    assert not_modified.status_code == 304
@@ -0,0 +1,108 @@
+"""
+Tests for training and evaluating the Random Forest, head_chef/rf_model_chef.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from head_chef.rf_model_chef import RfModelChef
+from sous_chef.sous_chef import SousChef
+
+RF_MODEL_RECIPE = Path(__file__).parents[1] / "head_chef" / "rf_model_recipe.yaml"
+
+
+@pytest.fixture
+def make_chef(tmp_path, write_ingredients, write_full_course):
+    """
+    Make an RfModelChef, with the given parameters for classifier_model
+    """
+
+    def make(**parameters) -> RfModelChef:
+        ingredients = write_ingredients(
+            titanic_train_data={
+                "location": str(tmp_path / "train.csv"),
+                "file_format": "csv_file",
+                "python_format": "pandas",
+            }
+        )
+        full_course = write_full_course(
+            classifier_model={
+                "location": str(tmp_path / "model.job"),
+                "python_format": "scikit",
+                "file_format": "joblib_file",
+                "parameters": parameters,
+            }
+        )
+
+        return RfModelChef(
+            recipe=RF_MODEL_RECIPE,
+            full_course=full_course,
+            sous_chef=SousChef(ingredients=ingredients, pantry=None),
+            ingredients=dict(),
+        )
+
+    return make
+
+
+@pytest.fixture
+def training_data(titanic_data):
+    return pd.concat([titanic_data] * 5, ignore_index=True)
+
+
+def test_prepare_model_uses_the_dish_parameters(make_chef):
+    chef = make_chef(n_estimators=7, max_depth=3)
+
+    model = chef.prepare_model(model_tool=chef.dish_tool("classifier_model"))
+
+    assert model.get_params()["n_estimators"] == 7
+    assert model.get_params()["max_depth"] == 3
+    # The defaults are kept unless overridden
+    assert model.get_params()["n_jobs"] == -1
+    assert not model.get_params()["warm_start"]
+
+
+def test_warm_start_adds_trees_to_the_saved_model(make_chef, training_data):
+    chef = make_chef(n_estimators=4, warm_start=True, n_jobs=1)
+    model_tool = chef.dish_tool("classifier_model")
+    training_data = chef.clean(training_data)
+    features = training_data.drop("Survived", axis=1)
+
+    # Nothing saved yet, so the model is trained from scratch
+    model = chef.prepare_model(model_tool=model_tool)
+    model.fit(features, training_data["Survived"])
+    model_tool.save(data=model)
+
+    model = chef.prepare_model(model_tool=model_tool)
+    assert model.get_params()["n_estimators"] == 8
+    model.fit(features, training_data["Survived"])
+
+    assert len(model.estimators_) == 8
+
+
+def test_evaluate_does_not_depend_on_the_batch_size(make_chef, training_data):
+    chef = make_chef(n_estimators=5, n_jobs=1)
+    recipe = chef.recipe.fit(training_data)
+    cleaned = chef.clean(training_data, recipe=recipe)
+
+    model = chef.prepare_model(model_tool=chef.dish_tool("classifier_model"))
+    model.fit(cleaned.drop("Survived", axis=1), cleaned["Survived"])
+
+    test_data = training_data.drop("Survived", axis=1).iloc[:12].copy()
+    test_data.loc[[0, 5], "Fare"] = np.nan
+
+    def evaluate(batch_size: int) -> pd.DataFrame:
+        batches = (
+            test_data.iloc[start : start + batch_size]
+            for start in range(0, len(test_data), batch_size)
+        )
+        return pd.concat(
+            chef.evaluate(model=model, test_batches=batches, recipe=recipe)
+        )
+
+    whole = evaluate(batch_size=len(test_data))
+
+    pd.testing.assert_frame_equal(evaluate(batch_size=1), whole)
+    pd.testing.assert_frame_equal(evaluate(batch_size=5), whole)
+    assert "model_predictions" in whole
@@ -0,0 +1,93 @@
+"""
+Tests for the hyperparameter search, head_chef/rf_search_chef.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from head_chef.rf_search_chef import RfSearchChef, search_space
+from sous_chef.sous_chef import SousChef
+
+RF_MODEL_RECIPE = Path(__file__).parents[1] / "head_chef" / "rf_model_recipe.yaml"
+
+
+@pytest.fixture
+def search_chef(tmp_path, write_ingredients, write_full_course):
+    ingredients = write_ingredients(
+        titanic_train_data={
+            "location": str(tmp_path / "train.csv"),
+            "file_format": "csv_file",
+            "python_format": "pandas",
+        }
+    )
+    full_course = write_full_course(
+        tuned_classifier_model={
+            "location": str(tmp_path / "tuned_model.job"),
+            "python_format": "scikit",
+            "file_format": "joblib_file",
+            "parameters": {
+                "model": {"n_estimators": 5, "n_jobs": 8},
+                "space": {
+                    "max_depth": [2, 4],
+                    "min_samples_leaf": {
+                        "distribution": "randint",
+                        "low": 1,
+                        "high": 3,
+                    },
+                },
+                "search": {"n_candidates": 4, "cv": 2, "factor": 2, "n_jobs": 1},
+            },
+        },
+        model_search_results={
+            "location": str(tmp_path / "search_results.csv"),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+        },
+    )
+
+    return RfSearchChef(
+        recipe=RF_MODEL_RECIPE,
+        full_course=full_course,
+        sous_chef=SousChef(ingredients=ingredients, pantry=None),
+        ingredients=dict(),
+    )
+
+
+def test_search_space_of_lists_and_distributions():
+    space = search_space(
+        {
+            "max_depth": [4, 8, None],
+            "max_features": {"distribution": "uniform", "loc": 0.1, "scale": 0.5},
+        }
+    )
+
+    assert space["max_depth"] == [4, 8, None]
+    assert space["max_features"].dist.name == "uniform"
+    assert 0.1 <= space["max_features"].rvs(random_state=0) <= 0.6
+
+
+def test_candidates_are_fit_on_one_core_each(search_chef):
+    search = search_chef.prepare_search()
+
+    assert search.estimator.get_params()["n_jobs"] == 1
+    assert search.estimator.get_params()["n_estimators"] == 5
+    assert search.n_candidates == 4
+    # Defaults are kept unless overridden
+    assert search.random_state == 42
+
+
+def test_search_results_has_every_candidate_in_every_round(search_chef, titanic_data):
+    training_data = search_chef.clean(pd.concat([titanic_data] * 10, ignore_index=True))
+    search = search_chef.prepare_search()
+    search.fit(training_data.drop("Survived", axis=1), training_data["Survived"])
+
+    results = RfSearchChef.search_results(search=search)
+
+    assert len(results) == len(search.cv_results_["iter"])
+    assert {"max_depth", "min_samples_leaf", "mean_test_score"} <= set(results.columns)
+    # The last round comes first, best candidate first
+    assert results["iter"].iloc[0] == results["iter"].max()
+    last_round = results[results["iter"] == results["iter"].max()]
+    assert np.all(np.diff(last_round["rank_test_score"]) >= 0)
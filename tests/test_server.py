@@ -0,0 +1,88 @@
+"""
+Tests for the REST endpoints, wait_staff/server.py
+"""
+import pytest
+
+from fastapi.testclient import TestClient
+
+from wait_staff.menu import Menu
+from wait_staff.presigned_urls import PresignedUrlCache
+from wait_staff.server import app
+
+
+@pytest.fixture
+def dishes(tmp_path, titanic_data, write_full_course):
+    """
+    A full course of local dishes, of which model_results has been cooked
+    """
+    titanic_data.to_csv(tmp_path / "results.csv", index=False)
+
+    return write_full_course(
+        model_results={
+            "location": str(tmp_path / "results.csv"),
+            "python_format": "pandas",
+            "file_format": "csv_file",
+        },
+        classifier_model={
+            "location": str(tmp_path / "model.job"),
+            "python_format": "scikit",
+            "file_format": "joblib_file",
+        },
+    )
+
+
+@pytest.fixture
+def client(dishes):
+    """
+    A client of the server, set up as at startup but from the test's own files
+    """
+    app.state.menu = Menu(full_course=dishes)
+    app.state.presigned_urls = PresignedUrlCache()
+
+    return TestClient(app)
+
+
+def test_full_course_links_to_downloads_without_presigned_urls(client):
+    response = client.get("/full_course")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "model_results": "http://testserver/full_course/model_results/download",
+        "classifier_model": "http://testserver/full_course/classifier_model/download",
+    }
+    assert response.headers["Cache-Control"] == "private, max-age=100"
+
+
+def test_full_course_hands_out_presigned_urls(client, monkeypatch):
+    signed = list()
+
+    def sign(filepath, version=None):
+        signed.append(filepath)
+        return f"https://signed{filepath}", 60.0
+
+    monkeypatch.setattr(app.state.presigned_urls, "get", sign)
+
+    response = client.get("/full_course")
+
+    assert len(signed) == 2
+    assert response.json()["model_results"].startswith("https://signed/")
+    assert response.headers["Cache-Control"] == "private, max-age=60"
+
+
+def test_appetizer_previews_a_cooked_dish(client):
+    response = client.get("/appetizer/model_results?offset=2&limit=2&columns=Sex")
+
+    assert response.status_code == 200
+    assert response.json()["data_source"] == [{"Sex": "female"}, {"Sex": "female"}]
+
+
+@pytest.mark.parametrize(
+    "path, status_code",
+    [
+        ("/appetizer/classifier_model", 422),
+        ("/appetizer/model_results?columns=Cabin", 422),
+        ("/appetizer/not_on_the_menu", 404),
+    ],
+)
+def test_appetizer_errors(client, path, status_code):
+    assert client.get(path).status_code == status_code
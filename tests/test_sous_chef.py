@@ -0,0 +1,131 @@
+"""
+Tests for the preparation of ingredients by sous_chef/sous_chef.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from sous_chef.sous_chef import IngredientPreparationError, SousChef
+
+
+@pytest.fixture
+def sous_chef(tmp_path, titanic_data, write_ingredients) -> SousChef:
+    """
+    A Sous Chef with two CSV ingredients, and no pantry
+    """
+    titanic_data.to_csv(tmp_path / "train.csv", index=False)
+    titanic_data.head(3).to_csv(tmp_path / "test.csv", index=False)
+
+    ingredients = write_ingredients(
+        train={
+            "location": str(tmp_path / "train.csv"),
+            "file_format": "csv_file",
+            "python_format": "pandas",
+        },
+        test={
+            "location": str(tmp_path / "test.csv"),
+            "file_format": "csv_file",
+            "python_format": "pandas",
+        },
+    )
+
+    return SousChef(ingredients=ingredients, pantry=None)
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_prepare_ingredients(sous_chef, titanic_data, concurrent):
+    prepared = sous_chef.prepare_ingredients(concurrent=concurrent, max_workers=2)
+
+    assert list(prepared) == ["train", "test"]
+    pd.testing.assert_frame_equal(prepared["train"], titanic_data)
+    pd.testing.assert_frame_equal(prepared["test"], titanic_data.head(3))
+    assert set(sous_chef.preparation_times) == {"train", "test"}
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_every_ingredient_is_attempted_before_raising(tmp_path, sous_chef, concurrent):
+    (tmp_path / "train.csv").unlink()
+
+    with pytest.raises(IngredientPreparationError) as error:
+        sous_chef.prepare_ingredients(concurrent=concurrent)
+
+    assert list(error.value.failures) == ["train"]
+    assert isinstance(error.value.failures["train"], FileNotFoundError)
+    assert set(sous_chef.preparation_times) == {"train", "test"}
+
+
+def test_ingredients_without_a_tool_are_rejected(write_ingredients):
+    ingredients = write_ingredients(
+        train={
+            "location": "train.xlsx",
+            "file_format": "xlsx",
+            "python_format": "pandas",
+        }
+    )
+
+    with pytest.raises(ValueError, match="no tool"):
+        SousChef(ingredients=ingredients, pantry=None)
+
+
+def test_ingredients_are_prepared_lazily(sous_chef, titanic_data):
+    ingredients = sous_chef.prepare_ingredients_lazily()
+
+    assert list(ingredients) == ["train", "test"]
+    assert not ingredients.is_prepared("train")
+
+    pd.testing.assert_frame_equal(ingredients["train"], titanic_data)
+    assert ingredients.is_prepared("train")
+    assert not ingredients.is_prepared("test")
+    assert set(sous_chef.preparation_times) == {"train"}
+
+    # Kept until released
+    assert ingredients["train"] is ingredients["train"]
+    ingredients.release(name="train")
+    assert not ingredients.is_prepared("train")
+
+    with pytest.raises(KeyError):
+        ingredients["validation"]
+
+
+def test_concurrent_first_uses_prepare_an_ingredient_once(sous_chef, monkeypatch):
+    preparations = list()
+    prepare = sous_chef.time_one_ingredient
+
+    def count_preparations(name, ingredient):
+        preparations.append(name)
+        return prepare(name=name, ingredient=ingredient)
+
+    monkeypatch.setattr(sous_chef, "time_one_ingredient", count_preparations)
+    ingredients = sous_chef.prepare_ingredients_lazily()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        prepared = list(executor.map(lambda _: ingredients["train"], range(8)))
+
+    assert preparations == ["train"]
+    assert all(data is prepared[0] for data in prepared)
+
+
+def test_prefetch(sous_chef, tmp_path):
+    ingredients = sous_chef.prepare_ingredients_lazily()
+
+    ingredients.prefetch(names=["test"])
+    assert ingredients.is_prepared("test")
+    assert not ingredients.is_prepared("train")
+
+    (tmp_path / "train.csv").unlink()
+    with pytest.raises(IngredientPreparationError) as error:
+        ingredients.prefetch()
+    assert list(error.value.failures) == ["train"]
+
+
+def test_iter_batches(sous_chef, titanic_data):
+    sous_chef.ingredients["train"].load_args = {"chunksize": 4}
+    ingredients = sous_chef.prepare_ingredients_lazily()
+
+    batches = list(ingredients.iter_batches("train"))
+
+    assert [len(batch) for batch in batches] == [4, 2]
+    pd.testing.assert_frame_equal(pd.concat(batches), titanic_data)
+    assert not ingredients.is_prepared("train")
+    assert sous_chef.ingredients["train"].dvc_hash is not None
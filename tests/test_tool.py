@@ -0,0 +1,98 @@
+"""
+Tests for the Tool base class, tools/tool.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.pandas.csv_file import CsvFile
+from tools.pandas.parquet_file import ParquetFile
+from tools.scikit.joblib_file import JoblibFile
+from tools.tool import Tool
+
+
+def test_checksum_changes_with_the_file(tmp_path, titanic_data):
+    path = tmp_path / "train.csv"
+    titanic_data.to_csv(path, index=False)
+    tool = CsvFile(filepath=str(path))
+
+    checksum = tool.checksum()
+    assert tool.checksum() == checksum
+
+    titanic_data.head(2).to_csv(path, index=False)
+    assert tool.checksum() != checksum
+
+
+def test_checksum_of_a_directory_changes_with_the_files_in_it(tmp_path, titanic_data):
+    dataset = tmp_path / "train"
+    (dataset / "Pclass=1").mkdir(parents=True)
+    titanic_data.to_parquet(dataset / "Pclass=1" / "part-0.parquet", index=False)
+    tool = ParquetFile(filepath=str(dataset))
+
+    checksums = [tool.checksum()]
+
+    # Added in a subdirectory, so the directory's own metadata doesn't change
+    (dataset / "Pclass=2").mkdir()
+    titanic_data.to_parquet(dataset / "Pclass=2" / "part-0.parquet", index=False)
+    checksums.append(tool.checksum())
+
+    titanic_data.head(1).to_parquet(
+        dataset / "Pclass=2" / "part-0.parquet", index=False
+    )
+    checksums.append(tool.checksum())
+
+    (dataset / "Pclass=1" / "part-0.parquet").unlink()
+    checksums.append(tool.checksum())
+
+    assert len(set(checksums)) == len(checksums)
+    assert tool.checksum() == checksums[-1]
+
+
+class RecordingTool(Tool):
+    """
+    Keeps whatever it is asked to save, relying on the Tool's batch fallbacks
+    """
+
+    def load(self):
+        return self.saved
+
+    def save(self, data):
+        self.saved = data
+
+
+def test_save_batches_concatenates_dataframes(titanic_data):
+    tool = RecordingTool(filepath="memory://titanic")
+
+    tool.save_batches(batches=[titanic_data.head(2), titanic_data.tail(4)])
+
+    pd.testing.assert_frame_equal(tool.saved, titanic_data)
+
+
+def test_save_batches_saves_a_single_batch_as_it_is(tmp_path):
+    model = {"weights": np.arange(5), "bias": 0.5}
+    source = JoblibFile(filepath=str(tmp_path / "model.job"))
+    source.save(data=model)
+
+    target = JoblibFile(filepath=str(tmp_path / "copy.job"))
+    target.save_batches(batches=source.iter_load())
+
+    copied = target.load()
+    assert copied.keys() == model.keys()
+    np.testing.assert_array_equal(copied["weights"], model["weights"])
+
+
+@pytest.mark.parametrize(
+    "batches, error",
+    [
+        ([], ValueError),
+        ([{"weights": 1}, {"weights": 2}], TypeError),
+        ([pd.DataFrame({"a": [1]}), [1, 2]], TypeError),
+    ],
+)
+def test_save_batches_which_cannot_be_combined(tmp_path, batches, error):
+    tool = RecordingTool(filepath="memory://batches")
+
+    with pytest.raises(error):
+        tool.save_batches(batches=iter(batches))
+
+    assert not hasattr(tool, "saved")
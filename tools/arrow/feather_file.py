@@ -0,0 +1,109 @@
+from typing import Iterable, Iterator, Union
+
+import pandas as pd
+import pyarrow as pa
+
+from pyarrow import ipc
+from tools.tool import Tool
+
+
+class FeatherFile(Tool):
+    """
+    Loads/saves data as a ``pyarrow`` Table from/to a Feather (Arrow IPC) file
+    on any ``fsspec``-supported file-like system
+
+    Local files are memory mapped, so loading is zero-copy: no data is decoded or
+    read until it is used, and processes loading the same file share its pages.
+
+    save_args:
+        compression (str): "uncompressed", "lz4", or "zstd". Compressed files must be
+                           decompressed on load, so cannot be zero-copy.
+    """
+
+    DEFAULT_SAVE_ARGS = {"compression": "uncompressed"}
+
+    def load(self) -> pa.Table:
+        """
+        Load data from a Feather file into a ``pyarrow`` Table
+
+        Returns:
+            pa.Table: Loaded Arrow data, memory mapped for local files
+        """
+        if self.protocol == "file":
+            return ipc.open_file(pa.memory_map(self.filepath, "r")).read_all()
+
+        with self.filesystem.open(path=self.filepath, mode="rb") as file:
+            return ipc.open_file(file).read_all()
+
+    def iter_load(self) -> Iterator[pa.RecordBatch]:
+        """
+        Load data from a Feather file one record batch at a time
+
+        Returns:
+            Iterator[pa.RecordBatch]: Loaded Arrow data, one batch at a time
+        """
+        if self.protocol == "file":
+            reader = ipc.open_file(pa.memory_map(self.filepath, "r"))
+            for batch_number in range(reader.num_record_batches):
+                yield reader.get_batch(batch_number)
+            return
+
+        with self.filesystem.open(path=self.filepath, mode="rb") as file:
+            reader = ipc.open_file(file)
+            for batch_number in range(reader.num_record_batches):
+                yield reader.get_batch(batch_number)
+
+    def save(self, data: Union[pa.Table, pd.DataFrame]) -> None:
+        """
+        Save a ``pyarrow`` Table or Pandas DataFrame as a Feather file
+
+        Args:
+            data (Union[pa.Table, pd.DataFrame]): Data to save
+
+        Returns:
+            None
+        """
+        if isinstance(data, pd.DataFrame):
+            data = pa.Table.from_pandas(data, preserve_index=False)
+
+        self.save_batches(batches=data.to_batches())
+
+        return None
+
+    def save_batches(
+        self, batches: Iterable[Union[pa.RecordBatch, pd.DataFrame]]
+    ) -> None:
+        """
+        Save record batches or Pandas DataFrames to a single Feather file as they
+        arrive
+
+        Args:
+            batches (Iterable[Union[pa.RecordBatch, pd.DataFrame]]): Batches of data
+                                                                     with one schema
+
+        Returns:
+            None
+        """
+        compression = self.save_args["compression"]
+        options = ipc.IpcWriteOptions(
+            compression=None if compression == "uncompressed" else compression
+        )
+
+        with self.filesystem.open(path=self.filepath, mode="wb") as file:
+            writer = None
+            schema = None
+
+            for batch in batches:
+                if isinstance(batch, pd.DataFrame):
+                    batch = pa.RecordBatch.from_pandas(
+                        batch, schema=schema, preserve_index=False
+                    )
+                if writer is None:
+                    schema = batch.schema
+                    writer = ipc.new_file(file, schema=schema, options=options)
+                writer.write_batch(batch)
+
+            if writer is not None:
+                writer.close()
+
+        return None
@@ -0,0 +1,117 @@
+"""
+A process-wide pool of ``fsspec`` file systems, shared by every Tool, presigned URL,
+and catalog lookup, so credentials are resolved and connections opened only once
+"""
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+import fsspec
+from fsspec.spec import AbstractFileSystem
+from fsspec.utils import tokenize
+
+
+class FilesystemPool:
+    """
+    Hand out one file system instance per protocol and set of credentials
+
+    Instances are created on first use and then reused, along with their sessions
+    and connections. ``fsspec`` file systems are safe to share between threads, but
+    not across a fork, so each process gets its own instances.
+    """
+
+    def __init__(self) -> None:
+        self._filesystems: Dict[Tuple[int, str, str], AbstractFileSystem] = dict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+
+    def get(self, protocol: str, **credentials: Any) -> AbstractFileSystem:
+        """
+        Get the file system for a protocol, creating it if it is not in the pool
+
+        Args:
+            protocol (str): Any protocol supported by ``fsspec``, e.g. "s3" or "file"
+            **credentials (Any): Credentials and other options for the file system
+
+        Returns:
+            AbstractFileSystem: A shared ``fsspec`` file system
+        """
+        key = (os.getpid(), protocol, tokenize(credentials))
+
+        with self._lock:
+            filesystem = self._filesystems.get(key)
+
+            if filesystem is not None:
+                self.hits += 1
+                return filesystem
+
+            self.misses += 1
+            filesystem = fsspec.filesystem(
+                protocol, skip_instance_cache=True, **credentials
+            )
+            self.created += 1
+
+            self._filesystems[key] = filesystem
+
+            return filesystem
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count how often file systems were reused
+
+        Returns:
+            Dict[str, int]: Pool hits and misses, instances created, and instances
+                            currently held
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "pooled": len(self._filesystems),
+        }
+
+
+FILESYSTEM_POOL = FilesystemPool()
+
+
+def get_filesystem(protocol: str, **credentials: Any) -> AbstractFileSystem:
+    """
+    Get a shared file system from the process-wide pool
+
+    Args:
+        protocol (str): Any protocol supported by ``fsspec``, e.g. "s3" or "file"
+        **credentials (Any): Credentials and other options for the file system
+
+    Returns:
+        AbstractFileSystem: A shared ``fsspec`` file system
+    """
+    return FILESYSTEM_POOL.get(protocol, **credentials)
+
+
+def path_checksum(filesystem: AbstractFileSystem, path: str) -> str:
+    """
+    Identify the current version of a file, or of every file in a directory, from its
+    file system metadata, without reading it
+
+    i.e. ``fsspec`` derives this from the ETag, modification time, and size,
+         whichever the file system provides. A directory's own metadata doesn't
+         change when the files in it do, e.g. a partitioned dataset or an S3 prefix,
+         so it is identified by the metadata of every file within it instead.
+
+    Args:
+        filesystem (AbstractFileSystem): The file system holding the path
+        path (str): Path to a file or directory within the file system
+
+    Returns:
+        str: A token which changes whenever the file, or any file in the directory,
+             is added, removed, or changed
+    """
+    if not filesystem.isdir(path):
+        return f"{filesystem.checksum(path):x}"
+
+    files = filesystem.find(path, detail=True)
+
+    return tokenize(sorted(files.items()))
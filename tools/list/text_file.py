@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, Iterator, List
 
 from tools.tool import Tool
 
@@ -7,8 +7,13 @@ class TextFile(Tool):
     """
     Loads/saves text data as a Python list from/to a text file
     on any ``fsspec``-supported file-like system
+
+    load_args:
+        batch_size (int): Lines per list when iterating with iter_load()
     """
 
+    DEFAULT_LOAD_ARGS = {"batch_size": 10_000}
+
     def load(self) -> List[str]:
         """
         Load text data from a text file split on new line characters
@@ -16,11 +21,33 @@ class TextFile(Tool):
         Returns:
             List[str]: Loaded text data
         """
-        with self.filesystem.open(path=self.filepath) as file:
+        with self.filesystem.open(path=self.filepath, mode="r") as file:
             text_data = file.read().split("\n")
 
         return list(filter(None, text_data))
 
+    def iter_load(self) -> Iterator[List[str]]:
+        """
+        Load text data from a text file, load_args["batch_size"] lines at a time
+
+        Returns:
+            Iterator[List[str]]: Loaded text data, one batch of lines at a time
+        """
+        batch = list()
+
+        with self.filesystem.open(path=self.filepath, mode="r") as file:
+            for line in file:
+                line = line.rstrip("\n")
+                if line:
+                    batch.append(line)
+
+                if len(batch) == self.load_args["batch_size"]:
+                    yield batch
+                    batch = list()
+
+        if batch:
+            yield batch
+
     def save(self, data: List[str]) -> None:
         """
         Save a list of strings to a text file
@@ -31,6 +58,18 @@ class TextFile(Tool):
         Returns:
             None
         """
-        with self.filesystem.open(path=self.filepath, mode="wb") as file:
-            for entry in data:
-                file.write(entry)
+        self.save_batches(batches=[data])
+
+    def save_batches(self, batches: Iterable[List[str]]) -> None:
+        """
+        Save lists of strings to a text file, one string per line
+
+        Args:
+            batches (Iterable[List[str]]): Lists of strings
+
+        Returns:
+            None
+        """
+        with self.filesystem.open(path=self.filepath, mode="w") as file:
+            for batch in batches:
+                file.writelines(f"{entry}\n" for entry in batch)
@@ -0,0 +1,64 @@
+from pathlib import PurePosixPath
+
+import cv2
+import numpy as np
+
+from tools.tool import Tool
+
+
+class ImageFile(Tool):
+    """
+    Loads/saves an image as an RGB NumPy array from/to an image file, e.g. PNG or JPEG,
+    on any ``fsspec``-supported file-like system
+
+    load_args:
+        flags (int): How to decode the image, e.g. cv2.IMREAD_GRAYSCALE
+
+    save_args:
+        params (List[int]): Encoding options, e.g. [cv2.IMWRITE_JPEG_QUALITY, 90]
+    """
+
+    DEFAULT_LOAD_ARGS = {"flags": cv2.IMREAD_COLOR}
+    DEFAULT_SAVE_ARGS = {"params": []}
+
+    def load(self) -> np.ndarray:
+        """
+        Load an image, decoded into an array of uint8 with channels in RGB order
+
+        Returns:
+            np.ndarray: The image, shaped (height, width, 3) in color
+        """
+        with self.filesystem.open(path=self.filepath, mode="rb") as file:
+            encoded = np.frombuffer(file.read(), dtype=np.uint8)
+
+        image = cv2.imdecode(encoded, self.load_args["flags"])
+        if image is None:
+            raise ValueError(f"Could not decode {self.filepath} as an image")
+
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        return image
+
+    def save(self, data: np.ndarray) -> None:
+        """
+        Save an RGB image, encoded in the format of the file's extension
+
+        Args:
+            data (np.ndarray): The image, as uint8 with channels in RGB order
+
+        Returns:
+            None
+        """
+        if data.ndim == 3:
+            data = cv2.cvtColor(data, cv2.COLOR_RGB2BGR)
+
+        extension = PurePosixPath(self.filepath).suffix
+        encoded, image_bytes = cv2.imencode(extension, data, self.save_args["params"])
+        if not encoded:
+            raise ValueError(f"Could not encode an image as {extension}")
+
+        with self.filesystem.open(path=self.filepath, mode="wb") as file:
+            file.write(image_bytes.tobytes())
+
+        return None
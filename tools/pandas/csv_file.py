@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator
+
 import pandas as pd
 
 from tools.tool import Tool
@@ -7,8 +9,16 @@ class CsvFile(Tool):
     """
     Loads/saves data as a Pandas DataFrame from/to a CSV file
     on any ``fsspec``-supported file-like system
+
+    load_args are passed to ``pd.read_csv``, for example:
+        dtype (Dict[str, str]): An explicit type for each column, instead of inferring
+        usecols (List[str]): Only parse these columns
+        engine (str): "c", "python", or "pyarrow" for the multithreaded Arrow reader
+        chunksize (int): Rows per DataFrame when iterating with iter_load()
     """
 
+    DEFAULT_LOAD_ARGS = {"chunksize": 100_000}
+
     def load(self) -> pd.DataFrame:
         """
         Load text data from a CSV file into a Pandas DataFrame
@@ -16,11 +26,33 @@ class CsvFile(Tool):
         Returns:
             pd.DataFrame: Loaded CSV data
         """
+        load_args = {
+            key: value for key, value in self.load_args.items() if key != "chunksize"
+        }
+
         with self.filesystem.open(path=self.filepath) as file:
-            csv_data = pd.read_csv(file)
+            csv_data = pd.read_csv(file, **load_args)
 
         return csv_data
 
+    def iter_load(self) -> Iterator[pd.DataFrame]:
+        """
+        Load text data from a CSV file into Pandas DataFrames of load_args["chunksize"]
+        rows at a time, so the whole file is never held in memory
+
+        The pyarrow engine cannot read in chunks, so the C engine is used instead.
+
+        Returns:
+            Iterator[pd.DataFrame]: Loaded CSV data, one chunk at a time
+        """
+        load_args = dict(self.load_args)
+        if load_args.get("engine") == "pyarrow":
+            load_args["engine"] = "c"
+
+        with self.filesystem.open(path=self.filepath) as file:
+            with pd.read_csv(file, **load_args) as chunks:
+                yield from chunks
+
     def save(self, data: pd.DataFrame) -> None:
         """
         Save a Pandas DataFrame as a CSV file
@@ -35,3 +67,20 @@ class CsvFile(Tool):
             data.to_csv(file, index=False)
 
         return None
+
+    def save_batches(self, batches: Iterable[pd.DataFrame]) -> None:
+        """
+        Save Pandas DataFrames to a single CSV file as they arrive, writing the header
+        from the first
+
+        Args:
+            batches (Iterable[pd.DataFrame]): DataFrames with the same columns
+
+        Returns:
+            None
+        """
+        with self.filesystem.open(path=self.filepath, mode="w") as file:
+            for batch_number, batch in enumerate(batches):
+                batch.to_csv(file, index=False, header=batch_number == 0)
+
+        return None
@@ -1,6 +1,15 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
 import pandas as pd
+import pyarrow as pa
 
-from pyarrow.dataset import dataset
+from pyarrow.dataset import Dataset, ParquetFileFormat, dataset, write_dataset
+from pyarrow.parquet import (
+    ParquetFile as ArrowParquetFile,
+    ParquetWriter,
+    filters_to_expression,
+    write_table,
+)
 from tools.tool import Tool
 
 
@@ -8,21 +17,51 @@ class ParquetFile(Tool):
     """
     Loads/saves data as a Pandas DataFrame from/to a parquet file
     on any ``fsspec``-supported file-like system
+
+    load_args:
+        columns (List[str]): Only read these columns
+        filter (List): Only read rows matching these conditions, in the disjunctive
+                       normal form used by ``pyarrow``, e.g. [["Age", ">", 16]].
+                       Row groups whose statistics rule out a match are skipped.
+        use_threads (bool): Decode with multiple threads
+        batch_size (int): Maximum rows per DataFrame when iterating with iter_load()
+
+    save_args:
+        partition_cols (List[str]): Write a directory of files, partitioned on these
+                                    columns, e.g. location/Pclass=1/part-0.parquet
+        row_group_size (int): Maximum rows per row group
+        compression (str): Compression codec, e.g. "snappy", "zstd", or "none"
     """
 
+    DEFAULT_LOAD_ARGS = {
+        "columns": None,
+        "filter": None,
+        "use_threads": True,
+        "batch_size": 131_072,
+    }
+    DEFAULT_SAVE_ARGS = {
+        "partition_cols": None,
+        "row_group_size": None,
+        "compression": "snappy",
+    }
+
     def load(self) -> pd.DataFrame:
         """
         Load text data from a parquet file into a Pandas DataFrame
 
+        Only the columns and row groups required by load_args are fetched.
+
         Returns:
             pd.DataFrame: Loaded parquet data
         """
+        use_threads = self.load_args["use_threads"]
+
         parquet_data = (
-            dataset(source=self.filepath, format="parquet", filesystem=self.filesystem)
-            .to_table()
+            self._dataset()
+            .to_table(**self._scan_options())
             .to_pandas(
                 date_as_object=True,
-                use_threads=False,
+                use_threads=use_threads,
                 split_blocks=True,
                 self_destruct=True,
             )
@@ -30,17 +69,308 @@ class ParquetFile(Tool):
 
         return parquet_data
 
-    def save(self, data: pd.DataFrame) -> None:
+    def iter_load(self) -> Iterator[pd.DataFrame]:
+        """
+        Load text data from a parquet file into Pandas DataFrames of at most
+        load_args["batch_size"] rows at a time, so the whole file is never held in
+        memory
+
+        Returns:
+            Iterator[pd.DataFrame]: Loaded parquet data, one batch at a time
+        """
+        record_batches = self._dataset().to_batches(
+            batch_size=self.load_args["batch_size"], **self._scan_options()
+        )
+
+        for record_batch in record_batches:
+            yield record_batch.to_pandas(date_as_object=True)
+
+    def preview(
+        self, offset: int, limit: int, columns: Optional[List[str]] = None
+    ) -> pa.Table:
         """
-        Save a Pandas DataFrame as a parquet file
+        Load a slice of rows from a parquet file, fetching only the row groups which
+        overlap it
 
         Args:
-            data (pd.DataFrame): A Pandas DataFrame containing data to save
+            offset (int): Index of the first row to load
+            limit (int): Maximum number of rows to load
+            columns (Optional[List[str]]): Only load these columns
+
+        Returns:
+            pa.Table: Up to limit rows, starting at offset
+
+        Raises:
+            KeyError: If one of the columns is not in the file
+        """
+        if self.filesystem.isdir(self.filepath):
+            # A partitioned dataset has no single footer, so scan up to the slice
+            partitioned = self._dataset()
+            check_columns(schema=partitioned.schema, columns=columns)
+
+            return skip_and_take(
+                batches=partitioned.to_batches(columns=columns),
+                offset=offset,
+                limit=limit,
+            )
+
+        with self.filesystem.open(path=self.filepath, mode="rb") as file:
+            parquet_file = ArrowParquetFile(file)
+            check_columns(schema=parquet_file.schema_arrow, columns=columns)
+
+            row_groups = list()
+            first_row = None
+            group_start = 0
+
+            for row_group in range(parquet_file.metadata.num_row_groups):
+                group_end = (
+                    group_start + parquet_file.metadata.row_group(row_group).num_rows
+                )
+
+                if group_end > offset and group_start < offset + limit:
+                    row_groups.append(row_group)
+                    first_row = group_start if first_row is None else first_row
+
+                group_start = group_end
+
+            if not row_groups:
+                schema = parquet_file.schema_arrow
+                if columns:
+                    schema = pa.schema([schema.field(column) for column in columns])
+                return schema.empty_table()
+
+            table = parquet_file.read_row_groups(row_groups, columns=columns)
+
+        return table.slice(offset - first_row, limit)
+
+    def save(self, data: Union[pd.DataFrame, pa.Table]) -> None:
+        """
+        Save a Pandas DataFrame as a parquet file, or as a partitioned directory of
+        parquet files if save_args["partition_cols"] is set, replacing every partition
+        saved before
+
+        The data is written by ``pyarrow`` directly to the file system.
+
+        Args:
+            data (Union[pd.DataFrame, pa.Table]): Data to save
 
         Returns:
             None
         """
-        with self.filesystem.open(path=self.filepath, mode="w") as file:
-            data.to_parquet(file, index=False)
+        if isinstance(data, pd.DataFrame):
+            data = pa.Table.from_pandas(data, preserve_index=False)
+
+        if self.save_args["partition_cols"]:
+            self._clear_partitions()
+            self._write_partitions(data, existing_data_behavior="overwrite_or_ignore")
+        else:
+            write_table(
+                data,
+                where=self.filepath,
+                filesystem=self.filesystem,
+                row_group_size=self.save_args["row_group_size"],
+                compression=self.save_args["compression"],
+            )
 
         return None
+
+    def save_batches(self, batches: Iterable[pd.DataFrame]) -> None:
+        """
+        Save Pandas DataFrames to a single parquet file as they arrive, or to a
+        partitioned directory of parquet files if save_args["partition_cols"] is set
+
+        Batches are gathered into row groups of save_args["row_group_size"] rows, or
+        each becomes a row group of its own if it isn't set. With no batches, a file
+        with no rows or columns is saved, which still loads.
+
+        Args:
+            batches (Iterable[pd.DataFrame]): DataFrames with the same columns
+
+        Returns:
+            None
+        """
+        if self.save_args["partition_cols"]:
+            return self._save_partitioned_batches(batches)
+
+        row_group_size = self.save_args["row_group_size"]
+
+        with self.filesystem.open(path=self.filepath, mode="wb") as file:
+            writer = None
+            pending: List[pa.Table] = list()
+            pending_rows = 0
+
+            for batch in batches:
+                table = pa.Table.from_pandas(
+                    batch,
+                    schema=writer.schema if writer else None,
+                    preserve_index=False,
+                )
+                if writer is None:
+                    writer = ParquetWriter(
+                        file,
+                        schema=table.schema,
+                        compression=self.save_args["compression"],
+                    )
+
+                pending.append(table)
+                pending_rows += table.num_rows
+
+                if row_group_size is None:
+                    writer.write_table(table)
+                    pending, pending_rows = list(), 0
+                elif pending_rows >= row_group_size:
+                    # Write whole row groups, and keep the rest for the next batch
+                    gathered = pa.concat_tables(pending)
+                    full_rows = pending_rows - pending_rows % row_group_size
+                    writer.write_table(
+                        gathered.slice(0, full_rows), row_group_size=row_group_size
+                    )
+                    pending = [gathered.slice(full_rows)]
+                    pending_rows -= full_rows
+
+            if writer is None:
+                writer = ParquetWriter(
+                    file,
+                    schema=pa.schema([]),
+                    compression=self.save_args["compression"],
+                )
+            elif pending_rows:
+                writer.write_table(pa.concat_tables(pending))
+
+            writer.close()
+
+        return None
+
+    def _save_partitioned_batches(self, batches: Iterable[pd.DataFrame]) -> None:
+        """
+        Replace the partitioned directory with Pandas DataFrames as they arrive, each
+        batch adding a file to each partition it holds rows of,
+        e.g. location/Pclass=1/part-3-0.parquet for the fourth batch
+        """
+        self._clear_partitions()
+
+        schema = None
+        for batch_number, batch in enumerate(batches):
+            table = pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            schema = table.schema
+
+            self._write_partitions(
+                table,
+                basename_template=f"part-{batch_number}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+
+        return None
+
+    def _clear_partitions(self) -> None:
+        """
+        Remove the partitioned directory, so partitions which are no longer in the data
+        aren't loaded along with it
+        """
+        if self.filesystem.exists(self.filepath):
+            self.filesystem.rm(self.filepath, recursive=True)
+        self.filesystem.makedirs(self.filepath, exist_ok=True)
+
+    def _write_partitions(self, data: pa.Table, **options: Any) -> None:
+        """
+        Write a table into the partitioned directory, with the save_args
+        """
+        write_dataset(
+            data,
+            base_dir=self.filepath,
+            filesystem=self.filesystem,
+            format="parquet",
+            partitioning=self.save_args["partition_cols"],
+            partitioning_flavor="hive",
+            file_options=ParquetFileFormat().make_write_options(
+                compression=self.save_args["compression"]
+            ),
+            max_rows_per_group=self.save_args["row_group_size"] or 1024**2,
+            **options,
+        )
+
+    def _dataset(self) -> Dataset:
+        """
+        Open the parquet file(s) as a ``pyarrow`` dataset, reading no data yet
+        """
+        return dataset(
+            source=self.filepath,
+            format="parquet",
+            filesystem=self.filesystem,
+            partitioning="hive",
+        )
+
+    def _scan_options(self) -> Dict[str, Any]:
+        """
+        Translate load_args into ``pyarrow`` dataset scanner options
+        """
+        row_filter = self.load_args["filter"]
+
+        return {
+            "columns": self.load_args["columns"],
+            "filter": filters_to_expression(row_filter) if row_filter else None,
+            "use_threads": self.load_args["use_threads"],
+        }
+
+
+def check_columns(schema: pa.Schema, columns: Optional[List[str]]) -> None:
+    """
+    Check that every requested column is in a schema
+
+    Args:
+        schema (pa.Schema): The schema of the data
+        columns (Optional[List[str]]): The columns to load, or None for all of them
+
+    Raises:
+        KeyError: If one of the columns is not in the schema
+    """
+    missing = set(columns or []) - set(schema.names)
+    if missing:
+        raise KeyError(f"No columns named {sorted(missing)}")
+
+
+def skip_and_take(
+    batches: Iterable[Union[pa.RecordBatch, pa.Table]], offset: int, limit: int
+) -> pa.Table:
+    """
+    Collect a slice of rows from a stream of Arrow batches, stopping as soon as the
+    slice is complete
+
+    Args:
+        batches (Iterable[Union[pa.RecordBatch, pa.Table]]): Batches with one schema
+        offset (int): Index of the first row to collect
+        limit (int): Maximum number of rows to collect
+
+    Returns:
+        pa.Table: Up to limit rows, starting at offset
+    """
+    collected = list()
+    schema = None
+    batch_start = 0
+
+    for batch in batches:
+        schema = batch.schema
+        batch_end = batch_start + batch.num_rows
+
+        if batch_end > offset:
+            start = max(offset - batch_start, 0)
+            collected.append(batch.slice(start, limit))
+            limit -= collected[-1].num_rows
+
+        batch_start = batch_end
+        if limit <= 0:
+            break
+
+    if schema is None:
+        return pa.table({})
+
+    return pa.Table.from_batches(
+        [
+            record_batch
+            for piece in collected
+            for record_batch in (
+                piece.to_batches() if isinstance(piece, pa.Table) else [piece]
+            )
+        ],
+        schema=schema,
+    )
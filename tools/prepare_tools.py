@@ -2,10 +2,56 @@
 Function to resolve which tool to use based on the YAML files:
 ingredients.yaml, and full_course.yaml
 """
+from functools import lru_cache
 from importlib import import_module
-from typing import Callable
+from pathlib import Path
+from typing import Callable, Dict, Tuple
 
+TOOLS_DIR = Path(__file__).parent
 
+
+@lru_cache(maxsize=None)
+def available_tools() -> Dict[Tuple[str, str], str]:
+    """
+    Find every tool in the tools directory, without importing any of them
+
+    i.e. Each tools/<python_format>/<file_format>.py module is a tool. Modules are
+         only imported once a tool is actually used, so that e.g. pandas is never
+         imported by a process which doesn't load a DataFrame.
+
+    Returns:
+        Dict[Tuple[str, str], str]: The module to import for each
+                                    (python_format, file_format)
+    """
+    return {
+        (module.parent.name, module.stem): f"tools.{module.parent.name}.{module.stem}"
+        for module in sorted(TOOLS_DIR.glob("*/*.py"))
+        if not module.stem.startswith("_")
+    }
+
+
+def validate_tool(python_format: str, file_format: str) -> None:
+    """
+    Check that a tool exists for a python_format and file_format, without importing it
+
+    Args:
+        python_format (str): The Python data type, such as 'pandas'
+        file_format (str): The raw data format, such as 'csv_file'
+
+    Raises:
+        ValueError: If there is no such tool
+    """
+    if (python_format, file_format) not in available_tools():
+        available = ", ".join(
+            f"{python}.{file}" for python, file in sorted(available_tools())
+        )
+        raise ValueError(
+            f"There is no tool for python_format '{python_format}' and file_format "
+            f"'{file_format}'. Available tools are: {available}"
+        )
+
+
+@lru_cache(maxsize=None)
 def prepare_tools(python_format: str, file_format: str) -> Callable:
     """
     Find the right class to take the ingredients from their raw form
@@ -19,8 +65,10 @@ def prepare_tools(python_format: str, file_format: str) -> Callable:
     Returns:
         (Callable): The function to Extract the data
     """
+    validate_tool(python_format=python_format, file_format=file_format)
+
     # Create the string to import the module needed to load the data
-    file_to_import_from = f"tools.{python_format}.{file_format}"
+    file_to_import_from = available_tools()[(python_format, file_format)]
 
     # Cast to CamelCase for class name
     tool_to_import = "".join(word.title() for word in file_format.split("_"))
@@ -1,32 +1,70 @@
 import tempfile
 
 from pathlib import Path
-from typing import List, Any
+from typing import Any
 
+import fsspec
 import joblib
 
 from tools.tool import Tool
 
+JOBLIB_CACHE_DIR = Path(tempfile.gettempdir()) / "kitchen_joblib_cache"
+
 
 class JoblibFile(Tool):
     """
-    Loads/saves text data as a Python list from/to a text file
+    Loads/saves a Python object, such as a scikit-learn model, from/to a joblib file
     on any ``fsspec``-supported file-like system
+
+    load_args:
+        mmap_mode (str): Memory map the numpy arrays in the file instead of reading
+                         them, e.g. "r". Only possible for uncompressed files.
+        cache_storage (str): Local directory in which to cache remote files, so that
+                             they can be memory mapped
+
+    save_args:
+        compress (Union[int, str]): joblib compression, e.g. 3 or "lz4". 0 for none.
     """
 
-    def load(self) -> List[str]:
+    DEFAULT_LOAD_ARGS = {"mmap_mode": None, "cache_storage": str(JOBLIB_CACHE_DIR)}
+    DEFAULT_SAVE_ARGS = {"compress": 0}
+
+    def load(self) -> Any:
         """
         Load a scikit-learn model from a joblib file
 
+        Local files are read in place. Remote files are downloaded once into a local
+        cache, which is reused until the remote file changes.
+
         Returns:
             Any: A scikit-learn model of the appropriate class
         """
-        # TODO: Do this
-        raise NotImplementedError
+        mmap_mode = self.load_args["mmap_mode"]
+
+        if self.protocol == "file":
+            return joblib.load(filename=self.filepath, mmap_mode=mmap_mode)
+
+        if mmap_mode is None:
+            with self.filesystem.open(path=self.filepath, mode="rb") as file:
+                return joblib.load(filename=file)
+
+        # Memory mapping needs a local file
+        local_path = fsspec.open_local(
+            f"filecache::{self.protocol}://{self.filepath}",
+            filecache={
+                "cache_storage": self.load_args["cache_storage"],
+                "check_files": True,
+            },
+            **{self.protocol: self.filesystem.storage_options},
+        )
+
+        return joblib.load(filename=local_path, mmap_mode=mmap_mode)
 
     def save(self, data: Any) -> None:
         """
-        Save a list of strings to a text file
+        Save a Python object, such as a scikit-learn model, to a joblib file
+
+        The file is written straight to its destination, without a local copy.
 
         Args:
             data (Any): A scikit-learn model, such as RandomForestClassifier
@@ -34,11 +72,7 @@ class JoblibFile(Tool):
         Returns:
             None
         """
-        # Save to /tmp/ before using fsspec to move it to its final destination
-        with tempfile.TemporaryDirectory() as temp_directory:
-            temporary_save_path = Path(temp_directory) / Path(self.filepath).name
-            joblib.dump(value=data, filename=temporary_save_path)
-
-            self.filesystem.put_file(lpath=temporary_save_path, rpath=self.filepath)
+        with self.filesystem.open(path=self.filepath, mode="wb") as file:
+            joblib.dump(value=data, filename=file, compress=self.save_args["compress"])
 
         return None
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator
 
-import fsspec
 from fsspec.utils import infer_storage_options
 
+from tools.filesystems import get_filesystem, path_checksum
 from wait_staff.data_models import SourceTraceability
 
 
@@ -13,7 +13,18 @@ class Tool(ABC):
     on any ``fsspec``-supported file-like system
     """
 
-    def __init__(self, filepath: str, credentials: Dict[str, Any] = None,) -> None:
+    # Default options for loading and saving, overridden by the load_args and
+    # save_args given to each instance
+    DEFAULT_LOAD_ARGS: Dict[str, Any] = {}
+    DEFAULT_SAVE_ARGS: Dict[str, Any] = {}
+
+    def __init__(
+        self,
+        filepath: str,
+        credentials: Dict[str, Any] = None,
+        load_args: Dict[str, Any] = None,
+        save_args: Dict[str, Any] = None,
+    ) -> None:
         """
         Instantiate a ``Tool`` object, meant to save and load data
 
@@ -24,6 +35,10 @@ class Tool(ABC):
             credentials (Dict[str, Any]): Credentials required to access to the
                                           filesystem as keys and values.
                                           e.g. {"my_token": "ABCD1234"}
+            load_args (Dict[str, Any]): Options for loading, specific to each tool.
+                                        e.g. {"columns": ["Age", "Fare"]}
+            save_args (Dict[str, Any]): Options for saving, specific to each tool.
+                                        e.g. {"compression": "zstd"}
         """
         storage_options = infer_storage_options(filepath)
         self.protocol = storage_options["protocol"]
@@ -32,7 +47,10 @@ class Tool(ABC):
         if not credentials:
             credentials = {}
 
-        self.filesystem = fsspec.filesystem(protocol=self.protocol, **credentials)
+        self.filesystem = get_filesystem(self.protocol, **credentials)
+
+        self.load_args = {**self.DEFAULT_LOAD_ARGS, **(load_args or {})}
+        self.save_args = {**self.DEFAULT_SAVE_ARGS, **(save_args or {})}
 
     @abstractmethod
     def load(self) -> Any:
@@ -52,6 +70,58 @@ class Tool(ABC):
             "You are using the Tool base class and must " "implement a save() method"
         )
 
+    def iter_load(self) -> Iterator[Any]:
+        """
+        Load data one batch at a time, so that it never has to be held in memory
+        all at once
+
+        Tools which can read incrementally override this. By default, all of the data
+        is loaded as a single batch.
+
+        Returns:
+            Iterator[Any]: Batches of data
+        """
+        yield self.load()
+
+    def save_batches(self, batches: Iterable[Any]) -> None:
+        """
+        Save data one batch at a time, writing each batch as it arrives
+
+        Tools which can write incrementally override this. By default, the batches are
+        collected and saved all at once: DataFrames are concatenated, and a single
+        batch of anything else, e.g. a model from iter_load(), is saved as it is.
+
+        Args:
+            batches (Iterable[Any]): Batches of data, such as Pandas DataFrames
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If there are no batches to save
+            TypeError: If there are several batches, and they aren't all DataFrames,
+                       so can't be combined into one thing to save
+        """
+        # Only imported when batches are collected, to keep pandas off the import path
+        import pandas as pd
+
+        collected = list(batches)
+
+        if not collected:
+            raise ValueError(f"There are no batches to save to {self.filepath}")
+
+        if len(collected) == 1:
+            return self.save(data=collected[0])
+
+        if all(isinstance(batch, pd.DataFrame) for batch in collected):
+            return self.save(data=pd.concat(collected))
+
+        batch_types = sorted({type(batch).__name__ for batch in collected})
+        raise TypeError(
+            f"{type(self).__name__} can't combine {len(collected)} batches of "
+            f"{', '.join(batch_types)} into one file. Only DataFrames are concatenated"
+        )
+
     def exists(self) -> bool:
         """
         Check if a file exists
@@ -61,6 +131,21 @@ class Tool(ABC):
         """
         return self.filesystem.exists(self.filepath)
 
+    def checksum(self) -> str:
+        """
+        Identify the current version of the file from its file system metadata,
+        without reading it
+
+        i.e. ``fsspec`` derives this from the ETag, modification time, and size,
+             whichever the file system provides. For a directory, e.g. a partitioned
+             dataset, it is derived from those of every file within it.
+
+        Returns:
+            str: A token which changes whenever the file, or any file within the
+                 directory, changes
+        """
+        return path_checksum(self.filesystem, self.filepath)
+
     def source(self) -> SourceTraceability:
         """
         Detail the data lineage/provenance for the source data,
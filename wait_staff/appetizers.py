@@ -0,0 +1,233 @@
+"""
+Prepares appetizers: small previews of the data products served by the Kitchen
+
+i.e. A bounded slice of rows and columns from a dish, loaded without downloading or
+     decoding the rest of it
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from pyarrow import ipc
+from tools.pandas.parquet_file import skip_and_take
+from tools.prepare_tools import prepare_tools
+from wait_staff.data_models import FullCourse
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# The python_formats whose tools load tables, or lists which become a one column table.
+# Anything else, e.g. a scikit-learn model, is never loaded to be previewed.
+TABLE_FORMATS = ("pandas", "arrow", "list")
+
+# The key of a cached appetizer: the dish, its version, offset, limit, and columns
+AppetizerKey = Tuple[Tuple[str, str, str], Optional[str], int, int, Optional[tuple]]
+
+
+def to_arrow(batch: Any) -> pa.Table:
+    """
+    Convert one batch loaded by a tool into an Arrow table
+
+    Args:
+        batch (Any): A Pandas DataFrame, Arrow table or record batch, or list
+
+    Returns:
+        pa.Table: The same data as an Arrow table
+
+    Raises:
+        TypeError: If the data is not tabular, e.g. a scikit-learn model
+    """
+    if isinstance(batch, pa.Table):
+        return batch
+    if isinstance(batch, pa.RecordBatch):
+        return pa.Table.from_batches([batch])
+    if isinstance(batch, pd.DataFrame):
+        return pa.Table.from_pandas(batch, preserve_index=False)
+    if isinstance(batch, list):
+        return pa.table({"value": batch})
+
+    raise TypeError(f"A {type(batch).__name__} cannot be previewed as a table")
+
+
+class AppetizerCache:
+    """
+    Keep the most recently ordered appetizers, up to a total size in bytes, so
+    browsing an unchanged dish never loads it twice, however wide its rows are
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2) -> None:
+        """
+        Args:
+            max_bytes (int): The most memory the appetizers may hold, counting every
+                             Arrow buffer they refer to
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+
+        self._appetizers: Dict[AppetizerKey, Tuple[pa.Table, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: AppetizerKey) -> Optional[pa.Table]:
+        """
+        Take an appetizer from the cache, marking it as recently used
+
+        Args:
+            key (AppetizerKey): What was ordered
+
+        Returns:
+            Optional[pa.Table]: The appetizer, or None if it isn't cached
+        """
+        with self._lock:
+            if key not in self._appetizers:
+                return None
+
+            self._appetizers.move_to_end(key)
+            return self._appetizers[key][0]
+
+    def put(self, key: AppetizerKey, appetizer: pa.Table) -> None:
+        """
+        Cache an appetizer, forgetting the least recently used ones until they fit
+
+        Appetizers larger than max_bytes are not cached.
+
+        Args:
+            key (AppetizerKey): What was ordered
+            appetizer (pa.Table): The appetizer
+        """
+        # A slice of a table keeps all of the table's buffers alive, so they all count
+        size = appetizer.get_total_buffer_size()
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._appetizers:
+                self.size -= self._appetizers.pop(key)[1]
+
+            self._appetizers[key] = (appetizer, size)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._appetizers.popitem(last=False)
+                self.size -= evicted_size
+
+
+APPETIZERS = AppetizerCache()
+
+
+def prepare_appetizer(
+    dish: FullCourse, offset: int, limit: int, columns: Optional[List[str]]
+) -> pa.Table:
+    """
+    Load a slice of a dish
+
+    Args:
+        dish (FullCourse): The dish to preview
+        offset (int): Index of the first row to load
+        limit (int): Maximum number of rows to load
+        columns (Optional[List[str]]): Only load these columns
+
+    Returns:
+        pa.Table: Up to limit rows, starting at offset
+    """
+    tool = prepare_tools(
+        python_format=dish.python_format, file_format=dish.file_format
+    )(filepath=str(dish.location))
+
+    # Tools which can read a slice directly, e.g. only the overlapping row groups
+    if hasattr(tool, "preview"):
+        return tool.preview(offset=offset, limit=limit, columns=columns)
+
+    appetizer = skip_and_take(
+        batches=(to_arrow(batch) for batch in tool.iter_load()),
+        offset=offset,
+        limit=limit,
+    )
+
+    return appetizer.select(columns) if columns else appetizer
+
+
+def order_appetizer(
+    dish: FullCourse,
+    version: Optional[str],
+    offset: int,
+    limit: int,
+    columns: Optional[List[str]],
+) -> pa.Table:
+    """
+    Get a slice of a dish, from the cache if it has been ordered before
+
+    Args:
+        dish (FullCourse): The dish to preview
+        version (Optional[str]): The version of the dish, from the Menu
+        offset (int): Index of the first row to load
+        limit (int): Maximum number of rows to load
+        columns (Optional[List[str]]): Only load these columns
+
+    Returns:
+        pa.Table: Up to limit rows, starting at offset
+
+    Raises:
+        TypeError: If the dish isn't a table, checked before anything is loaded
+    """
+    if dish.python_format not in TABLE_FORMATS:
+        raise TypeError(
+            f"Only tables can be previewed, not python_format '{dish.python_format}'. "
+            f"Tables have python_format {', '.join(TABLE_FORMATS)}"
+        )
+
+    key = (
+        (str(dish.location), dish.python_format, dish.file_format),
+        version,
+        offset,
+        limit,
+        tuple(columns) if columns else None,
+    )
+    appetizer = APPETIZERS.get(key)
+    if appetizer is None:
+        appetizer = prepare_appetizer(
+            dish=dish, offset=offset, limit=limit, columns=columns or None
+        )
+        APPETIZERS.put(key, appetizer)
+
+    return appetizer
+
+
+def to_records(appetizer: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Convert an appetizer to JSON-compatible records, with NaN replaced by null
+
+    Args:
+        appetizer (pa.Table): A slice of a dish
+
+    Returns:
+        List[Dict[str, Any]]: One dict per row
+    """
+    for index, field in enumerate(appetizer.schema):
+        if pa.types.is_floating(field.type):
+            column = appetizer.column(index)
+            appetizer = appetizer.set_column(
+                index, field, pc.if_else(pc.is_nan(column), None, column)
+            )
+
+    return appetizer.to_pylist()
+
+
+def to_arrow_stream(appetizer: pa.Table) -> bytes:
+    """
+    Serialize an appetizer in the Arrow IPC streaming format
+
+    Args:
+        appetizer (pa.Table): A slice of a dish
+
+    Returns:
+        bytes: The Arrow IPC stream
+    """
+    sink = pa.BufferOutputStream()
+
+    with ipc.new_stream(sink, appetizer.schema) as writer:
+        writer.write_table(appetizer)
+
+    return sink.getvalue().to_pybytes()
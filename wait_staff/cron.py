@@ -0,0 +1,141 @@
+"""
+A minimal parser for cron-style schedules, e.g. "30 2 * * 1-5"
+
+i.e. The five standard fields - minute, hour, day of month, month, and day of week -
+     each either *, a number, a range a-b, a step */n or a-b/n, or a list of these
+"""
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+# The allowed values of each field, in order
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+def parse_field(field: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    """
+    Parse one field of a cron expression
+
+    Args:
+        field (str): The field, e.g. "*/15" or "1,3-5"
+        name (str): The name of the field, for error messages
+        low (int): The smallest allowed value
+        high (int): The largest allowed value
+
+    Returns:
+        FrozenSet[int]: Every value the field matches
+
+    Raises:
+        ValueError: If the field can't be parsed, or is out of range
+    """
+    values = set()
+
+    for part in field.split(","):
+        span, _, step = part.partition("/")
+        step = int(step) if step else 1
+
+        if span == "*":
+            start, end = low, high
+        elif "-" in span:
+            start, end = (int(value) for value in span.split("-", 1))
+        else:
+            # e.g. "5/15" means every 15 from 5
+            start = int(span)
+            end = high if "/" in part else start
+
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"Invalid {name} '{part}', must be within {low}-{high}")
+
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    When a cron expression fires
+    """
+
+    def __init__(self, expression: str) -> None:
+        """
+        Args:
+            expression (str): Five fields, e.g. "0 3 * * *" for 03:00 every day
+
+        Raises:
+            ValueError: If the expression can't be parsed
+        """
+        fields = expression.split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(
+                f"A cron expression has {len(FIELDS)} fields, got '{expression}'"
+            )
+
+        self.expression = expression
+        parsed: Tuple[FrozenSet[int], ...] = tuple(
+            parse_field(field, name, low, high)
+            for field, (name, low, high) in zip(fields, FIELDS)
+        )
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+
+        # Sunday is both 0 and 7
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+
+        # As in cron, if both days of the month and of the week are restricted, a
+        # day matching either is enough. A field starting with "*", e.g. "*/2", is
+        # unrestricted, so both must match.
+        self._any_day = fields[2].startswith("*") or fields[4].startswith("*")
+
+    def matches_day(self, moment: datetime) -> bool:
+        """
+        Check whether the schedule fires on a day
+
+        Args:
+            moment (datetime): Any time on the day
+
+        Returns:
+            bool: True if the schedule fires at some time on that day
+        """
+        # datetime counts weekdays from Monday, cron from Sunday
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+
+        return (day and weekday) if self._any_day else (day or weekday)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Find the next time the schedule fires
+
+        Args:
+            moment (datetime): The time to start from
+
+        Returns:
+            datetime: The first matching minute after moment
+
+        Raises:
+            ValueError: If the schedule never fires, e.g. on the 31st of February
+        """
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        # Skip whole months, days, and hours which don't match, so this takes at most
+        # a few thousand steps
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self.matches_day(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+
+        raise ValueError(f"The schedule '{self.expression}' never fires")
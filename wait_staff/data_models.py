@@ -3,7 +3,7 @@ Pydantic Data Classes storing data inputs and outputs for this pod
 """
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Union, Optional, List
+from typing import Any, Dict, Union, Optional, List
 
 from pydantic import BaseModel
 
@@ -19,6 +19,8 @@ class Ingredient(BaseModel):
     python_format: str
 
     # Optional parameters
+    load_args: Optional[Dict[str, Any]] = None
+
     date_accessed: Optional[datetime] = None
 
     git_hash: Optional[str] = None
@@ -38,12 +40,18 @@ class FullCourse(BaseModel):
     python_format: str
 
     # Optional parameters
+    save_args: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None
+
     date_generated: Optional[datetime] = None
     ingredients_used: Optional[List[Ingredient]] = None
 
     dvc_hash: Optional[str] = None
     git_hash: Optional[str] = None
 
+    # Hashes of whatever else the dish was cooked with, e.g. the chef's code and recipe
+    cooked_with: Optional[Dict[str, str]] = None
+
 
 class Appetizer(BaseModel):
     """
@@ -57,6 +65,11 @@ class Appetizer(BaseModel):
 
     data_source: Any
 
+    # Which slice of the FullCourse this is
+    offset: int = 0
+    limit: Optional[int] = None
+    columns: Optional[List[str]] = None
+
 
 class SourceTraceability(BaseModel):
     """
@@ -70,3 +83,52 @@ class SourceTraceability(BaseModel):
     """
 
     lineage: Any = None
+
+
+class OrderRequest(BaseModel):
+    """
+    A request for a chef to cook their dishes, e.g. from a POST to /cook.
+
+    The chef is the name of a module in the head_chef directory, e.g. "rf_model_chef".
+    """
+
+    chef: str
+    force: bool = False
+
+
+class Order(BaseModel):
+    """
+    An order for a chef to cook their dishes, and how it is getting on.
+
+    Requests for a chef who already has an order waiting are merged into that order.
+    """
+
+    order_id: str
+    chef: str
+    force: bool = False
+
+    # One of "queued", "cooking", "served", "failed", or "cancelled"
+    status: str = "queued"
+    requests: int = 1
+    error: Optional[str] = None
+
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    seconds: Optional[float] = None
+
+
+class Schedule(BaseModel):
+    """
+    When a chef cooks without being asked, from schedules.yaml.
+
+    The cron expression has the five standard fields, e.g. "0 3 * * *" for 03:00
+    every day.
+    """
+
+    chef: str
+    cron: Optional[str] = None
+    force: bool = False
+    on_startup: bool = False
+
+    next_order: Optional[datetime] = None
@@ -0,0 +1,210 @@
+"""
+Streams the data products served by the Kitchen directly from the API
+
+i.e. A download path for file systems which can't hand out pre-signed URLs, such as
+     local disks and mounted volumes, without buffering whole files in the server
+"""
+import mimetypes
+import os
+import re
+from datetime import datetime
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fsspec.spec import AbstractFileSystem
+from fsspec.utils import infer_storage_options
+
+from tools.filesystems import get_filesystem
+
+CHUNK_SIZE = 1024**2
+
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """
+    The requested byte range lies entirely outside the file
+    """
+
+    def __init__(self, size: int) -> None:
+        super().__init__(f"The file is only {size} bytes long")
+        self.size = size
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header
+
+    i.e. "bytes=0-499", "bytes=500-", or "bytes=-500" (the last 500 bytes). Headers
+         asking for several ranges, or which can't be parsed, are ignored, and the
+         whole file is sent instead, as allowed by RFC 9110.
+
+    Args:
+        range_header (str): The value of the Range header
+        size (int): The size of the file in bytes
+
+    Returns:
+        Optional[Tuple[int, int]]: The first and last byte to send, inclusive, or None
+                                   to send the whole file
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the file, or the
+                             file is empty, so holds no last N bytes either
+    """
+    match = BYTE_RANGE.match(range_header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # A suffix range, i.e. the last N bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable(size=size)
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size:
+        raise RangeNotSatisfiable(size=size)
+    if end < start:
+        return None
+
+    return start, end
+
+
+def entity_tag(info: Dict[str, Any]) -> Optional[str]:
+    """
+    Create an ETag for a file from what its file system says about it right now
+
+    i.e. The file system's own ETag, such as S3's, if it has one, otherwise the time
+         the file was last modified and its size
+
+    Args:
+        info (Dict[str, Any]): The file's info, from the file system's info()
+
+    Returns:
+        Optional[str]: The quoted ETag, or None if the file system gives nothing to
+                       build one from
+    """
+    for key in ("ETag", "etag"):
+        if info.get(key):
+            tag = str(info[key]).strip('"')
+            return f'"{tag}"'
+
+    for key in ("mtime", "LastModified", "updated", "created"):
+        modified = info.get(key)
+        if modified is None:
+            continue
+        # Some file systems give a datetime, others a timestamp or an ISO string
+        if isinstance(modified, datetime):
+            modified = modified.timestamp()
+        return f'"{modified}-{info["size"]}"'
+
+    return None
+
+
+def iter_byte_range(
+    filesystem: AbstractFileSystem,
+    path: str,
+    start: int,
+    end: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Read part of a file in chunks
+
+    Args:
+        filesystem (AbstractFileSystem): The file system holding the file
+        path (str): Path to the file within the file system
+        start (int): The first byte to read
+        end (int): The last byte to read, inclusive
+        chunk_size (int): Number of bytes to read at a time
+
+    Yields:
+        bytes: The next chunk of the file
+    """
+    with filesystem.open(path=path, mode="rb", block_size=chunk_size) as file:
+        file.seek(start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_dish(
+    location: Union[str, os.PathLike],
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+) -> Response:
+    """
+    Create a response which sends a dish, or the part of it which was asked for
+
+    Local files are sent by the ASGI server itself with a FileResponse, which handles
+    Range requests and uses sendfile where the server supports it. Files on any other
+    file system are streamed in chunks through ``fsspec``, with an ETag built from the
+    file's info fetched for this request, so a partial download is never resumed from
+    a file which has since been rewritten.
+
+    Args:
+        location (Union[str, os.PathLike]): Path to the dish, with optional protocol
+        range_header (Optional[str]): The value of the request's Range header
+        if_range (Optional[str]): The value of the request's If-Range header
+
+    Returns:
+        Response: A 200 response with the whole file, or 206 with part of it
+
+    Raises:
+        FileNotFoundError: If the dish has not been cooked yet
+        IsADirectoryError: If the dish is a directory, e.g. a partitioned dataset
+        RangeNotSatisfiable: If the requested range lies outside the file
+    """
+    storage_options = infer_storage_options(str(location))
+    protocol = storage_options["protocol"]
+    path = storage_options["path"]
+    filename = PurePosixPath(path).name
+
+    if protocol == "file":
+        stat_result = os.stat(path)
+        if not os.path.isfile(path):
+            raise IsADirectoryError(f"{location} is not a single file")
+        return FileResponse(path=path, filename=filename, stat_result=stat_result)
+
+    filesystem = get_filesystem(protocol)
+    info = filesystem.info(path)
+    if info["type"] != "file":
+        raise IsADirectoryError(f"{location} is not a single file")
+
+    size = info["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    etag = entity_tag(info)
+    if etag is not None:
+        headers["ETag"] = etag
+
+    # An If-Range which doesn't match the file as it is now gets the whole file
+    byte_range = None
+    if range_header and (if_range is None or (etag is not None and if_range == etag)):
+        byte_range = parse_byte_range(range_header=range_header, size=size)
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    return StreamingResponse(
+        content=iter_byte_range(filesystem=filesystem, path=path, start=start, end=end),
+        status_code=206 if byte_range is not None else 200,
+        headers=headers,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+    )
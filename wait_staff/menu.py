@@ -0,0 +1,144 @@
+"""
+The Menu lists the dishes served by this Kitchen, without doing any cooking
+
+i.e. A catalog of the data products declared in full_course.yaml, loaded once and
+     refreshed only when the YAML file or the output artifacts themselves change
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import yaml
+from fsspec.utils import infer_storage_options
+
+from tools.filesystems import get_filesystem, path_checksum
+from tools.prepare_tools import validate_tool
+from wait_staff.data_models import FullCourse
+
+FULL_COURSE = Path("/app/head_chef/full_course.yaml")
+
+logger = logging.getLogger(__name__)
+
+
+def load_full_course(full_course: Union[str, Path]) -> Dict[str, FullCourse]:
+    """
+    Read the instructions for the full course without preparing any ingredients
+
+    Args:
+        full_course (Path): A YAML file within the head_chef directory describing
+                            the data products to create
+
+    Returns:
+        Dict[str, FullCourse]: The dishes in the full course, keyed by name
+
+    Raises:
+        ValueError: If there is no tool to save one of the dishes
+    """
+    with open(full_course) as file:
+        dishes = {
+            dish_name: FullCourse(**dish)
+            for dish_name, dish in yaml.safe_load(file).items()
+        }
+
+    for dish in dishes.values():
+        validate_tool(python_format=dish.python_format, file_format=dish.file_format)
+
+    return dishes
+
+
+def artifact_version(location: Union[str, Path]) -> Optional[str]:
+    """
+    Identify the current version of an output artifact from its file system metadata
+
+    i.e. The ETag, modification time, or size reported by ``fsspec``, whichever the
+         file system provides, of the artifact or every file in it if it's a
+         directory. No data is read.
+
+    Args:
+        location (Union[str, Path]): Path to the artifact, with optional protocol
+
+    Returns:
+        Optional[str]: A token which changes when the artifact changes, or None if the
+                       artifact does not exist (yet), or can't be reached
+    """
+    try:
+        storage_options = infer_storage_options(str(location))
+        filesystem = get_filesystem(storage_options["protocol"])
+
+        return path_checksum(filesystem, storage_options["path"])
+    except FileNotFoundError:
+        return None
+    except Exception as exception:
+        # The menu is written at startup, which must never fail because storage is
+        # unreachable, e.g. without credentials, a network, or the protocol installed
+        logger.warning(
+            "Could not check %s: %s: %s", location, type(exception).__name__, exception
+        )
+        return None
+
+
+class Menu:
+    """
+    The dishes on offer, as declared in full_course.yaml
+
+    i.e. The server reads this catalog instead of instantiating a HeadChef, so that
+         listing the data products never loads any data
+    """
+
+    def __init__(
+        self, full_course: Path = FULL_COURSE, refresh_interval: float = 30.0
+    ) -> None:
+        """
+        Write the menu from the full course instructions
+
+        Args:
+            full_course (Path): A YAML file within the head_chef directory describing
+                                the data products to serve
+            refresh_interval (float): Minimum number of seconds between checks of the
+                                      output artifacts for changes
+        """
+        self.full_course_path = Path(full_course)
+        self.refresh_interval = refresh_interval
+
+        self.courses: Dict[str, FullCourse] = dict()
+        self.versions: Dict[str, Optional[str]] = dict()
+
+        self._full_course_mtime: Optional[float] = None
+        self._artifacts_checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Re-read full_course.yaml if it was modified, and re-check the output artifacts
+        if the refresh interval has passed
+
+        Returns:
+            bool: True if the menu changed
+        """
+        with self._lock:
+            changed = False
+
+            full_course_mtime = self.full_course_path.stat().st_mtime
+            if full_course_mtime != self._full_course_mtime:
+                self.courses = load_full_course(self.full_course_path)
+                self._full_course_mtime = full_course_mtime
+                self._artifacts_checked_at = 0.0
+                changed = True
+
+            if time.monotonic() - self._artifacts_checked_at >= self.refresh_interval:
+                versions = {
+                    dish_name: artifact_version(dish.location)
+                    for dish_name, dish in self.courses.items()
+                }
+                self._artifacts_checked_at = time.monotonic()
+
+                if versions != self.versions:
+                    self.versions = versions
+                    changed = True
+
+            return changed
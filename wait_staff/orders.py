@@ -0,0 +1,361 @@
+"""
+Takes orders for the Head Chefs, and has them cooked in the background
+
+i.e. An async job queue in the server: each order runs one chef in its own process,
+     at most max_cooking at a time, and can be followed and cancelled through the API
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from datetime import datetime
+from importlib import import_module
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Union
+from uuid import uuid4
+
+import yaml
+
+from wait_staff.cron import CronSchedule
+from wait_staff.data_models import Order, Schedule
+
+CHEFS_DIR = Path(__file__).parents[1] / "head_chef"
+
+SCHEDULES = Path("/app/head_chef/schedules.yaml")
+
+# Chefs run in freshly spawned processes, which share nothing with the server, and can
+# be terminated without leaving it in a broken state
+CONTEXT = multiprocessing.get_context("spawn")
+
+
+def available_chefs() -> List[str]:
+    """
+    Find every chef in the head_chef directory, without importing any of them
+
+    i.e. Each head_chef/<name>_chef.py module holds a chef class named after it, e.g.
+         rf_model_chef.py holds RfModelChef
+
+    Returns:
+        List[str]: The names of the chefs, e.g. ["rf_model_chef", "rf_search_chef"]
+    """
+    return sorted(
+        module.stem
+        for module in CHEFS_DIR.glob("*_chef.py")
+        if module.stem != "head_chef"
+    )
+
+
+def validate_chef(chef: str) -> None:
+    """
+    Check that a chef exists, without importing it
+
+    Args:
+        chef (str): The name of the chef, e.g. "rf_model_chef"
+
+    Raises:
+        ValueError: If there is no such chef
+    """
+    if chef not in available_chefs():
+        raise ValueError(
+            f"There is no chef named '{chef}'. "
+            f"Available chefs are: {', '.join(available_chefs())}"
+        )
+
+
+def chef_class(chef: str) -> type:
+    """
+    Import a chef's class
+
+    Args:
+        chef (str): The name of the chef, e.g. "rf_model_chef"
+
+    Returns:
+        type: The HeadChef subclass, e.g. RfModelChef
+
+    Raises:
+        ValueError: If there is no such chef
+    """
+    validate_chef(chef)
+
+    # Cast to CamelCase for class name
+    class_name = "".join(word.title() for word in chef.split("_"))
+
+    return getattr(import_module(f"head_chef.{chef}"), class_name)
+
+
+def in_own_session(target: Callable, *args: Any) -> None:
+    """
+    Run a function in a new session, so the process and every process it starts, e.g.
+    joblib's workers, are in a process group of their own, which can be stopped as one
+
+    Args:
+        target (Callable): The function to run
+        *args (Any): Passed on to target
+    """
+    os.setsid()
+    target(*args)
+
+
+def cook_order(chef: str, force: bool, connection: Connection) -> None:
+    """
+    Have a chef serve their dishes. Runs in the order's own process.
+
+    Args:
+        chef (str): The name of the chef, e.g. "rf_model_chef"
+        force (bool): Cook even if the saved fingerprints match
+        connection (Connection): Where to send None once served, or the error raised
+    """
+    try:
+        chef_class(chef)().serve(force=force)
+        connection.send(None)
+    except Exception as error:
+        connection.send(f"{type(error).__name__}: {error}")
+    finally:
+        connection.close()
+
+
+class OrderQueue:
+    """
+    The orders for the Head Chefs, cooked in the background, a bounded number at a
+    time
+
+    Must be created within the server's event loop.
+    """
+
+    def __init__(self, max_cooking: int = 1, history: int = 100) -> None:
+        """
+        Args:
+            max_cooking (int): The maximum number of orders to cook at once. Chefs
+                               already use every core, e.g. to train models, so by
+                               default orders are cooked one at a time
+            history (int): The number of finished orders to remember
+        """
+        self.max_cooking = max_cooking
+        self.history = history
+
+        self.orders: Dict[str, Order] = dict()
+
+        self._cooking = asyncio.Semaphore(max_cooking)
+        self._chef_locks: Dict[str, asyncio.Lock] = dict()
+        self._tasks: Dict[str, asyncio.Task] = dict()
+        self._processes: Dict[str, BaseProcess] = dict()
+
+    def submit(self, chef: str, force: bool = False) -> Order:
+        """
+        Order a chef to cook their dishes
+
+        If the chef already has an order waiting, the request is merged into it, so
+        a chef is never asked to cook the same thing twice in a row.
+
+        Args:
+            chef (str): The name of the chef, e.g. "rf_model_chef"
+            force (bool): Cook even if the saved fingerprints match
+
+        Returns:
+            Order: The order, new or merged
+
+        Raises:
+            ValueError: If there is no such chef
+        """
+        validate_chef(chef)
+
+        for order in self.orders.values():
+            if order.chef == chef and order.status == "queued":
+                order.requests += 1
+                order.force = order.force or force
+                return order
+
+        order = Order(
+            order_id=uuid4().hex, chef=chef, force=force, submitted_at=datetime.now()
+        )
+        self.orders[order.order_id] = order
+        self._tasks[order.order_id] = asyncio.ensure_future(self._cook(order))
+
+        self._forget_finished_orders()
+
+        return order
+
+    def cancel(self, order_id: str) -> Order:
+        """
+        Cancel an order, whether it is waiting or cooking
+
+        Args:
+            order_id (str): The order to cancel
+
+        Returns:
+            Order: The order
+
+        Raises:
+            KeyError: If there is no such order
+        """
+        order = self.orders[order_id]
+
+        if order.status == "queued":
+            self._finish(order, status="cancelled")
+            self._tasks[order_id].cancel()
+        elif order.status == "cooking":
+            self._finish(order, status="cancelled")
+            if order_id in self._processes:
+                self._stop(self._processes[order_id])
+
+        return order
+
+    def close(self) -> None:
+        """
+        Cancel every order which has not been served yet
+        """
+        for order_id in list(self.orders):
+            self.cancel(order_id)
+
+    async def _cook(self, order: Order) -> None:
+        """
+        Wait for the chef and a free place in the kitchen, then cook an order in its
+        own process
+        """
+        # Never have the same chef cook two orders at once
+        chef_lock = self._chef_locks.setdefault(order.chef, asyncio.Lock())
+
+        async with chef_lock, self._cooking:
+            order.status = "cooking"
+            order.started_at = datetime.now()
+            start = time.perf_counter()
+
+            receiver, sender = CONTEXT.Pipe(duplex=False)
+            process = CONTEXT.Process(
+                target=in_own_session,
+                args=(cook_order, order.chef, order.force, sender),
+                name=f"order-{order.order_id}",
+            )
+            process.start()
+            sender.close()
+            self._processes[order.order_id] = process
+
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, process.join)
+                error = receiver.recv()
+            except EOFError:
+                # The process died without saying how it got on
+                error = None
+            finally:
+                del self._processes[order.order_id]
+                receiver.close()
+
+            order.seconds = time.perf_counter() - start
+
+            # Cancelled while cooking, i.e. the process was terminated
+            if order.status == "cancelled":
+                return
+
+            if error is None and process.exitcode != 0:
+                error = f"The chef's process exited with code {process.exitcode}"
+
+            order.error = error
+            self._finish(order, status="failed" if error else "served")
+
+    @staticmethod
+    def _stop(process: BaseProcess) -> None:
+        """
+        Terminate an order's process, and every process it started, e.g. the workers
+        training a model, which would otherwise keep running
+        """
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            # The process hasn't started its own session yet, so started nothing else
+            process.terminate()
+
+    @staticmethod
+    def _finish(order: Order, status: str) -> None:
+        """
+        Record how an order ended
+        """
+        order.status = status
+        order.finished_at = datetime.now()
+
+    def _forget_finished_orders(self) -> None:
+        """
+        Keep only the most recent finished orders
+        """
+        finished = [
+            order_id
+            for order_id, order in self.orders.items()
+            if order.finished_at is not None
+        ]
+
+        for order_id in finished[: max(len(finished) - self.history, 0)]:
+            del self.orders[order_id]
+            self._tasks.pop(order_id, None)
+
+
+def load_schedules(schedules: Union[str, Path] = SCHEDULES) -> Dict[str, Schedule]:
+    """
+    Read when each chef should cook without being asked
+
+    Args:
+        schedules (Union[str, Path]): A YAML file listing schedules by chef, e.g.
+                                      rf_model_chef:
+                                        cron: "0 3 * * *"
+                                        on_startup: true
+
+    Returns:
+        Dict[str, Schedule]: The schedule of each chef, or nothing if the file
+                             doesn't exist
+
+    Raises:
+        ValueError: If a chef doesn't exist, or a cron expression is invalid
+    """
+    if not Path(schedules).exists():
+        return dict()
+
+    with open(schedules) as file:
+        loaded = {
+            chef: Schedule(chef=chef, **(schedule or dict()))
+            for chef, schedule in (yaml.safe_load(file) or dict()).items()
+        }
+
+    for schedule in loaded.values():
+        validate_chef(schedule.chef)
+        if schedule.cron is not None:
+            CronSchedule(schedule.cron)
+
+    return loaded
+
+
+async def order_on_schedule(
+    order_queue: OrderQueue, schedules: Dict[str, Schedule]
+) -> None:
+    """
+    Submit orders when the schedules say so, forever
+
+    Args:
+        order_queue (OrderQueue): Where to submit orders
+        schedules (Dict[str, Schedule]): The schedule of each chef
+    """
+    for schedule in schedules.values():
+        if schedule.on_startup:
+            order_queue.submit(chef=schedule.chef, force=schedule.force)
+
+    crons = {
+        chef: CronSchedule(schedule.cron)
+        for chef, schedule in schedules.items()
+        if schedule.cron is not None
+    }
+    if not crons:
+        return
+
+    for chef, cron in crons.items():
+        schedules[chef].next_order = cron.next_after(datetime.now())
+
+    while True:
+        chef = min(crons, key=lambda chef: schedules[chef].next_order)
+        schedule = schedules[chef]
+
+        delay = (schedule.next_order - datetime.now()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        order_queue.submit(chef=chef, force=schedule.force)
+        schedule.next_order = crons[chef].next_after(schedule.next_order)
@@ -1,9 +1,14 @@
 """
 Generates pre-signed URL links to download data served through the server APIs
 """
-import fsspec
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
 from fsspec.utils import infer_storage_options
 
+from tools.filesystems import get_filesystem
+
 
 def create_presigned_url(filepath: str, expiration: int = 120) -> str:
     """
@@ -15,6 +20,9 @@ def create_presigned_url(filepath: str, expiration: int = 120) -> str:
 
     Returns:
         str: Pre-signed URL pointing to the file to be downloaded
+
+    Raises:
+        NotImplementedError: If the file system can't sign URLs, e.g. a local disk
     """
 
     # Generate a pre-signed URL for the S3 object
@@ -22,7 +30,66 @@ def create_presigned_url(filepath: str, expiration: int = 120) -> str:
     protocol = storage_options["protocol"]
     filepath = storage_options["path"]
 
-    filesystem = fsspec.filesystem(protocol=protocol)
+    filesystem = get_filesystem(protocol)
+    if not hasattr(filesystem, "url"):
+        raise NotImplementedError(f"The {protocol} file system can't sign URLs")
 
     # The response contains the pre-signed URL
     return filesystem.url(path=filepath, expires=expiration)
+
+
+class PresignedUrlCache:
+    """
+    Reuse pre-signed URLs until shortly before they expire, so that repeatedly
+    asking for the same files doesn't pay the signing cost every time
+    """
+
+    def __init__(self, expiration: int = 120, margin: int = 20) -> None:
+        """
+        Args:
+            expiration (int): Time in seconds before each link expires
+            margin (int): Stop handing out a link this many seconds before it expires,
+                          so that clients have time to use it
+        """
+        self.expiration = expiration
+        self.margin = margin
+
+        self._urls: Dict[Tuple[str, Optional[str]], Tuple[str, float]] = dict()
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str, version: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Get a pre-signed URL to a file, signing a new one if there is no usable one
+
+        Args:
+            filepath (str): Path to the file to create a pre-signed URL to download
+            version (Optional[str]): The version of the file, e.g. from the Menu. A new
+                                     URL is signed whenever the file changes.
+
+        Returns:
+            Tuple[str, float]: The pre-signed URL, and the number of seconds it can
+                               still be handed out for
+        """
+        key = (filepath, version)
+
+        with self._lock:
+            url, expires_at = self._urls.get(key, (None, 0.0))
+
+        remaining = expires_at - self.margin - time.monotonic()
+        if url is not None and remaining > 0:
+            return url, remaining
+
+        url = create_presigned_url(filepath=filepath, expiration=self.expiration)
+        expires_at = time.monotonic() + self.expiration
+
+        with self._lock:
+            # Forget expired URLs, including those for old versions of files
+            now = time.monotonic()
+            self._urls = {
+                cached_key: cached
+                for cached_key, cached in self._urls.items()
+                if cached[1] - self.margin > now
+            }
+            self._urls[key] = (url, expires_at)
+
+        return url, self.expiration - self.margin
@@ -0,0 +1,210 @@
+"""
+Serves the static reports from their manifest, precompressed
+
+i.e. The manifest written by window_display/report_manifest.py is held in memory, and
+     each report is sent in the best encoding the client accepts, with an ETag, so
+     unchanged reports are never sent twice
+"""
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.responses import FileResponse, Response
+
+from window_display.report_manifest import (
+    ENCODINGS,
+    MANIFEST,
+    REPORTS_DIR,
+    load_manifest,
+)
+
+REPORT_MEDIA_TYPE = "text/html; charset=utf-8"
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header
+
+    Args:
+        accept_encoding (Optional[str]): The header, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        Dict[str, float]: The quality of each accepted encoding, e.g. {"gzip": 1.0}
+    """
+    encodings = dict()
+
+    for part in (accept_encoding or "").split(","):
+        encoding, _, parameters = part.strip().partition(";")
+        if not encoding:
+            continue
+
+        quality = 1.0
+        name, _, value = parameters.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+
+        encodings[encoding.strip().lower()] = quality
+
+    return encodings
+
+
+def choose_encoding(
+    accept_encoding: Optional[str], available: Iterable[str]
+) -> Optional[str]:
+    """
+    Negotiate the encoding to send a report in
+
+    Args:
+        accept_encoding (Optional[str]): The request's Accept-Encoding header
+        available (Iterable[str]): The encodings the report was saved in, in order of
+                                   preference, e.g. ["br", "gzip"]
+
+    Returns:
+        Optional[str]: The available encoding with the highest quality, or None to
+                       send the report as is
+    """
+    accepted = accepted_encodings(accept_encoding)
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, weakly, as RFC 9110 requires
+
+    Args:
+        if_none_match (Optional[str]): The request's If-None-Match header
+        etag (str): The quoted ETag of the report
+
+    Returns:
+        bool: True if the client already has this version of the report
+    """
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+
+    return "*" in tags or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in tags
+    )
+
+
+class ReportShelf:
+    """
+    The static reports on offer, as listed in their manifest
+
+    i.e. The manifest is only re-read when it changes, so listing and serving reports
+         never lists or reads the reports directory
+    """
+
+    def __init__(self, reports_dir: Path = REPORTS_DIR) -> None:
+        """
+        Args:
+            reports_dir (Path): The directory holding the reports and their manifest
+        """
+        self.reports_dir = Path(reports_dir)
+
+        self.reports: Dict[str, Dict[str, Any]] = dict()
+
+        self._manifest_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Re-read the manifest if it was modified
+
+        Returns:
+            bool: True if the reports changed
+        """
+        with self._lock:
+            try:
+                manifest_mtime = (self.reports_dir / MANIFEST).stat().st_mtime
+            except FileNotFoundError:
+                manifest_mtime = None
+
+            if manifest_mtime == self._manifest_mtime:
+                return False
+
+            self.reports = load_manifest(reports_dir=self.reports_dir)
+            self._manifest_mtime = manifest_mtime
+
+            return True
+
+    def find(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a report by the name of its HTML file
+
+        Args:
+            file_name (str): e.g. "model_results.html"
+
+        Returns:
+            Optional[Dict[str, Any]]: The report's manifest entry, or None if the
+                                      report isn't in the manifest
+        """
+        self.refresh()
+
+        for entry in self.reports.values():
+            if entry["file"] == file_name:
+                return entry
+
+        return None
+
+    def serve(
+        self,
+        entry: Dict[str, Any],
+        accept_encoding: Optional[str],
+        if_none_match: Optional[str],
+    ) -> Response:
+        """
+        Send a report in the best encoding the client accepts
+
+        Args:
+            entry (Dict[str, Any]): The report's manifest entry
+            accept_encoding (Optional[str]): The request's Accept-Encoding header
+            if_none_match (Optional[str]): The request's If-None-Match header
+
+        Returns:
+            Response: The report, or 304 Not Modified if the client already has it
+        """
+        encoding = choose_encoding(
+            accept_encoding,
+            available=[
+                encoding for encoding in ENCODINGS if encoding in entry["encodings"]
+            ],
+        )
+
+        # Each encoding is a different representation, so has its own ETag
+        etag = f'"{entry["etag"]}-{encoding}"' if encoding else f'"{entry["etag"]}"'
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+
+        if etag_matches(if_none_match, etag=etag):
+            return Response(status_code=304, headers=headers)
+
+        # The files named in the entry only ever hold the version it describes
+        if encoding is None:
+            return FileResponse(
+                self.reports_dir / entry["stored"],
+                media_type=REPORT_MEDIA_TYPE,
+                headers=headers,
+            )
+
+        return FileResponse(
+            self.reports_dir / entry["encodings"][encoding]["file"],
+            media_type=REPORT_MEDIA_TYPE,
+            headers={**headers, "Content-Encoding": encoding},
+        )
@@ -1,44 +1,306 @@
 """
 REST endpoints to discover, inspect, and acquire data produced in the kitchen
 """
-from pathlib import Path
+import asyncio
+from enum import Enum
+from typing import List, Optional, Tuple
 
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 
-from head_chef.head_chef import HeadChef
-from wait_staff.presigned_urls import create_presigned_url
+from tools.filesystems import FILESYSTEM_POOL
+from wait_staff.data_models import Appetizer, Order, OrderRequest, Schedule
+from wait_staff.menu import Menu
+from wait_staff.orders import OrderQueue, load_schedules, order_on_schedule
+from wait_staff.presigned_urls import PresignedUrlCache
+from wait_staff.reports import ReportShelf
 
 app = FastAPI()
 
-app.mount(
-    "/reports", StaticFiles(directory="static_reports", html=True), name="reports"
-)
 templates = Jinja2Templates(directory="static_reports")
 
 
+@app.on_event("startup")
+async def write_menu() -> None:
+    """
+    Write the menu once, when the server starts
+
+    i.e. Load full_course.yaml into a catalog, without instantiating any chef or
+         loading any data
+    """
+    app.state.menu = Menu()
+    app.state.presigned_urls = PresignedUrlCache()
+
+
+@app.on_event("startup")
+async def dress_window() -> None:
+    """
+    Read the manifest of the static reports once, when the server starts
+    """
+    app.state.reports = ReportShelf()
+
+
+@app.on_event("startup")
+async def open_kitchen() -> None:
+    """
+    Start taking orders for the chefs, and submit them on schedule from
+    schedules.yaml, if there is one
+    """
+    app.state.orders = OrderQueue()
+    app.state.schedules = load_schedules()
+    app.state.scheduler = asyncio.ensure_future(
+        order_on_schedule(order_queue=app.state.orders, schedules=app.state.schedules)
+    )
+
+
+@app.on_event("shutdown")
+async def close_kitchen() -> None:
+    """
+    Stop submitting orders on schedule, and cancel any orders not yet served
+    """
+    app.state.scheduler.cancel()
+    app.state.orders.close()
+
+
 @app.get("/full_course")
-async def get_full_course() -> JSONResponse:
+async def get_full_course(request: Request) -> JSONResponse:
     """
     Gets the full course served by the Head Chef
     i.e. Get pre-signed URLs to download all of the data products from this node
 
+    Dishes on file systems which can't sign URLs, e.g. local disks, link to
+    /full_course/{dish_name}/download instead.
+
+    Args:
+        request (Request): The request, used to build download links
+
     Returns:
         JSONResponse: JSON serialized dictionary listing names of data sources as
-                      keys and pre-signed URLs to these sources as values
+                      keys and pre-signed URLs to these sources as values, cacheable
+                      until the first of the URLs stops being handed out
+    """
+    menu = app.state.menu
+    presigned_urls = app.state.presigned_urls
+    await run_in_threadpool(menu.refresh)
+
+    async def sign(dish_name: str) -> Tuple[str, float]:
+        try:
+            return await run_in_threadpool(
+                presigned_urls.get,
+                filepath=str(menu.courses[dish_name].location),
+                version=menu.versions.get(dish_name),
+            )
+        except NotImplementedError:
+            download_url = request.url_for("download_dish", dish_name=dish_name)
+            return str(download_url), presigned_urls.expiration - presigned_urls.margin
+
+    # Signing is blocking, so sign all of the URLs at once, off the event loop
+    dish_names = list(menu.courses)
+    signed_urls = await asyncio.gather(*(sign(dish_name) for dish_name in dish_names))
+
+    urls_to_deliver = {
+        dish_name: url for dish_name, (url, _) in zip(dish_names, signed_urls)
+    }
+    max_age = int(min((remaining for _, remaining in signed_urls), default=0))
+
+    return JSONResponse(
+        content=urls_to_deliver,
+        headers={"Cache-Control": f"private, max-age={max_age}"},
+    )
+
+
+@app.get("/full_course/{dish_name}/download", response_model=None)
+async def download_dish(dish_name: str, request: Request) -> Response:
+    """
+    Downloads one dish served by the Head Chef
+    i.e. Stream a data product straight from the API, for file systems without
+         pre-signed URLs. Supports HTTP Range requests, to resume downloads or fetch
+         part of a file, e.g. a parquet footer.
+
+    Args:
+        dish_name (str): The name of the dish in full_course.yaml
+        request (Request): The request, with optional Range and If-Range headers
+
+    Returns:
+        Response: The whole dish, or the requested byte range of it
+    """
+    from wait_staff.downloads import RangeNotSatisfiable, serve_dish
+
+    menu = app.state.menu
+    await run_in_threadpool(menu.refresh)
+
+    if dish_name not in menu.courses:
+        raise HTTPException(status_code=404, detail=f"No dish named {dish_name}")
+
+    try:
+        return await run_in_threadpool(
+            serve_dish,
+            location=menu.courses[dish_name].location,
+            range_header=request.headers.get("range"),
+            if_range=request.headers.get("if-range"),
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{dish_name} has not been cooked")
+    except IsADirectoryError as error:
+        raise HTTPException(status_code=422, detail=error.args[0])
+    except RangeNotSatisfiable as error:
+        return Response(
+            status_code=416, headers={"Content-Range": f"bytes */{error.size}"}
+        )
+
+
+class AppetizerFormat(str, Enum):
+    json = "json"
+    arrow = "arrow"
+
+
+@app.get("/appetizer/{dish_name}", response_model=None)
+async def get_appetizer(
+    dish_name: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=10_000),
+    columns: Optional[List[str]] = Query(None),
+    format: AppetizerFormat = AppetizerFormat.json,
+) -> Response:
+    """
+    Gets an appetizer served by the Head Chef
+    i.e. Get a bounded preview of one data product, without downloading all of it
+
+    Args:
+        dish_name (str): The name of the dish in full_course.yaml
+        offset (int): Index of the first row to preview
+        limit (int): Maximum number of rows to preview
+        columns (Optional[List[str]]): Only preview these columns
+        format (AppetizerFormat): "json" for an Appetizer, or "arrow" for an Arrow
+                                  IPC stream
+
+    Returns:
+        Response: The preview, as JSON or an Arrow IPC stream
+    """
+    # Only import pyarrow and pandas once an appetizer is actually ordered
+    from wait_staff.appetizers import (
+        ARROW_STREAM_MEDIA_TYPE,
+        order_appetizer,
+        to_arrow_stream,
+        to_records,
+    )
+
+    menu = app.state.menu
+    await run_in_threadpool(menu.refresh)
+
+    if dish_name not in menu.courses:
+        raise HTTPException(status_code=404, detail=f"No dish named {dish_name}")
+
+    try:
+        appetizer = await run_in_threadpool(
+            order_appetizer,
+            dish=menu.courses[dish_name],
+            version=menu.versions.get(dish_name),
+            offset=offset,
+            limit=limit,
+            columns=columns,
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{dish_name} has not been cooked")
+    except (TypeError, KeyError) as error:
+        raise HTTPException(status_code=422, detail=error.args[0])
+
+    if format == AppetizerFormat.arrow:
+        return Response(
+            content=to_arrow_stream(appetizer), media_type=ARROW_STREAM_MEDIA_TYPE
+        )
+
+    return JSONResponse(
+        content=Appetizer(
+            data_source=to_records(appetizer),
+            offset=offset,
+            limit=limit,
+            columns=appetizer.column_names,
+        ).model_dump(mode="json")
+    )
+
+
+@app.post("/cook", status_code=202)
+async def post_order(order_request: OrderRequest) -> Order:
     """
-    head_chef = HeadChef()
+    Orders a chef to cook their dishes, in the background
+    i.e. Refresh data products without restarting the kitchen. If the chef already
+         has an order waiting, the request is merged into it.
 
-    urls_to_deliver = {}
-    for dish_name, dish in head_chef.full_course.items():
-        urls_to_deliver[dish_name] = create_presigned_url(filepath=dish.location)
+    Args:
+        order_request (OrderRequest): The chef, e.g. "rf_model_chef", and whether to
+                                      cook even if nothing has changed
 
-    return JSONResponse(content=urls_to_deliver)
+    Returns:
+        Order: The order, to follow at /cook/{order_id}
+    """
+    try:
+        return app.state.orders.submit(
+            chef=order_request.chef, force=order_request.force
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=404, detail=error.args[0])
+
+
+@app.get("/cook")
+async def get_orders() -> List[Order]:
+    """
+    Lists the orders which are waiting, cooking, or recently finished
+
+    Returns:
+        List[Order]: The orders, oldest first
+    """
+    return list(app.state.orders.orders.values())
 
 
-@app.get("/reports", response_class=HTMLResponse)
+@app.get("/cook/{order_id}")
+async def get_order(order_id: str) -> Order:
+    """
+    Gets how an order is getting on
+
+    Args:
+        order_id (str): The order, as returned by POST /cook
+
+    Returns:
+        Order: The order's status and timings
+    """
+    try:
+        return app.state.orders.orders[order_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No order {order_id}")
+
+
+@app.delete("/cook/{order_id}")
+async def cancel_order(order_id: str) -> Order:
+    """
+    Cancels an order, whether it is waiting or cooking
+
+    Args:
+        order_id (str): The order, as returned by POST /cook
+
+    Returns:
+        Order: The cancelled order
+    """
+    try:
+        return app.state.orders.cancel(order_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No order {order_id}")
+
+
+@app.get("/schedules")
+async def get_schedules() -> List[Schedule]:
+    """
+    Lists when each chef cooks without being asked
+
+    Returns:
+        List[Schedule]: The schedules, with the time of each chef's next order
+    """
+    return list(app.state.schedules.values())
+
+
+@app.get("/reports", response_class=HTMLResponse, response_model=None)
 async def get_reports(request: Request) -> Jinja2Templates.TemplateResponse:
     """
     Display an index page which links to all generated reports
@@ -46,19 +308,53 @@ async def get_reports(request: Request) -> Jinja2Templates.TemplateResponse:
     Returns:
         Jinja2Templates.TemplateResponse: HTML page linking to data reports
     """
-    path_to_html_reports = Path("/app") / "static_reports"
-
-    # Find static HTML reports files
-    available_reports = list(path_to_html_reports.glob("*.html"))
+    report_shelf = app.state.reports
+    report_shelf.refresh()
 
-    reports = list()
-    for report in sorted(available_reports):
-        if "index.html" not in str(report):
-            reports.append((f"{str(report.stem)}", f"reports/{str(report.name)}"))
+    # List the reports in the manifest, rather than searching the reports directory
+    reports = [
+        (report_name, f"reports/{entry['file']}")
+        for report_name, entry in sorted(report_shelf.reports.items())
+    ]
 
     # Link to the custom report as well
     reports.append(("Custom Report", "http://localhost:80"))
 
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "reports": reports}
+    return templates.TemplateResponse(request, "index.html", {"reports": reports})
+
+
+@app.get("/reports/{file_name}", response_model=None)
+async def get_report(file_name: str, request: Request) -> Response:
+    """
+    Gets one static report, compressed if the client accepts it
+
+    Args:
+        file_name (str): The report's HTML file, e.g. "model_results.html"
+        request (Request): The request, with optional Accept-Encoding and
+                           If-None-Match headers
+
+    Returns:
+        Response: The report, or 304 Not Modified if the client already has it
+    """
+    report_shelf = app.state.reports
+
+    entry = report_shelf.find(file_name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No report named {file_name}")
+
+    return report_shelf.serve(
+        entry=entry,
+        accept_encoding=request.headers.get("accept-encoding"),
+        if_none_match=request.headers.get("if-none-match"),
     )
+
+
+@app.get("/filesystem_pool")
+async def get_filesystem_pool() -> JSONResponse:
+    """
+    Show how often the server reused its file system connections
+
+    Returns:
+        JSONResponse: Pool hits and misses, and file system instances created
+    """
+    return JSONResponse(content=FILESYSTEM_POOL.stats())
@@ -0,0 +1,94 @@
+"""
+Measures how long it takes to import the server, using ``python -X importtime``
+
+i.e. Container cold start is dominated by imports, so this lists the slowest modules
+     and fails if any data science library is imported on the way to serving the API
+"""
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+# Libraries which the API must only import when a request actually needs them
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "sklearn", "joblib", "dataprep")
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def measure_import_time(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter with ``-X importtime``
+
+    Args:
+        module (str): The module to import, e.g. "wait_staff.server"
+
+    Returns:
+        List[Tuple[str, int, int]]: The top-level name, self time, and cumulative time
+                                    in microseconds of every module imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    import_times = list()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_time, cumulative_time, _, name = match.groups()
+            import_times.append((name, int(self_time), int(cumulative_time)))
+
+    return import_times
+
+
+def heavy_imports(import_times: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """
+    Find the data science libraries among the imported modules
+
+    Args:
+        import_times (List[Tuple[str, int, int]]): Output of measure_import_time
+
+    Returns:
+        Dict[str, int]: Cumulative import time in microseconds of each heavy library
+    """
+    return {
+        name: cumulative_time
+        for name, _, cumulative_time in import_times
+        if name in HEAVY_MODULES
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="wait_staff.server")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    arguments = parser.parse_args()
+
+    runs = [measure_import_time(arguments.module) for _ in range(arguments.repeat)]
+    totals = sorted(
+        next(cumulative for name, _, cumulative in run if name == arguments.module)
+        for run in runs
+    )
+
+    print(f"Importing {arguments.module}, {arguments.repeat} runs:")
+    print(f"  median {totals[len(totals) // 2] / 1000:.1f} ms")
+    print(f"  best   {totals[0] / 1000:.1f} ms")
+
+    print(f"\nSlowest {arguments.top} modules by self time (last run):")
+    for name, self_time, _ in sorted(runs[-1], key=lambda entry: -entry[1])[
+        : arguments.top
+    ]:
+        print(f"  {self_time / 1000:8.1f} ms  {name}")
+
+    heavy = heavy_imports(runs[-1])
+    if heavy:
+        print("\nData science libraries imported:")
+        for name, cumulative_time in heavy.items():
+            print(f"  {cumulative_time / 1000:8.1f} ms  {name}")
+        sys.exit(1)
+
+    print("\nNo data science libraries imported")
@@ -3,30 +3,394 @@ This is the window display, showing off data making up this Dish.
 
 i.e. A series of static HTML reports can be generated which will be served
      through the API served at this Restaurant
+
+Reports are rendered from a sample of the data, in a detached process, and only when the
+data has changed since the last report.
 """
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
-from dataprep.eda import create_report
+from window_display.report_manifest import add_report
 
 STATIC_DIR = Path("/app/static_reports")
 
+# The directory holding window_display, from which the renderer is run as a module
+KITCHEN_DIR = Path(__file__).parents[1]
+
+
+def sample_rows(
+    data: pd.DataFrame,
+    max_rows: Optional[int] = None,
+    stratify_by: Optional[str] = None,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Take a random sample of rows, keeping the proportions of a column if given
+
+    i.e. With stratify_by="Survived", a sample of 10% of the rows holds 10% of the
+         survivors and 10% of the others, so rare values aren't lost by chance
+
+    Args:
+        data (pd.DataFrame): The data to sample
+        max_rows (Optional[int]): The most rows to keep. Defaults to all of them
+        stratify_by (Optional[str]): The column whose proportions to keep
+        random_state (int): Seed, so the same data always gives the same sample
+
+    Returns:
+        pd.DataFrame: The sampled rows, in their original order
+    """
+    if max_rows is None or len(data) <= max_rows:
+        return data
+
+    if stratify_by is None:
+        return data.sample(n=max_rows, random_state=random_state).sort_index()
+
+    return (
+        data.groupby(stratify_by, group_keys=False, sort=False, dropna=False)
+        .sample(frac=max_rows / len(data), random_state=random_state)
+        .sort_index()
+    )
+
+
+class DisplaySample:
+    """
+    A random sample of data streamed a batch at a time, so the data never has to be
+    held in memory to be displayed
+
+    i.e. Every row is given a random key, and the max_rows rows with the smallest keys
+         are kept (of each value of stratify_by, if given): a uniform sample of every
+         row seen, whatever the size of the batches
+    """
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = 50_000,
+        stratify_by: Optional[str] = None,
+        random_state: int = 42,
+    ) -> None:
+        """
+        Args:
+            max_rows (Optional[int]): The most rows to keep. None keeps them all
+            stratify_by (Optional[str]): The column whose proportions to keep
+            random_state (int): Seed, so the same data always gives the same sample
+        """
+        self.max_rows = max_rows
+        self.stratify_by = stratify_by
+
+        self.rows_seen = 0
+        self.stratum_sizes = pd.Series(dtype="int64")
+
+        self._random = np.random.default_rng(random_state)
+        self._kept: List[pd.DataFrame] = list()
+        self._keys: List[np.ndarray] = list()
+
+    def observe(self, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Sample batches on their way somewhere else, e.g. to Tool.save_batches
+
+        Args:
+            batches (Iterable[pd.DataFrame]): Batches of data
+
+        Returns:
+            Iterator[pd.DataFrame]: The same batches, unchanged
+        """
+        for batch in batches:
+            self.add(batch)
+            yield batch
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """
+        Sample a batch of data, so at most max_rows rows (of each stratum) are kept
+
+        Args:
+            batch (pd.DataFrame): A batch of data
+        """
+        self._kept.append(batch)
+        self._keys.append(self._random.random(len(batch)))
+        self.rows_seen += len(batch)
+
+        if self.stratify_by is not None:
+            self.stratum_sizes = self.stratum_sizes.add(
+                batch[self.stratify_by].value_counts(dropna=False), fill_value=0
+            )
 
-def create_window_display(data_to_display: pd.DataFrame, display_name: str) -> None:
+        if self.max_rows is not None:
+            kept, keys = pd.concat(self._kept), np.concatenate(self._keys)
+            keep = self._ranks(kept, keys) <= self.max_rows
+
+            self._kept, self._keys = [kept[keep]], [keys[keep]]
+
+    def sample(self) -> pd.DataFrame:
+        """
+        The sampled rows, in the order they were seen
+
+        With stratify_by, each stratum is cut down to its share of max_rows, as
+        sample_rows() would from all of the data.
+
+        Returns:
+            pd.DataFrame: About max_rows rows, or every row if there were fewer
+        """
+        if not self._kept:
+            return pd.DataFrame()
+
+        kept, keys = pd.concat(self._kept), np.concatenate(self._keys)
+        if self.max_rows is None or self.rows_seen <= self.max_rows:
+            return kept
+
+        if self.stratify_by is None:
+            limit = self.max_rows
+        else:
+            shares = (self.stratum_sizes * self.max_rows / self.rows_seen).round()
+            limit = shares.reindex(kept[self.stratify_by]).to_numpy()
+
+        return kept[self._ranks(kept, keys) <= limit]
+
+    def _ranks(self, kept: pd.DataFrame, keys: np.ndarray) -> np.ndarray:
+        """
+        The rank of each row's key, within its stratum if stratifying
+        """
+        keys = pd.Series(keys)
+
+        if self.stratify_by is None:
+            return keys.rank(method="first").to_numpy()
+
+        return (
+            keys.groupby(kept[self.stratify_by].to_numpy(), dropna=False)
+            .rank(method="first")
+            .to_numpy()
+        )
+
+
+def fingerprint(data: pd.DataFrame, **settings: Any) -> str:
+    """
+    Hash a table of data, and the settings its report is rendered with
+
+    Args:
+        data (pd.DataFrame): The data to display
+        **settings (Any): Anything else which changes the report, e.g. max_rows
+
+    Returns:
+        str: A SHA-256 hex digest, which changes whenever any value, column name,
+             dtype, or setting does
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(
+        json.dumps(
+            {
+                "columns": [str(column) for column in data.columns],
+                "dtypes": [str(dtype) for dtype in data.dtypes],
+                "settings": settings,
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    )
+
+    return digest.hexdigest()
+
+
+def fingerprint_path(display_name: str) -> Path:
+    """
+    The fingerprint saved next to a report
+
+    Args:
+        display_name (str): Name of the data to display
+
+    Returns:
+        Path: A JSON file in the STATIC_DIR
+    """
+    return STATIC_DIR / f"{display_name}.display.json"
+
+
+def is_displayed(display_name: str, data_fingerprint: str) -> bool:
+    """
+    Check whether the report of some data has already been rendered
+
+    Args:
+        display_name (str): Name of the data to display
+        data_fingerprint (str): The fingerprint of the data, see fingerprint()
+
+    Returns:
+        bool: True if the report exists, and was rendered from the same data
+    """
+    report = STATIC_DIR / f"{display_name}.html"
+    saved = fingerprint_path(display_name)
+
+    if not report.exists() or not saved.exists():
+        return False
+
+    with open(saved) as file:
+        return json.load(file).get("fingerprint") == data_fingerprint
+
+
+@contextmanager
+def locked_display(display_name: str) -> Iterator[None]:
+    """
+    Wait until no other process is rendering a report, then keep the others waiting
+    until done
+
+    Args:
+        display_name (str): Name of the data to display
+
+    Returns:
+        Iterator[None]: Holds the report's lock, a file in the STATIC_DIR, while open
+    """
+    with open(STATIC_DIR / f"{display_name}.display.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def render_window_display(
+    data_to_display: pd.DataFrame, display_name: str, data_fingerprint: str
+) -> None:
+    """
+    Render an EDA report with dataprep, add it to the manifest of reports, and save
+    its fingerprint next to it
+
+    Renderers of the same report take turns, and one which waited for another to
+    render the same data doesn't render it again.
+
+    Args:
+        data_to_display (pd.DataFrame): The data to display in the EDA report
+        display_name (str): Name of the data to display
+        data_fingerprint (str): The fingerprint of the data, see fingerprint()
+
+    Returns:
+        None, but saves an HTML report in the STATIC_DIR
+    """
+    with locked_display(display_name=display_name):
+        if is_displayed(display_name=display_name, data_fingerprint=data_fingerprint):
+            return
+
+        # Only imported where the report is rendered, as it takes seconds to import
+        from dataprep.eda import create_report
+
+        # Rendered next to the report, then moved over it, so the report is never
+        # seen half written
+        report = STATIC_DIR / f"{display_name}.html"
+        with tempfile.TemporaryDirectory(dir=STATIC_DIR) as rendering:
+            dataprep_report = create_report(data_to_display, title="Window Display")
+            dataprep_report.save(filename=f"{display_name}", to=rendering)
+            del dataprep_report
+
+            os.replace(Path(rendering) / report.name, report)
+
+        # Save a versioned copy of the report, compress it, and list it for the server
+        add_report(report)
+
+        # Saved last, so a report which failed is rendered again next time
+        with open(fingerprint_path(display_name), "w") as file:
+            json.dump(
+                {"fingerprint": data_fingerprint, "rows": len(data_to_display)}, file
+            )
+
+
+def create_window_display(
+    data_to_display: pd.DataFrame,
+    display_name: str,
+    max_rows: Optional[int] = 50_000,
+    stratify_by: Optional[str] = None,
+    background: bool = True,
+) -> Optional[subprocess.Popen]:
     """
     Create a window display from a table of data to advertise your dish
 
     i.e. Create an automatic EDA report for table data which will be viewable
          through the web API using dataprep
 
+    Nothing is rendered if the data and settings haven't changed since the last
+    report.
+
     Args:
         data_to_display (pd.DataFrame): The data to display in the EDA report
         display_name (str): Name of the data to display
+        max_rows (Optional[int]): The most rows to display. None displays them all
+        stratify_by (Optional[str]): The column whose proportions to keep when
+                                     sampling rows, e.g. a label
+        background (bool): Render in a detached process, and return at once
 
     Returns:
-        None, but saves an HTML report in the STATIC_DIR
+        Optional[subprocess.Popen]: The process rendering the report, which exits once
+                                    it is saved in the STATIC_DIR, or None if the
+                                    report was up to date, or background is False.
+                                    There's no need to wait for it: once the chef's
+                                    process exits, it is reaped by the container's
+                                    init, see docker-compose.yml
     """
-    dataprep_report = create_report(data_to_display, title="Window Display")
-    dataprep_report.save(filename=f"{display_name}", to=str(STATIC_DIR))
-    del dataprep_report
+    data_fingerprint = fingerprint(
+        data_to_display, max_rows=max_rows, stratify_by=stratify_by
+    )
+    if is_displayed(display_name=display_name, data_fingerprint=data_fingerprint):
+        return None
+
+    sample = sample_rows(data_to_display, max_rows=max_rows, stratify_by=stratify_by)
+
+    if not background:
+        render_window_display(
+            data_to_display=sample,
+            display_name=display_name,
+            data_fingerprint=data_fingerprint,
+        )
+        return None
+
+    # The sample is handed over in a file only this user can read, which the renderer
+    # deletes once it has read it
+    file_descriptor, sample_path = tempfile.mkstemp(
+        prefix=f"{display_name}-", suffix=".parquet"
+    )
+    os.close(file_descriptor)
+    sample.to_parquet(sample_path)
+
+    # A separate program in its own session, rather than a child process, so it
+    # outlives the chef: the chef's process (e.g. an order cooked by the server) exits
+    # as soon as the dish is saved, and stopping it doesn't stop the report
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "window_display.auto_display",
+            sample_path,
+            "--display-name",
+            display_name,
+            "--fingerprint",
+            data_fingerprint,
+        ],
+        cwd=KITCHEN_DIR,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Render a window display from a sample of data saved as Parquet, "
+        "deleting the sample once read"
+    )
+    parser.add_argument("sample", type=Path)
+    parser.add_argument("--display-name", required=True)
+    parser.add_argument("--fingerprint", required=True)
+    arguments = parser.parse_args()
+
+    try:
+        sampled_data = pd.read_parquet(arguments.sample)
+    finally:
+        arguments.sample.unlink(missing_ok=True)
+
+    render_window_display(
+        data_to_display=sampled_data,
+        display_name=arguments.display_name,
+        data_fingerprint=arguments.fingerprint,
+    )
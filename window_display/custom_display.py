@@ -5,18 +5,168 @@ i.e. A Streamlit app, based heavily on the Streamlit self-driving demo:
      https://github.com/streamlit/demo-self-driving
 """
 import os
-import requests
-
-import cv2
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
 
 import altair as alt
 import streamlit as st
 import numpy as np
 import pandas as pd
 
+from head_chef.head_chef import fingerprint_location
+from tools.prepare_tools import prepare_tools
+from wait_staff.data_models import FullCourse
+from wait_staff.menu import FULL_COURSE, load_full_course
+from window_display.frame_index import FrameIndex
+
+# Where the frames and labels.csv.gz are, on any ``fsspec``-supported file system, e.g.
+# a local directory. Defaults to the Streamlit public S3 bucket.
+DATA_ROOT = os.environ.get(
+    "WINDOW_DISPLAY_DATA_ROOT",
+    "https://streamlit-self-driving.s3-us-west-2.amazonaws.com/",
+)
+
+# The FrameIndex saved by FrameIndexChef. Defaults to the location of frame_index in
+# full_course.yaml.
+FRAME_INDEX = os.environ.get("WINDOW_DISPLAY_FRAME_INDEX")
+
+# Frames to load ahead of the one selected, in each direction, while it is displayed
+PREFETCH_FRAMES = 3
+
+# The color of the boxes drawn around each type of object
+LABEL_COLORS = {
+    "car": [255, 0, 0],
+    "pedestrian": [0, 255, 0],
+    "truck": [0, 0, 255],
+    "trafficLight": [255, 255, 0],
+    "biker": [255, 0, 255],
+}
+COLOR_TABLE = np.array(list(LABEL_COLORS.values()), dtype=np.uint8)
+
+
+def data_path(file_name: str, data_root: str = DATA_ROOT) -> str:
+    """
+    The path of a file within the data root
+
+    Args:
+        file_name (str): e.g. "1478019952686311006.jpg"
+        data_root (str): The directory holding the data, with optional protocol
+
+    Returns:
+        str: The path, for a Tool
+    """
+    return f"{data_root.rstrip('/')}/{file_name}"
+
+
+def load_image(path: str) -> np.ndarray:
+    """
+    Load and decode one frame through the image tool
+
+    Args:
+        path (str): The frame's path, with optional protocol
+
+    Returns:
+        np.ndarray: The frame as RGB uint8, read-only so cached frames can be shared
+    """
+    image = prepare_tools(python_format="numpy", file_format="image_file")(
+        filepath=path
+    ).load()
+    image.setflags(write=False)
+
+    return image
+
+
+class FrameCache:
+    """
+    The most recently used frames, decoded, with neighbouring frames loaded ahead of
+    time in background threads
+
+    i.e. Moving the frame slider shows a frame which is usually already decoded,
+         instead of fetching and decoding it on every rerun of the app
+    """
+
+    def __init__(
+        self,
+        data_root: str = DATA_ROOT,
+        max_frames: int = 64,
+        prefetch_workers: int = 4,
+    ) -> None:
+        """
+        Args:
+            data_root (str): The directory holding the frames, with optional protocol
+            max_frames (int): The most frames to keep decoded. At 1920x1200, each one
+                              takes about 7 MB
+            prefetch_workers (int): Threads loading frames ahead of time
+        """
+        self.data_root = data_root
+        self.max_frames = max_frames
+
+        self.hits = 0
+        self.misses = 0
+
+        self._frames: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: Dict[str, Future] = dict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=prefetch_workers, thread_name_prefix="frame-prefetch"
+        )
+
+    def get(self, frame: str) -> np.ndarray:
+        """
+        Get a decoded frame, loading it if it isn't cached or already being loaded
+
+        Args:
+            frame (str): The frame's file name
+
+        Returns:
+            np.ndarray: The frame as RGB uint8
+        """
+        with self._lock:
+            if frame in self._frames:
+                self._frames.move_to_end(frame)
+                self.hits += 1
+                return self._frames[frame]
+
+            self.misses += 1
+            pending = self._pending.get(frame)
+
+        if pending is not None:
+            return pending.result()
+
+        return self._load(frame)
+
+    def prefetch(self, frames: Iterable[str]) -> None:
+        """
+        Start loading frames in the background, unless they are cached already
+
+        Args:
+            frames (Iterable[str]): The frames' file names, most wanted first
+        """
+        with self._lock:
+            for frame in frames:
+                if frame not in self._frames and frame not in self._pending:
+                    self._pending[frame] = self._executor.submit(self._load, frame)
 
-# Path to the Streamlit public S3 bucket
-DATA_URL_ROOT = "https://streamlit-self-driving.s3-us-west-2.amazonaws.com/"
+    def _load(self, frame: str) -> np.ndarray:
+        """
+        Load a frame, and cache it, forgetting the least recently used frames
+        """
+        try:
+            image = load_image(data_path(frame, data_root=self.data_root))
+        finally:
+            with self._lock:
+                self._pending.pop(frame, None)
+
+        with self._lock:
+            self._frames[frame] = image
+            self._frames.move_to_end(frame)
+
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+        return image
 
 
 def create_window_display():
@@ -30,51 +180,33 @@ def create_window_display():
         None, but serves a Streamlit-based display at the default port of 80
     """
 
-    @st.cache
-    def load_metadata(url):
-        return pd.read_csv(url)
-
-    # This function uses some Pandas magic to summarize the metadata Dataframe.
-    @st.cache
-    def create_summary(metadata: pd.DataFrame):
-        one_hot_encoded = pd.get_dummies(
-            metadata[["frame", "label"]], columns=["label"]
-        )
-        summary = (
-            one_hot_encoded.groupby(["frame"])
-            .sum()
-            .rename(
-                columns={
-                    "label_biker": "biker",
-                    "label_car": "car",
-                    "label_pedestrian": "pedestrian",
-                    "label_trafficLight": "traffic light",
-                    "label_truck": "truck",
-                }
-            )
-        )
-        return summary
-
-    image_metadata = load_metadata(os.path.join(DATA_URL_ROOT, "labels.csv.gz"))
-    data_summary = create_summary(metadata=image_metadata)
+    labels_path = data_path("labels.csv.gz")
+    image_metadata = load_metadata(path=labels_path)
+    index = load_frame_index(labels_path=labels_path)
+    data_summary = index.summary()
 
     # Show the metadata DataFrame as a table
     st.write("## Metadata", image_metadata[:1000], "## Summary", data_summary[:1000])
 
     # Draw the UI elements to search for objects (pedestrians, cars, etc.)
-    selected_frame_index, selected_frame = frame_selector_ui(data_summary)
+    selected_frame_index, selected_frames = frame_selector_ui(index, data_summary)
     if selected_frame_index is None:
         st.error("No frames fit the criteria. Please select different label or number.")
         return
 
-    # Load the image from S3.
-    image_url = os.path.join(DATA_URL_ROOT, selected_frame)
-    image = load_image(image_url)
+    # Load the image from the cache, and the frames either side of it ahead of time
+    selected_frame = selected_frames[selected_frame_index]
+    frames = frame_cache(data_root=DATA_ROOT)
+    image = frames.get(selected_frame)
+    frames.prefetch(
+        selected_frames[neighbour]
+        for offset in range(1, PREFETCH_FRAMES + 1)
+        for neighbour in (selected_frame_index + offset, selected_frame_index - offset)
+        if 0 <= neighbour < len(selected_frames)
+    )
 
     # Add boxes for objects on the image. These are the boxes for the ground image.
-    boxes = image_metadata[image_metadata.frame == selected_frame].drop(
-        columns=["frame"]
-    )
+    boxes = frame_boxes(metadata=image_metadata, frame=selected_frame)
     draw_image_with_boxes(
         image,
         boxes,
@@ -83,7 +215,7 @@ def create_window_display():
     )
 
 
-def frame_selector_ui(summary):
+def frame_selector_ui(index, summary):
     st.sidebar.markdown("# Frame")
 
     # The user can pick which type of object to search for.
@@ -93,9 +225,10 @@ def frame_selector_ui(summary):
     min_elts, max_elts = st.sidebar.slider(
         "How many %ss (select a range)?" % object_type, 0, 25, [10, 20]
     )
-    selected_frames = get_selected_frames(summary, object_type, min_elts, max_elts)
-    if len(selected_frames) < 1:
+    selected_positions = index.select(object_type, min_elts, max_elts)
+    if len(selected_positions) < 1:
         return None, None
+    selected_frames = index.frames[selected_positions]
 
     # Choose a frame out of the selected frames.
     selected_frame_index = st.sidebar.slider(
@@ -104,7 +237,10 @@ def frame_selector_ui(summary):
 
     # Draw an altair chart in the sidebar with information on the frame.
     objects_per_frame = (
-        summary.loc[selected_frames, object_type].reset_index(drop=True).reset_index()
+        summary[object_type]
+        .iloc[selected_positions]
+        .reset_index(drop=True)
+        .reset_index()
     )
     chart = (
         alt.Chart(objects_per_frame, height=120)
@@ -119,46 +255,139 @@ def frame_selector_ui(summary):
     )
     st.sidebar.altair_chart(alt.layer(chart, vline))
 
-    selected_frame = selected_frames[selected_frame_index]
-    return selected_frame_index, selected_frame
+    return selected_frame_index, selected_frames
+
+
+def draw_boxes(image: np.ndarray, boxes: pd.DataFrame) -> np.ndarray:
+    """
+    Shade the boxes around objects in an image, each blended half and half with the
+    color of its label
+
+    i.e. Everything stays uint8: the average of two bytes is computed as
+         (a >> 1) + (b >> 1) + (a & b & 1), which never overflows
+
+    Args:
+        image (np.ndarray): An RGB uint8 image, which is not modified
+        boxes (pd.DataFrame): Columns xmin, ymin, xmax, ymax, and label
+
+    Returns:
+        np.ndarray: A copy of the image, with the boxes shaded
+    """
+    image_with_boxes = image.copy()
+
+    corners = np.clip(
+        boxes[["xmin", "ymin", "xmax", "ymax"]].to_numpy(dtype=np.int64), 0, None
+    )
+    codes = pd.Categorical(boxes["label"], categories=list(LABEL_COLORS)).codes
+    colors = COLOR_TABLE[codes]
+
+    # Overlapping boxes are blended in turn, so each one stays visible
+    for (xmin, ymin, xmax, ymax), color in zip(corners, colors):
+        region = image_with_boxes[ymin:ymax, xmin:xmax]
+        region[...] = (region >> 1) + (color >> 1) + (region & color & 1)
+
+    return image_with_boxes
 
 
 def draw_image_with_boxes(image, boxes, header, description):
-    label_colors = {
-        "car": [255, 0, 0],
-        "pedestrian": [0, 255, 0],
-        "truck": [0, 0, 255],
-        "trafficLight": [255, 255, 0],
-        "biker": [255, 0, 255],
-    }
-    image_with_boxes = image.astype(np.float64)
-    for _, (xmin, ymin, xmax, ymax, label) in boxes.iterrows():
-        image_with_boxes[
-            int(ymin) : int(ymax), int(xmin) : int(xmax), :
-        ] += label_colors[label]
-        image_with_boxes[int(ymin) : int(ymax), int(xmin) : int(xmax), :] /= 2
+    image_with_boxes = draw_boxes(image=image, boxes=boxes)
 
     # Draw the header and image.
     st.subheader(header)
     st.markdown(description)
-    st.image(image_with_boxes.astype(np.uint8), use_column_width=True)
+    st.image(image_with_boxes, use_column_width=True)
+
+
+def frame_boxes(metadata: pd.DataFrame, frame: str) -> pd.DataFrame:
+    """
+    Find the labelled boxes in one frame, by binary search rather than a scan
 
+    Args:
+        metadata (pd.DataFrame): The labels, sorted by frame, see load_metadata()
+        frame (str): The frame's file name
 
-@st.cache(hash_funcs={np.ufunc: str})
-def get_selected_frames(summary, label, min_elts, max_elts):
-    return summary[
-        np.logical_and(summary[label] >= min_elts, summary[label] <= max_elts)
-    ].index
+    Returns:
+        pd.DataFrame: Columns xmin, ymin, xmax, ymax, and label
+    """
+    frames = metadata["frame"].to_numpy()
+    start = np.searchsorted(frames, frame, side="left")
+    end = np.searchsorted(frames, frame, side="right")
 
+    return metadata.iloc[start:end].drop(columns=["frame"])
 
-@st.cache(show_spinner=False)
-def load_image(url: str) -> np.array:
-    response = requests.get(url=url, stream=True).raw
-    image = np.asarray(bytearray(response.read()), dtype="uint8")
-    image = cv2.imdecode(image, cv2.IMREAD_COLOR)
-    image = image[:, :, [2, 1, 0]]  # BGR -> RGB
 
-    return image
+def load_saved_frame_index(labels_path: str) -> Optional[FrameIndex]:
+    """
+    Load the FrameIndex saved by FrameIndexChef, if it was cooked from the current
+    version of these labels
+
+    Args:
+        labels_path (str): The labels being displayed
+
+    Returns:
+        Optional[FrameIndex]: The saved index, or None if there is none for these
+                              labels, it was cooked from an older version of them, or
+                              it can't be reached
+    """
+    location = FRAME_INDEX or load_full_course(FULL_COURSE)["frame_index"].location
+    fingerprint_tool = prepare_tools(python_format="dict", file_format="json_file")(
+        filepath=fingerprint_location(location)
+    )
+    labels_tool = prepare_tools(python_format="pandas", file_format="csv_file")(
+        filepath=labels_path
+    )
+
+    # Missing files, credentials, or file system packages mean building it here, but
+    # an index which can't be parsed is a bug, and is raised
+    try:
+        if not fingerprint_tool.exists():
+            return None
+
+        saved_checksums = [
+            ingredient.dvc_hash
+            for ingredient in FullCourse(**fingerprint_tool.load()).ingredients_used
+            or []
+            if str(ingredient.location) == labels_path
+        ]
+
+        # The labels may have changed since FrameIndexChef last cooked
+        if labels_tool.checksum() not in saved_checksums:
+            return None
+
+        saved_index = prepare_tools(python_format="pandas", file_format="parquet_file")(
+            filepath=location
+        ).load()
+    except (ImportError, OSError):
+        return None
+
+    return FrameIndex(index=saved_index)
+
+
+@st.cache(allow_output_mutation=True, show_spinner=False)
+def load_metadata(path: str) -> pd.DataFrame:
+    # Sorted by frame for frame_boxes(), and not hashed on every rerun
+    labels = prepare_tools(python_format="pandas", file_format="csv_file")(
+        filepath=path,
+        load_args={"compression": "gzip" if path.endswith(".gz") else None},
+    ).load()
+
+    return labels.sort_values("frame", kind="stable", ignore_index=True)
+
+
+@st.cache(allow_output_mutation=True, show_spinner=False)
+def load_frame_index(labels_path: str) -> FrameIndex:
+    # Built here only if FrameIndexChef hasn't cooked one for these labels
+    saved = load_saved_frame_index(labels_path=labels_path)
+    if saved is not None:
+        return saved
+
+    return FrameIndex.from_labels(load_metadata(path=labels_path))
+
+
+@st.cache(allow_output_mutation=True, show_spinner=False)
+def frame_cache(data_root: str) -> FrameCache:
+    # One cache for every session and rerun of the app
+    return FrameCache(data_root=data_root)
 
 
 if __name__ == "__main__":
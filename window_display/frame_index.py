@@ -0,0 +1,149 @@
+"""
+An index of how many of each type of object are in each frame, for the custom display
+
+i.e. Built once from the labels, and saved as Parquet in long format - one row per
+     frame per label, sorted by label and count - so selecting the frames holding
+     between a and b of an object is two binary searches, instead of a scan
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Labels shown under a different name in the display
+LABEL_NAMES = {"trafficLight": "traffic light"}
+
+# The columns of the index as saved
+INDEX_COLUMNS = ["label", "count", "position", "frame"]
+
+
+class FrameIndex:
+    """
+    The number of objects of each label in each frame, sorted by count for each label
+    """
+
+    def __init__(self, index: pd.DataFrame) -> None:
+        """
+        Args:
+            index (pd.DataFrame): The index in long format, as returned by to_frame():
+                                  label, count, position (of the frame, in frame
+                                  order), and frame, sorted by label, then count,
+                                  then position
+        """
+        counts = index["count"].to_numpy()
+        positions = index["position"].to_numpy()
+
+        # Each label's rows are contiguous, and hold every frame
+        self.labels: List[str] = [str(label) for label in pd.unique(index["label"])]
+        n_frames = len(index) // max(len(self.labels), 1)
+
+        # Every label holds every frame, so only the first label's frames are read
+        self.frames = np.empty(n_frames, dtype=object)
+        self.frames[positions[:n_frames]] = (
+            index["frame"].iloc[:n_frames].to_numpy(dtype=object)
+        )
+
+        self.sorted_counts: Dict[str, np.ndarray] = dict()
+        self.sorted_positions: Dict[str, np.ndarray] = dict()
+        for label_number, label in enumerate(self.labels):
+            rows = slice(label_number * n_frames, (label_number + 1) * n_frames)
+            self.sorted_counts[label] = counts[rows]
+            self.sorted_positions[label] = positions[rows]
+
+    @classmethod
+    def from_labels(cls, labels: pd.DataFrame) -> "FrameIndex":
+        """
+        Build the index from the labels of every object in every frame
+
+        Args:
+            labels (pd.DataFrame): One row per object, with columns frame and label
+
+        Returns:
+            FrameIndex: The index
+        """
+        frame_codes, frames = pd.factorize(labels["frame"], sort=True)
+        label_codes, label_values = pd.factorize(labels["label"], sort=True)
+        n_frames, n_labels = len(frames), len(label_values)
+
+        # Count every (label, frame) pair at once
+        counts = np.bincount(
+            label_codes * n_frames + frame_codes, minlength=n_labels * n_frames
+        ).reshape(n_labels, n_frames)
+
+        # A stable sort keeps frames with equal counts in frame order
+        order = np.argsort(counts, axis=1, kind="stable")
+
+        index = pd.DataFrame(
+            {
+                "label": np.repeat(
+                    [LABEL_NAMES.get(label, label) for label in label_values],
+                    n_frames,
+                ),
+                "count": np.take_along_axis(counts, order, axis=1)
+                .ravel()
+                .astype(np.int32),
+                "position": order.ravel().astype(np.int32),
+                "frame": np.asarray(frames, dtype=object)[order.ravel()],
+            },
+            columns=INDEX_COLUMNS,
+        )
+
+        return cls(index=index)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The index in long format, to save as Parquet
+
+        Returns:
+            pd.DataFrame: Columns label, count, position, and frame
+        """
+        positions = np.concatenate(
+            [self.sorted_positions[label] for label in self.labels]
+        )
+
+        return pd.DataFrame(
+            {
+                "label": pd.Categorical(
+                    np.repeat(self.labels, len(self.frames)), categories=self.labels
+                ),
+                "count": np.concatenate(
+                    [self.sorted_counts[label] for label in self.labels]
+                ),
+                "position": positions,
+                "frame": self.frames[positions],
+            },
+            columns=INDEX_COLUMNS,
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """
+        The number of objects of each label in each frame
+
+        Returns:
+            pd.DataFrame: One row per frame, in frame order, and one column per label
+        """
+        summary = dict()
+        for label in self.labels:
+            counts = np.empty(len(self.frames), dtype=np.int32)
+            counts[self.sorted_positions[label]] = self.sorted_counts[label]
+            summary[label] = counts
+
+        return pd.DataFrame(summary, index=pd.Index(self.frames, name="frame"))
+
+    def select(self, label: str, min_count: int, max_count: int) -> np.ndarray:
+        """
+        Find the frames holding between min_count and max_count objects of a label
+
+        Args:
+            label (str): e.g. "pedestrian"
+            min_count (int): The fewest objects, inclusive
+            max_count (int): The most objects, inclusive
+
+        Returns:
+            np.ndarray: The positions of the frames, in frame order
+        """
+        sorted_counts = self.sorted_counts[label]
+        start = np.searchsorted(sorted_counts, min_count, side="left")
+        end = np.searchsorted(sorted_counts, max_count, side="right")
+
+        return np.sort(self.sorted_positions[label][start:end])
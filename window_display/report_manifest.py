@@ -0,0 +1,212 @@
+"""
+The manifest of the static reports, with a precompressed copy of each one
+
+i.e. Whenever a report is written, a copy named after its content hash, with gzip (and
+     brotli, if installed) copies, is saved next to it, and manifest.json records
+     these files, their sizes, and the hash, so the server never has to list or hash
+     the reports itself, and only ever sends the files of the version it lists
+"""
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+REPORTS_DIR = Path("/app/static_reports")
+
+MANIFEST = "manifest.json"
+
+# The suffix of the copy of a report in each encoding, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# A copy of one version of a report, e.g. model_results.9f86d081884c7d65...html
+VERSIONED_REPORT = re.compile(r"\.[0-9a-f]{32}\.html$")
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """
+    Write a file so that readers only ever see the old or the new contents
+
+    Args:
+        path (Path): The file to write
+        data (bytes): The new contents
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(data)
+
+    # Temporary files are only readable by their owner
+    os.chmod(file.name, 0o644)
+    os.replace(file.name, path)
+
+
+def compress(data: bytes, encoding: str) -> Optional[bytes]:
+    """
+    Compress a report for serving with a Content-Encoding
+
+    Args:
+        data (bytes): The report
+        encoding (str): "gzip" or "br"
+
+    Returns:
+        Optional[bytes]: The compressed report, or None for brotli if the brotli
+                         package is not installed
+    """
+    if encoding == "gzip":
+        # No timestamp, so the same report always compresses to the same bytes
+        return gzip.compress(data, compresslevel=9, mtime=0)
+
+    try:
+        import brotli
+    except ImportError:
+        return None
+
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+@contextmanager
+def locked_manifest(reports_dir: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Read the manifest, to be updated in place, and save it afterwards, while no other
+    process can update it
+
+    Args:
+        reports_dir (Path): The directory holding the reports
+
+    Returns:
+        Iterator[Dict[str, Any]]: The manifest entry of each report, keyed by name
+    """
+    with open(reports_dir / f"{MANIFEST}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        manifest = load_manifest(reports_dir=reports_dir)
+        yield manifest
+
+        write_atomically(
+            reports_dir / MANIFEST,
+            json.dumps(manifest, indent=2, sort_keys=True).encode(),
+        )
+
+
+def load_manifest(reports_dir: Path = REPORTS_DIR) -> Dict[str, Any]:
+    """
+    Read the manifest of the reports
+
+    Args:
+        reports_dir (Path): The directory holding the reports
+
+    Returns:
+        Dict[str, Any]: The manifest entry of each report, keyed by name, or nothing
+                        if there is no manifest yet
+    """
+    try:
+        with open(reports_dir / MANIFEST) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return dict()
+
+
+def version_files(entry: Dict[str, Any]) -> List[str]:
+    """
+    List the files holding one version of a report
+
+    Args:
+        entry (Dict[str, Any]): The report's manifest entry
+
+    Returns:
+        List[str]: The names of its versioned copy, and of its compressed copies
+    """
+    if "stored" not in entry:
+        return list()
+
+    return [entry["stored"], *(copy["file"] for copy in entry["encodings"].values())]
+
+
+def add_report(report: Path) -> Dict[str, Any]:
+    """
+    Save a versioned copy of a report, and compressed copies of it, and add it to the
+    manifest in its directory
+
+    Each version's files are named after its content hash, so they are complete before
+    the manifest lists them, and never change afterwards. The files of the version
+    before are kept, for requests which found it in the manifest before it changed,
+    and older versions are deleted.
+
+    Args:
+        report (Path): An HTML report, e.g. /app/static_reports/model_results.html
+
+    Returns:
+        Dict[str, Any]: The report's manifest entry, e.g.
+                        {"file": "model_results.html",
+                         "stored": "model_results.9f86d081884c7d65.html",
+                         "size": 5242880, "etag": "9f86d081884c7d65",
+                         "generated_at": "...",
+                         "encodings": {"gzip": {
+                             "file": "model_results.9f86d081884c7d65.html.gz",
+                             "size": 1048576}},
+                         "previous": [the files of the version before]}
+    """
+    report = Path(report)
+    data = report.read_bytes()
+    etag = hashlib.sha256(data).hexdigest()[:32]
+
+    stored = report.with_name(f"{report.stem}.{etag}{report.suffix}")
+    write_atomically(stored, data)
+
+    encodings = dict()
+    for encoding, suffix in ENCODINGS.items():
+        compressed = compress(data, encoding=encoding)
+        if compressed is None:
+            continue
+
+        compressed_report = stored.with_name(stored.name + suffix)
+        write_atomically(compressed_report, compressed)
+        encodings[encoding] = {"file": compressed_report.name, "size": len(compressed)}
+
+    entry = {
+        "file": report.name,
+        "stored": stored.name,
+        "size": len(data),
+        "etag": etag,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "encodings": encodings,
+    }
+
+    with locked_manifest(reports_dir=report.parent) as manifest:
+        previous = manifest.get(report.stem, dict())
+
+        if previous.get("etag") == etag:
+            expired = list()
+            entry["previous"] = previous.get("previous", list())
+        else:
+            expired = previous.get("previous", list())
+            entry["previous"] = version_files(previous)
+
+        manifest[report.stem] = entry
+
+        for file_name in set(expired) - set(version_files(entry)):
+            (report.parent / file_name).unlink(missing_ok=True)
+
+    return entry
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Add every HTML report in a directory to its manifest, e.g. after "
+        "adding a report by hand"
+    )
+    parser.add_argument("--reports-dir", type=Path, default=REPORTS_DIR)
+    arguments = parser.parse_args()
+
+    for html_report in sorted(arguments.reports_dir.glob("*.html")):
+        if html_report.name != "index.html" and not VERSIONED_REPORT.search(
+            html_report.name
+        ):
+            entry = add_report(html_report)
+            print(f"{entry['file']}: {entry['size']:,} bytes, {entry['encodings']}")